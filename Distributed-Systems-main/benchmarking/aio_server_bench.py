@@ -0,0 +1,94 @@
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import grpc
+
+# Same leader detection as the throughput benchmark
+from replication_throughput_bench import QUEUE_SERVICE, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 3
+BASE_PORT = 56900
+CLIENT_COUNTS = [10, 100, 1000]
+DURATION = 5.0
+SERVERS = [("threads", "raft_server.py"), ("asyncio", "aio_raft_server.py")]
+
+
+def start_cluster(script, workdir):
+    # Each node runs the script's own serve(), so the thread server keeps its real worker pool
+    peers = ",".join(f"{i}=localhost:{BASE_PORT + i}" for i in range(1, NODES + 1))
+    procs, logs = [], []
+    for i in range(1, NODES + 1):
+        env = dict(os.environ, NODE_ID=str(i), PEERS=peers, PORT=str(BASE_PORT + i),
+                   DATA_DIR=os.path.join(workdir, f"node{i}"))
+        log_path = os.path.join(workdir, f"node{i}.log")
+        with open(log_path, 'w') as log:
+            procs.append(subprocess.Popen([sys.executable, script], cwd=QUEUE_SERVICE, env=env,
+                                          stdout=log, stderr=subprocess.STDOUT))
+        logs.append(log_path)
+    return procs, logs
+
+
+def thread_count(pid):
+    # Linux only: threads in the server process
+    with open(f"/proc/{pid}/status") as f:
+        return next(int(line.split()[1]) for line in f if line.startswith("Threads:"))
+
+
+async def load(addr, clients, pid):
+    # clients concurrent AddTrack loops (commit-wait on) over one channel;
+    # also returns the leader's thread count halfway through
+    latencies, errors = [], 0
+    stop_at = time.time() + DURATION
+
+    async with grpc.aio.insecure_channel(addr) as channel:
+        stub = queue_pb2_grpc.QueueServiceStub(channel)
+
+        async def client(worker):
+            nonlocal errors
+            n = 0
+            while time.time() < stop_at:
+                track = queue_pb2.Track(id=f"{clients}-{worker}-{n}", title="Song", artist="Bench", duration=200)
+                start = time.perf_counter()
+                try:
+                    await stub.AddTrack(track, metadata=[("write-reply", "ack")], timeout=10)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                except grpc.RpcError:
+                    errors += 1
+                n += 1
+
+        async def sample():
+            await asyncio.sleep(DURATION / 2)
+            return thread_count(pid)
+
+        threads, *_ = await asyncio.gather(sample(), *(client(w) for w in range(clients)))
+    return len(latencies) / DURATION, sorted(latencies), errors, threads
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+if __name__ == '__main__':
+    print(f"AddTrack to the leader of a {NODES}-node cluster, commit-wait on, {DURATION:.0f}s per run")
+    print(f"{'server':>8} {'clients':>8} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>9} {'errors':>7} {'threads':>8}")
+    for name, script in SERVERS:
+        procs, logs = start_cluster(script, tempfile.mkdtemp(prefix="raft-aio-bench-"))
+        try:
+            leader = find_leader(logs)
+            for clients in CLIENT_COUNTS:
+                rate, lat, errors, threads = asyncio.run(
+                    load(f"localhost:{BASE_PORT + leader}", clients, procs[leader - 1].pid))
+                print(f"{name:>8} {clients:>8} {rate:>9.0f} {percentile(lat, 50):>8.2f} "
+                      f"{percentile(lat, 99):>9.2f} {errors:>7} {threads:>8}")
+        finally:
+            for p in procs:
+                p.kill()
+                p.wait()
@@ -0,0 +1,112 @@
+import os
+import random
+import sys
+import tempfile
+import time
+import zlib
+
+# Pretend to be node 1 of a 5-node cluster; no RPCs are actually sent.
+os.environ.setdefault("NODE_ID", "1")
+os.environ.setdefault("PEERS", ",".join(f"{i}=raft-node{i}:50051" for i in range(1, 6)))
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="raft-bench-"))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/queue-service')))
+import raft_pb2
+import queue_pb2
+import raft_server
+
+BATCHES = 40            # catch-up AppendEntries, MAX_APPEND_ENTRIES entries each
+WORDS = ("love night heart fire dream rain summer blue road home light wild gold river city dance baby "
+         "stars time away forever young shadow ocean sweet echo").split()
+ARTISTS = [f"{random.choice(WORDS).title()} {random.choice(WORDS).title()}" for _ in range(300)]
+# (label, payload encoding, zlib level or None)
+FORMATS = [("string + bytes", "legacy", None), ("enum + payload", "enum", None),
+           ("enum + zlib 1", "enum", 1), ("enum + zlib 6", "enum", 6)]
+
+
+def make_requests(n):
+    # A catch-up mix of client writes: mostly adds with Spotify-like ids, then votes and removes
+    requests, ids = [], []
+    for i in range(n):
+        kind = random.random()
+        if kind < 0.6 or not ids:
+            track_id = "".join(random.choices("0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz", k=22))
+            ids.append(track_id)
+            title = " ".join(random.choice(WORDS) for _ in range(random.randint(1, 4))).title()
+            requests.append((raft_pb2.LogEntry.ADD, queue_pb2.Track(
+                id=track_id, title=title, artist=random.choice(ARTISTS), duration=random.randint(120, 420))))
+        elif kind < 0.9:
+            requests.append((raft_pb2.LogEntry.VOTE, queue_pb2.VoteRequest(id=random.choice(ids), up=kind < 0.8)))
+        else:
+            requests.append((raft_pb2.LogEntry.REMOVE, queue_pb2.TrackId(id=random.choice(ids))))
+    return requests
+
+
+def leader_entries(requests, encoding):
+    # What _leader_append logs for each request
+    entries = []
+    for op, request in requests:
+        if encoding == "legacy":
+            entries.append(raft_pb2.LogEntry(term=1, command=raft_pb2.LogEntry.Op.Name(op),
+                                             data=request.SerializeToString()))
+        else:
+            entry = raft_pb2.LogEntry(term=1, op=op)
+            getattr(entry, raft_server.PAYLOAD_FIELDS[op]).CopyFrom(request)
+            entries.append(entry)
+    return entries
+
+
+def follower_decode(wire):
+    # What a follower does with the bytes until each entry's request is ready to apply
+    args = raft_pb2.AppendArgs()
+    args.ParseFromString(wire)
+    if args.zlib_entries:
+        batch = raft_pb2.EntryBatch()
+        batch.ParseFromString(zlib.decompress(args.zlib_entries))
+        args.entries.extend(batch.entries)
+    decoded = []
+    for entry in args.entries:
+        if entry.command:
+            op = raft_pb2.LogEntry.Op.Value(entry.command)
+            request = {raft_pb2.LogEntry.ADD: queue_pb2.Track, raft_pb2.LogEntry.VOTE: queue_pb2.VoteRequest,
+                       raft_pb2.LogEntry.REMOVE: queue_pb2.TrackId}[op]()
+            request.ParseFromString(entry.data)
+        elif entry.op == raft_pb2.LogEntry.ADD:
+            request = queue_pb2.Track()
+            request.CopyFrom(entry.track)  # _apply_entry copies tracks out of the log
+        else:
+            request = getattr(entry, raft_server.PAYLOAD_FIELDS[entry.op])
+        decoded.append(request)
+    return decoded
+
+
+def run(server, batches, encoding, level):
+    raft_server.COMPRESS_APPEND_BYTES = 1 if level else 0
+    raft_server.COMPRESS_LEVEL = level or 0
+    wire_bytes = entries = 0
+    leader_cpu = follower_cpu = 0.0
+    for requests in batches:
+        start = time.process_time()
+        args = raft_pb2.AppendArgs(term=1, leader_id=1, prev_log_index=0, prev_log_term=1,
+                                   entries=leader_entries(requests, encoding), leader_commit=0)
+        wire = server._compress_entries(args).SerializeToString()
+        leader_cpu += time.process_time() - start
+
+        start = time.process_time()
+        follower_decode(wire)
+        follower_cpu += time.process_time() - start
+        wire_bytes += len(wire)
+        entries += len(requests)
+    return wire_bytes / entries, leader_cpu / entries * 1e6, follower_cpu / entries * 1e6
+
+
+if __name__ == '__main__':
+    random.seed(5306)
+    server = raft_server.RaftServer()
+    server.stop()
+    batches = [make_requests(raft_server.MAX_APPEND_ENTRIES) for _ in range(BATCHES)]
+    print(f"Catch-up AppendEntries of {raft_server.MAX_APPEND_ENTRIES} entries (60% ADD, 30% VOTE, 10% REMOVE), "
+          f"{BATCHES} batches")
+    print(f"{'format':>15} {'bytes/entry':>12} {'leader us/entry':>16} {'follower us/entry':>18}")
+    for label, encoding, level in FORMATS:
+        size, leader_us, follower_us = run(server, batches, encoding, level)
+        print(f"{label:>15} {size:>12.1f} {leader_us:>16.2f} {follower_us:>18.2f}")
@@ -0,0 +1,53 @@
+import tempfile
+import time
+
+import grpc
+
+# Same local-cluster launcher as the throughput benchmark
+from replication_throughput_bench import start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 5
+BASE_PORT = 56700
+PLAYLIST = 10000
+BATCH_SIZES = [100, 1000]
+
+
+def playlist(prefix):
+    return [queue_pb2.Track(id=f"{prefix}-{i}", title=f"Song {i}", artist="Bench", duration=200)
+            for i in range(PLAYLIST)]
+
+
+def import_one_by_one(stub, tracks):
+    for track in tracks:
+        stub.AddTrack(track, metadata=[("write-reply", "ack")], timeout=10)
+
+
+def import_batched(stub, tracks, size):
+    for start in range(0, len(tracks), size):
+        stub.AddTracks(queue_pb2.TrackBatch(tracks=tracks[start:start + size]),
+                       metadata=[("write-reply", "ack")], timeout=30)
+
+
+if __name__ == '__main__':
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-import-bench-"), nodes=NODES, base_port=BASE_PORT)
+    try:
+        stub = queue_pb2_grpc.QueueServiceStub(
+            grpc.insecure_channel(f"localhost:{BASE_PORT + find_leader(logs)}"))
+        runs = [("AddTrack x1", lambda tracks: import_one_by_one(stub, tracks))]
+        for size in BATCH_SIZES:
+            runs.append((f"AddTracks x{size}", lambda tracks, size=size: import_batched(stub, tracks, size)))
+
+        print(f"Importing a {PLAYLIST}-track playlist into a {NODES}-node cluster, one client, commit-wait on")
+        print(f"{'call':>16} {'seconds':>8} {'tracks/s':>9} {'queue size':>11}")
+        for n, (name, run) in enumerate(runs):
+            start = time.perf_counter()
+            run(playlist(f"r{n}"))
+            elapsed = time.perf_counter() - start
+            size = stub.GetQueuePage(queue_pb2.PageRequest(limit=1), timeout=10).total
+            print(f"{name:>16} {elapsed:>8.2f} {PLAYLIST / elapsed:>9.0f} {size:>11}")
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
@@ -2,16 +2,17 @@ import requests
 import subprocess
 import time
 import threading
-import grpc
 import matplotlib.pyplot as plt
 import os
 import sys
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/tests')))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/queue-service')))
 import queue_pb2
-import queue_pb2_grpc
+import queue_client
 
 REST_URL = "http://localhost:8080/add_track"
 GRPC_HOST = "nginx-grpc:50051"
+# Node addresses for the smart client; writes then skip the nginx hop and the follower forward
+GRPC_NODES = os.environ.get("QUEUE_NODES", GRPC_HOST)
 
 # --- REST Benchmark ---
 def rest_worker(n, payload):
@@ -37,8 +38,7 @@ def bench_rest(concurrency=20, total=200):
 
 # --- gRPC Benchmark ---
 def grpc_worker(n):
-    channel = grpc.insecure_channel(GRPC_HOST)
-    stub = queue_pb2_grpc.QueueServiceStub(channel)
+    stub = queue_client.connect(GRPC_NODES)
     for _ in range(n):
         try:
             stub.AddTrack(queue_pb2.Track(id="1", title="Song", artist="A", duration=200))
@@ -0,0 +1,73 @@
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same local-cluster launcher as the throughput benchmark
+from replication_throughput_bench import start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 5
+BASE_PORT = 56200
+CLIENTS = 8
+REQUESTS_PER_CLIENT = 250
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500]
+
+
+def client(addr, worker, commit_wait, latencies):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(addr))
+    metadata = [("commit-wait", "1" if commit_wait else "0")]
+    for n in range(REQUESTS_PER_CLIENT):
+        track = queue_pb2.Track(id=f"{worker}-{n}", title=f"Song {n}", artist="Bench", duration=200)
+        start = time.perf_counter()
+        stub.AddTrack(track, metadata=metadata, timeout=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def run(commit_wait):
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-latency-bench-"), nodes=NODES, base_port=BASE_PORT)
+    try:
+        leader = find_leader(logs)
+        latencies = []
+        threads = [threading.Thread(target=client, args=(f"localhost:{BASE_PORT + leader}", w, commit_wait, latencies))
+                   for w in range(CLIENTS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return sorted(latencies)
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def histogram(sorted_values):
+    counts, lower = [], 0
+    for upper in BUCKETS_MS + [float('inf')]:
+        counts.append(sum(1 for v in sorted_values if lower <= v < upper))
+        lower = upper
+    return counts
+
+
+if __name__ == '__main__':
+    results = {"fire-and-forget": run(False), "commit-wait": run(True)}
+
+    print(f"AddTrack latency, {NODES}-node cluster, {CLIENTS} clients x {REQUESTS_PER_CLIENT} requests")
+    print(f"{'mode':>16} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for mode, lat in results.items():
+        print(f"{mode:>16} {percentile(lat, 50):>8.1f} {percentile(lat, 90):>8.1f} "
+              f"{percentile(lat, 99):>8.1f} {lat[-1]:>8.1f}")
+
+    print()
+    labels = [f"<{b}ms" for b in BUCKETS_MS] + [f">={BUCKETS_MS[-1]}ms"]
+    print(f"{'bucket':>8} " + " ".join(f"{mode:>16}" for mode in results))
+    columns = [histogram(lat) for lat in results.values()]
+    for i, label in enumerate(labels):
+        print(f"{label:>8} " + " ".join(f"{col[i]:>16}" for col in columns))
@@ -0,0 +1,84 @@
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same local-cluster launcher (and optional checkout to compare against) as the throughput benchmark
+from replication_throughput_bench import SRC, start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 3
+BASE_PORT = 57800
+QUEUE_SIZE = 20000      # tracks queued before the run, so every GetQueue copies them all
+WRITERS = 8             # commit-wait VoteTrack clients on the leader
+READER_COUNTS = [0, 1, 4]  # stale GetQueue clients on the leader
+DURATION = 5.0
+
+
+def writer(stub, w, stop_at, latencies):
+    n = 0
+    while time.time() < stop_at:
+        vote = queue_pb2.VoteRequest(id=f"t-{(w * 7919 + n) % QUEUE_SIZE}", up=n % 3 != 0)
+        start = time.perf_counter()
+        try:
+            stub.VoteTrack(vote, metadata=[("commit-wait", "1"), ("write-reply", "ack")], timeout=10)
+        except grpc.RpcError:
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        n += 1
+
+
+def reader(stub, stop_at, latencies):
+    while time.time() < stop_at:
+        start = time.perf_counter()
+        try:
+            stub.GetQueue(queue_pb2.Empty(), metadata=[("read-mode", "stale")], timeout=10)
+        except grpc.RpcError:
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def run(readers):
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-rw-bench-"), nodes=NODES, base_port=BASE_PORT)
+    try:
+        leader = find_leader(logs)
+        stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(f"localhost:{BASE_PORT + leader}"))
+        for start in range(0, QUEUE_SIZE, 500):
+            batch = [queue_pb2.Track(id=f"t-{i}", title=f"Song {i}", artist="Bench", duration=200)
+                     for i in range(start, min(start + 500, QUEUE_SIZE))]
+            stub.AddTracks(queue_pb2.TrackBatch(tracks=batch), metadata=[("write-reply", "ack")], timeout=30)
+
+        stop_at = time.time() + DURATION
+        writes = [[] for _ in range(WRITERS)]
+        reads = [[] for _ in range(readers)]
+        threads = [threading.Thread(target=writer, args=(stub, w, stop_at, writes[w])) for w in range(WRITERS)]
+        threads += [threading.Thread(target=reader, args=(stub, stop_at, reads[r])) for r in range(readers)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return sorted(l for lat in writes for l in lat), sorted(l for lat in reads for l in lat)
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+if __name__ == '__main__':
+    print(f"{WRITERS} commit-wait VoteTrack writers and stale GetQueue readers of a {QUEUE_SIZE}-track queue, "
+          f"all on the leader, {NODES} nodes, {DURATION:.0f}s per run ({SRC})")
+    print(f"{'readers':>8} {'writes/s':>9} {'write p50 ms':>13} {'write p99 ms':>13} {'reads/s':>8} "
+          f"{'read p50 ms':>12} {'read p99 ms':>12}")
+    for readers in READER_COUNTS:
+        writes, reads = run(readers)
+        print(f"{readers:>8} {len(writes) / DURATION:>9.0f} {percentile(writes, 50):>13.1f} "
+              f"{percentile(writes, 99):>13.1f} {len(reads) / DURATION:>8.0f} {percentile(reads, 50):>12.1f} "
+              f"{percentile(reads, 99):>12.1f}")
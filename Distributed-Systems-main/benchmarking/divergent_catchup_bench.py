@@ -0,0 +1,117 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same node launcher (and optional checkout to compare against) as the throughput benchmark
+from replication_throughput_bench import SRC, NODE_MAIN, find_leader
+import queue_pb2
+import queue_pb2_grpc
+import raft_pb2
+import raft_pb2_grpc
+
+NODES = 3
+BASE_PORT = 57700
+COMMITTED = 100                 # tracks every node has before the split
+DIVERGENT_COUNTS = [1000, 10000]  # entries on each side of the split
+WRITERS = 8
+CATCH_UP_TIMEOUT = 300.0
+
+
+def start_node(i, workdir):
+    # The leader is left alone without quorum for a while, so it must not step down;
+    # snapshots are off so the old leader catches up through AppendEntries alone
+    peers = ",".join(f"{n}=localhost:{BASE_PORT + n}" for n in range(1, NODES + 1))
+    env = dict(os.environ, NODE_ID=str(i), PEERS=peers, PORT=str(BASE_PORT + i), CHECK_QUORUM="0",
+               SNAPSHOT_THRESHOLD="100000000", DATA_DIR=os.path.join(workdir, f"node{i}"))
+    with open(os.path.join(workdir, f"node{i}.log"), 'a') as log:
+        return subprocess.Popen([sys.executable, '-c', NODE_MAIN], cwd=SRC, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+
+
+def add_tracks(port, prefix, count, commit_wait):
+    # count AddTrack calls from WRITERS threads
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(f"localhost:{port}"))
+    metadata = [("commit-wait", "1" if commit_wait else "0"), ("write-reply", "ack")]
+
+    def worker(w):
+        for n in range(w, count, WRITERS):
+            track = queue_pb2.Track(id=f"{prefix}-{n}", title="Song", artist="Bench", duration=200)
+            stub.AddTrack(track, metadata=metadata, timeout=10)
+
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(WRITERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def queue_length(port):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(f"localhost:{port}"))
+    try:
+        return len(stub.GetQueue(queue_pb2.Empty(), metadata=[("read-mode", "stale")], timeout=5).queue)
+    except grpc.RpcError:
+        return -1
+
+
+def run(divergent):
+    workdir = tempfile.mkdtemp(prefix="raft-divergent-bench-")
+    procs = {i: start_node(i, workdir) for i in range(1, NODES + 1)}
+    logs = [os.path.join(workdir, f"node{i}.log") for i in range(1, NODES + 1)]
+    try:
+        old = find_leader(logs)
+        add_tracks(BASE_PORT + old, "committed", COMMITTED, commit_wait=True)
+
+        # Cut the leader off and let it log entries nobody else gets
+        followers = [i for i in procs if i != old]
+        for i in followers:
+            procs[i].send_signal(signal.SIGSTOP)
+        add_tracks(BASE_PORT + old, "lost", divergent, commit_wait=False)
+        procs[old].kill()
+        procs[old].wait()
+
+        # The other two elect a leader and commit as many entries of their own,
+        # then hand leadership over: the next leader starts probing the old
+        # one from the end of its log, `divergent` entries past the split
+        for i in followers:
+            procs[i].send_signal(signal.SIGCONT)
+        new = followers[find_leader([logs[i - 1] for i in followers]) - 1]
+        add_tracks(BASE_PORT + new, "new", divergent, commit_wait=True)
+        raft_pb2_grpc.RaftServiceStub(grpc.insecure_channel(f"localhost:{BASE_PORT + new}")).TransferLeadership(
+            raft_pb2.TransferArgs(), timeout=10)
+        new = [i for i in followers if i != new][0]
+
+        # Restart the old leader: its divergent suffix has to be found and replaced
+        with open(logs[new - 1]) as f:
+            sent_before = f.read().count(f"sends RPC AppendEntries to Node {old}")
+        start = time.time()
+        procs[old] = start_node(old, workdir)
+        serving = None
+        while time.time() - start < CATCH_UP_TIMEOUT:
+            length = queue_length(BASE_PORT + old)
+            if length >= 0 and serving is None:
+                serving = time.time() - start
+            if length == COMMITTED + divergent:
+                break
+            time.sleep(0.05)
+        caught_up = time.time() - start
+        with open(logs[new - 1]) as f:
+            appends = f.read().count(f"sends RPC AppendEntries to Node {old}") - sent_before
+        return serving, caught_up, appends
+    finally:
+        for p in procs.values():
+            p.kill()
+            p.wait()
+
+
+if __name__ == '__main__':
+    print(f"Old leader restarted with a divergent suffix, {NODES} nodes, {COMMITTED} entries in common ({SRC})")
+    print(f"{'divergent entries':>18} {'serving s':>10} {'caught up s':>12} {'AppendEntries to it':>20}")
+    for divergent in DIVERGENT_COUNTS:
+        serving, caught_up, appends = run(divergent)
+        print(f"{divergent:>18} {serving:>10.2f} {caught_up:>12.2f} {appends:>20}")
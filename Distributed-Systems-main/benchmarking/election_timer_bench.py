@@ -0,0 +1,131 @@
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+# Pretend to be node 1 of a 3-node cluster whose peers never answer.
+QUEUE_SERVICE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/queue-service'))
+# Optional argument: another queue-service checkout to compare against
+SRC = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else QUEUE_SERVICE
+os.environ.setdefault("NODE_ID", "1")
+os.environ.setdefault("PEERS", "1=localhost:57801,2=localhost:57802,3=localhost:57803")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="raft-bench-"))
+sys.path.insert(0, SRC)
+import raft_server
+
+TIMEOUT = 0.2           # the timed elections time out after TIMEOUT to 2 * TIMEOUT, like ELECTION_MIN/MAX
+ELECTIONS = 50
+IDLE = 5.0              # seconds of an idle follower
+LOAD_HOLD = 0.002       # the RPC-handler stand-in holds the state lock this long, then sleeps as long
+
+
+class CountingLock:
+    # The node's RLock, counting acquisitions and those that had to wait
+    def __init__(self, rlock=threading.RLock):
+        self._lock = rlock()
+        self.acquired = self.waited = 0
+
+    def acquire(self, blocking=True, timeout=-1):
+        if self._lock.acquire(False):
+            self.acquired += 1
+            return True
+        if not self._lock.acquire(blocking, timeout):
+            return False
+        self.acquired += 1
+        self.waited += 1
+        return True
+
+    __enter__ = acquire
+
+    def release(self):
+        self._lock.release()
+
+    def __exit__(self, *exc):
+        self._lock.release()
+
+    def __getattr__(self, name):
+        # _is_owned, _release_save, _acquire_restore, for threading.Condition
+        return getattr(self._lock, name)
+
+
+def make_server():
+    # Elections are off until timed_elections turns them on
+    raft_server.ELECTION_MIN = raft_server.ELECTION_MAX = 3600.0
+    rlock = threading.RLock
+    threading.RLock = CountingLock
+    try:
+        return raft_server.RaftServer()
+    finally:
+        threading.RLock = rlock
+
+
+def timed_elections(server, count):
+    # How late after its deadline each of `count` back-to-back election timeouts fires (ms)
+    lateness, done = [], threading.Event()
+
+    def start_election():
+        # Called by the timer with the lock held, in place of a real election
+        now = time.time()
+        lateness.append((now - server.last_heartbeat - server.election_timeout) * 1000)
+        server.last_heartbeat = now
+        server.election_timeout = random.uniform(TIMEOUT, 2 * TIMEOUT)
+        if len(lateness) == count:
+            server.election_timeout = 3600.0
+            done.set()
+
+    with server.lock:
+        server._start_election = start_election
+        server.last_heartbeat, server.election_timeout = time.time(), random.uniform(TIMEOUT, 2 * TIMEOUT)
+        if hasattr(server, "_schedule_timer"):
+            server._schedule_timer()  # the deadline moved in; older trees poll
+    done.wait()
+    return sorted(lateness)
+
+
+def lock_load(server, stop):
+    # Stands in for RPC handlers keeping the state lock busy half the time
+    while not stop.is_set():
+        with server.lock:
+            end = time.perf_counter() + LOAD_HOLD
+            while time.perf_counter() < end:
+                pass
+        time.sleep(LOAD_HOLD)
+
+
+def measure(server, phase):
+    lock = server.lock
+    acquired, waited, start = lock.acquired, lock.waited, time.time()
+    lateness = phase()
+    elapsed = time.time() - start
+    return (lock.acquired - acquired) / elapsed, (lock.waited - waited) / elapsed, lateness
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+if __name__ == '__main__':
+    server = make_server()
+    time.sleep(1.0)  # let the replicator threads settle
+    print(f"Follower election timer, {TIMEOUT * 1000:.0f}-{TIMEOUT * 2000:.0f} ms timeouts, {ELECTIONS} timeouts per run ({SRC})")
+    print(f"{'phase':>22} {'lock acquires/s':>16} {'lock waits/s':>13} {'late p50 ms':>12} {'late p99 ms':>12} "
+          f"{'late max ms':>12}")
+
+    acquires, waits, _ = measure(server, lambda: time.sleep(IDLE))
+    print(f"{'idle':>22} {acquires:>16.1f} {waits:>13.1f} {'':>12} {'':>12} {'':>12}")
+
+    acquires, waits, late = measure(server, lambda: timed_elections(server, ELECTIONS))
+    print(f"{'elections':>22} {acquires:>16.1f} {waits:>13.1f} {percentile(late, 50):>12.2f} "
+          f"{percentile(late, 99):>12.2f} {late[-1]:>12.2f}")
+
+    stop = threading.Event()
+    load = threading.Thread(target=lock_load, args=(server, stop))
+    load.start()
+    acquires, waits, late = measure(server, lambda: timed_elections(server, ELECTIONS))
+    stop.set()
+    load.join()
+    print(f"{'elections, lock busy':>22} {acquires:>16.1f} {waits:>13.1f} {percentile(late, 50):>12.2f} "
+          f"{percentile(late, 99):>12.2f} {late[-1]:>12.2f}")
+    server.stop()
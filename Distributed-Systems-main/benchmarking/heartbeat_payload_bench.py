@@ -0,0 +1,66 @@
+import os
+import sys
+import tempfile
+import time
+
+# Pretend to be node 1 of a 5-node cluster; no RPCs are actually sent.
+os.environ.setdefault("NODE_ID", "1")
+os.environ.setdefault("PEERS", ",".join(f"{i}=raft-node{i}:50051" for i in range(1, 6)))
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="raft-bench-"))
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/queue-service')))
+import raft_pb2
+import queue_pb2
+import raft_server
+
+LOG_SIZES = [0, 1000, 10000, 50000, 100000]
+
+
+def make_entry(i, term=1):
+    track = queue_pb2.Track(id=str(i), title=f"Song {i}", artist="Bench", duration=200)
+    return raft_pb2.LogEntry(term=term, op=raft_pb2.LogEntry.ADD, track=track)
+
+
+def full_log_args(server):
+    # What every heartbeat used to carry: the whole log
+    return raft_pb2.AppendArgs(
+        term=server.current_term,
+        leader_id=raft_server.NODE_ID,
+        prev_log_index=len(server.log) - 1,
+        prev_log_term=server.log[-1].term if server.log else 0,
+        entries=list(server.log),
+        leader_commit=server.commit_index
+    )
+
+
+def run_benchmark():
+    server = raft_server.RaftServer()
+    server.stop()
+    results = []
+    with server.lock:
+        server.current_term = 1
+        server.state = "LEADER"
+        for size in LOG_SIZES:
+            while len(server.log) < size:
+                server.log.append(make_entry(len(server.log)))
+            server.commit_index = len(server.log) - 1
+            # Every follower is caught up, so a heartbeat carries no entries
+            for pid in raft_server.PEERS:
+                server.next_index[pid] = len(server.log)
+                server.match_index[pid] = len(server.log) - 1
+
+            start = time.perf_counter()
+            new_bytes = sum(server._build_append_args(pid).ByteSize() for pid in raft_server.PEERS)
+            new_ms = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            old_bytes = full_log_args(server).ByteSize() * len(raft_server.PEERS)
+            old_ms = (time.perf_counter() - start) * 1000
+            results.append((size, old_bytes, old_ms, new_bytes, new_ms))
+    return results
+
+
+if __name__ == '__main__':
+    print("Heartbeat payload per round (4 followers)")
+    print(f"{'log entries':>12} {'full-log bytes':>15} {'full-log ms':>12} {'incremental bytes':>18} {'incremental ms':>15}")
+    for size, old_bytes, old_ms, new_bytes, new_ms in run_benchmark():
+        print(f"{size:>12} {old_bytes:>15} {old_ms:>12.2f} {new_bytes:>18} {new_ms:>15.3f}")
@@ -0,0 +1,74 @@
+import itertools
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same local-cluster launcher as the throughput benchmark
+from replication_throughput_bench import start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+import queue_client
+
+NODES = 5
+BASE_PORT = 56800
+WRITES = 500            # AddTrack calls timed per client count and routing
+CLIENT_COUNTS = [1, 8]
+
+
+class RoundRobin:
+    # What nginx does in docker-compose: every call to the next node, followers forward writes
+    def __init__(self, addrs):
+        self.stubs = itertools.cycle([queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(a)) for a in addrs])
+        self.lock = threading.Lock()
+
+    def AddTrack(self, request, **kwargs):
+        with self.lock:
+            stub = next(self.stubs)
+        return stub.AddTrack(request, **kwargs)
+
+
+def run(make_client, clients, prefix):
+    latencies = [[] for _ in range(clients)]
+
+    def worker(w):
+        client = make_client()
+        for i in range(w, WRITES, clients):
+            track = queue_pb2.Track(id=f"{prefix}-{i}", title=f"Song {i}", artist="Bench", duration=200)
+            start = time.perf_counter()
+            client.AddTrack(track, metadata=[("write-reply", "ack")], timeout=10)
+            latencies[w].append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return WRITES / elapsed, sorted(l for worker in latencies for l in worker)
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+if __name__ == '__main__':
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-routing-bench-"), nodes=NODES, base_port=BASE_PORT)
+    try:
+        find_leader(logs)
+        addrs = [f"localhost:{BASE_PORT + i}" for i in range(1, NODES + 1)]
+        nodes = ",".join(f"{i}={a}" for i, a in enumerate(addrs, start=1))
+        routings = [("round-robin", lambda: RoundRobin(addrs)),
+                    ("smart client", lambda: queue_client.connect(nodes))]
+        print(f"AddTrack latency, {NODES}-node cluster, commit-wait on, {WRITES} writes per run")
+        print(f"{'clients':>8} {'routing':>13} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+        for clients in CLIENT_COUNTS:
+            for name, make_client in routings:
+                rate, lat = run(make_client, clients, f"{clients}-{name}")
+                print(f"{clients:>8} {name:>13} {rate:>9.0f} {percentile(lat, 50):>8.2f} {percentile(lat, 99):>8.2f}")
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
@@ -0,0 +1,90 @@
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same local-cluster launcher as the throughput benchmark
+from replication_throughput_bench import start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+BASE_PORT = 57300
+READERS = 12            # spread round-robin over the learners, or over the voters when there are none
+WRITERS = 2             # commit-wait AddTrack to the leader, timed for write p99
+DURATION = 5.0
+# lease still asks the leader for a read index; stale reads the replica alone
+READ_MODES = ["lease", "stale"]
+# (voters, learners): growing the voters is the old way to add read capacity
+CLUSTERS = [(3, 0), (5, 0), (3, 1), (3, 2), (3, 4)]
+
+
+def writer(addr, w, stop, latencies):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(addr))
+    n = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        stub.AddTrack(queue_pb2.Track(id=f"w-{w}-{n}", title="Song", artist="Bench", duration=200),
+                      metadata=[("commit-wait", "1"), ("write-reply", "ack")], timeout=10)
+        latencies.append((time.perf_counter() - start) * 1000)
+        n += 1
+
+
+def reader(port, mode, stop_at, results):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(f"localhost:{port}"))
+    reads, errors = 0, 0
+    while time.time() < stop_at:
+        try:
+            stub.GetQueuePage(queue_pb2.PageRequest(limit=50), metadata=[("read-mode", mode)], timeout=10)
+            reads += 1
+        except grpc.RpcError:
+            errors += 1
+    results.append((reads, errors))
+
+
+def run(voters, learners, mode):
+    nodes = voters + learners
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-learner-bench-"), nodes=nodes, base_port=BASE_PORT,
+                                LEARNERS=",".join(str(i) for i in range(voters + 1, nodes + 1)))
+    try:
+        leader = find_leader(logs[:voters])
+        read_nodes = list(range(voters + 1, nodes + 1)) or list(range(1, voters + 1))
+        stop, write_latencies, results = threading.Event(), [[] for _ in range(WRITERS)], []
+        writers = [threading.Thread(target=writer, args=(f"localhost:{BASE_PORT + leader}", w, stop, lat))
+                   for w, lat in enumerate(write_latencies)]
+        for t in writers:
+            t.start()
+        time.sleep(1.0)
+        stop_at = time.time() + DURATION
+        readers = [threading.Thread(target=reader, args=(BASE_PORT + read_nodes[r % len(read_nodes)], mode, stop_at, results))
+                   for r in range(READERS)]
+        for t in readers:
+            t.start()
+        for t in readers:
+            t.join()
+        stop.set()
+        for t in writers:
+            t.join()
+
+        latencies = sorted(l for lat in write_latencies for l in lat)
+        return sum(r for r, _ in results) / DURATION, latencies, sum(e for _, e in results)
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+if __name__ == '__main__':
+    print(f"GetQueuePage from {READERS} readers on the learners (on the voters if there are none), "
+          f"{WRITERS} commit-wait writers on the leader, {DURATION:.0f}s per run")
+    print(f"{'read mode':>9} {'voters':>7} {'learners':>9} {'reads/s':>8} {'write p50 ms':>13} {'write p99 ms':>13} "
+          f"{'errors':>7}")
+    for mode in READ_MODES:
+        for voters, learners in CLUSTERS:
+            rate, lat, errors = run(voters, learners, mode)
+            print(f"{mode:>9} {voters:>7} {learners:>9} {rate:>8.0f} {percentile(lat, 50):>13.1f} "
+                  f"{percentile(lat, 99):>13.1f} {errors:>7}")
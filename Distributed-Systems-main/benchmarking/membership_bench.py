@@ -0,0 +1,99 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same leader detection as the throughput benchmark
+from replication_throughput_bench import QUEUE_SERVICE, find_leader
+import queue_pb2
+import queue_pb2_grpc
+import raft_pb2
+import raft_pb2_grpc
+
+FOUNDERS = 3
+MAX_NODES = 5
+BASE_PORT = 57200
+PRELOAD = 20000      # tracks in the queue before the first node joins
+CLIENTS = 4
+PHASE = 5.0          # seconds of AddTrack load timed per cluster size
+
+
+def start_node(i, workdir, join):
+    # Founders start from PEERS; later nodes start empty with JOIN=1 and wait for AddNode
+    peers = ",".join(f"{n}=localhost:{BASE_PORT + n}" for n in range(1, FOUNDERS + 1))
+    env = dict(os.environ, NODE_ID=str(i), PORT=str(BASE_PORT + i), DATA_DIR=os.path.join(workdir, f"node{i}"),
+               PEERS="" if join else peers, JOIN="1" if join else "0")
+    with open(os.path.join(workdir, f"node{i}.log"), 'a') as log:
+        return subprocess.Popen([sys.executable, "raft_server.py"], cwd=QUEUE_SERVICE, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+
+
+def timed_writes(stub, prefix):
+    # CLIENTS threads of back-to-back AddTrack for PHASE seconds; commit latencies in ms
+    latencies = []
+    stop_at = time.time() + PHASE
+
+    def worker(w):
+        n = 0
+        while time.time() < stop_at:
+            track = queue_pb2.Track(id=f"{prefix}-{w}-{n}", title="Song", artist="Bench", duration=200)
+            start = time.perf_counter()
+            stub.AddTrack(track, metadata=[("write-reply", "ack")], timeout=10)
+            latencies.append((time.perf_counter() - start) * 1000)
+            n += 1
+
+    threads = [threading.Thread(target=worker, args=(w,)) for w in range(CLIENTS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return sorted(latencies)
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def report(label, latencies, extra=""):
+    print(f"{label:>22} {len(latencies) / PHASE:>9.0f} {percentile(latencies, 50):>8.2f} "
+          f"{percentile(latencies, 99):>8.2f}  {extra}")
+
+
+if __name__ == '__main__':
+    workdir = tempfile.mkdtemp(prefix="raft-membership-bench-")
+    procs = [start_node(i, workdir, join=False) for i in range(1, FOUNDERS + 1)]
+    try:
+        leader = find_leader([os.path.join(workdir, f"node{i}.log") for i in range(1, FOUNDERS + 1)])
+        channel = grpc.insecure_channel(f"localhost:{BASE_PORT + leader}")
+        queue_stub = queue_pb2_grpc.QueueServiceStub(channel)
+        raft_stub = raft_pb2_grpc.RaftServiceStub(channel)
+        for start in range(0, PRELOAD, 1000):
+            queue_stub.AddTracks(queue_pb2.TrackBatch(tracks=[
+                queue_pb2.Track(id=f"pre-{n}", title="Song", artist="Bench", duration=200)
+                for n in range(start, start + 1000)]), metadata=[("write-reply", "ack")])
+
+        print(f"AddTrack commit latency while growing the cluster, {CLIENTS} clients, "
+              f"{PRELOAD} tracks preloaded")
+        print(f"{'voters':>22} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8}  membership change")
+        report(f"{FOUNDERS}", timed_writes(queue_stub, "base"))
+        for i in range(FOUNDERS + 1, MAX_NODES + 1):
+            procs.append(start_node(i, workdir, join=True))
+            start = time.perf_counter()
+            reply = raft_stub.AddNode(raft_pb2.NodeArgs(node_id=i, addr=f"localhost:{BASE_PORT + i}"), timeout=60)
+            joined = time.perf_counter() - start
+            report(f"{i}", timed_writes(queue_stub, f"n{i}"),
+                   f"AddNode {i}: {reply.message} after {joined:.2f}s")
+        for i in range(MAX_NODES, FOUNDERS, -1):
+            start = time.perf_counter()
+            reply = raft_stub.RemoveNode(raft_pb2.NodeArgs(node_id=i), timeout=60)
+            removed = time.perf_counter() - start
+            report(f"{i - 1}", timed_writes(queue_stub, f"r{i}"),
+                   f"RemoveNode {i}: {reply.message} after {removed:.2f}s")
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
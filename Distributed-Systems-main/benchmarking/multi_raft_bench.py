@@ -0,0 +1,113 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same queue-service checkout as the throughput benchmark
+from replication_throughput_bench import QUEUE_SERVICE
+import queue_pb2
+import queue_client
+
+NODES = 5
+BASE_PORT = 57500
+GROUP_COUNTS = [1, 2, 4, 8]
+CLIENTS = 16            # commit-wait AddTrack writers, spread round-robin over the queues
+DURATION = 5.0
+
+
+def start_cluster(workdir, groups):
+    # Every node runs multi_raft_server.py with the same QUEUES
+    peers = ",".join(f"{i}=localhost:{BASE_PORT + i}" for i in range(1, NODES + 1))
+    queues = ",".join(f"q{g}" for g in range(1, groups + 1))
+    procs, logs = [], []
+    for i in range(1, NODES + 1):
+        env = dict(os.environ, NODE_ID=str(i), PEERS=peers, PORT=str(BASE_PORT + i), QUEUES=queues,
+                   DATA_DIR=os.path.join(workdir, f"node{i}"))
+        log_path = os.path.join(workdir, f"node{i}.log")
+        with open(log_path, 'w') as log:
+            procs.append(subprocess.Popen([sys.executable, "multi_raft_server.py"], cwd=QUEUE_SERVICE, env=env,
+                                          stdout=log, stderr=subprocess.STDOUT))
+        logs.append(log_path)
+    return procs, logs
+
+
+def leaders(logs):
+    # queue id -> node that logged the highest-term election win for it
+    best = {}
+    for i, path in enumerate(logs, start=1):
+        with open(path) as f:
+            for queue_id, term in re.findall(r"\[queue (\S+)\] Won election and became LEADER for term (\d+)",
+                                             f.read()):
+                if queue_id not in best or int(term) > best[queue_id][0]:
+                    best[queue_id] = (int(term), i)
+    return {queue_id: node for queue_id, (_, node) in best.items()}
+
+
+def heartbeat_calls(logs):
+    calls = 0
+    for path in logs:
+        with open(path) as f:
+            calls += f.read().count("sends RPC Heartbeats")
+    return calls
+
+
+def writer(client, queue_id, w, stop_at, latencies):
+    n = 0
+    while time.time() < stop_at:
+        track = queue_pb2.Track(id=f"w-{w}-{n}", title="Song", artist="Bench", duration=200, queue_id=queue_id)
+        start = time.perf_counter()
+        try:
+            client.AddTrack(track, metadata=[("commit-wait", "1"), ("write-reply", "ack")], timeout=10)
+        except grpc.RpcError:
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        n += 1
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def run(groups):
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-multi-bench-"), groups)
+    try:
+        queue_ids = [f"q{g}" for g in range(1, groups + 1)]
+        deadline = time.time() + 15
+        while not set(queue_ids) <= set(leaders(logs)):
+            if time.time() > deadline:
+                raise RuntimeError("No leader elected")
+            time.sleep(0.2)
+        time.sleep(0.5)  # let the leaders settle their followers
+        spread = len(set(leaders(logs)[q] for q in queue_ids))
+
+        client = queue_client.connect(",".join(f"{i}=localhost:{BASE_PORT + i}" for i in range(1, NODES + 1)))
+        latencies = [[] for _ in range(CLIENTS)]
+        beats_before = heartbeat_calls(logs)
+        stop_at = time.time() + DURATION
+        threads = [threading.Thread(target=writer, args=(client, queue_ids[w % groups], w, stop_at, latencies[w]))
+                   for w in range(CLIENTS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        beats = heartbeat_calls(logs) - beats_before
+        return sorted(l for lat in latencies for l in lat), spread, beats
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+if __name__ == '__main__':
+    print(f"Commit-wait AddTrack from {CLIENTS} clients spread over the queues, {NODES} nodes, "
+          f"{DURATION:.0f}s per run")
+    print(f"{'groups':>7} {'leader nodes':>13} {'writes/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'Heartbeats RPCs/s':>18}")
+    for groups in GROUP_COUNTS:
+        latencies, spread, beats = run(groups)
+        print(f"{groups:>7} {spread:>13} {len(latencies) / DURATION:>9.0f} {percentile(latencies, 50):>8.1f} "
+              f"{percentile(latencies, 99):>8.1f} {beats / DURATION:>18.1f}")
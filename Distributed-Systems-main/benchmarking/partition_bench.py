@@ -0,0 +1,155 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same leader detection as the throughput benchmark
+from replication_throughput_bench import QUEUE_SERVICE, find_leader
+import queue_pb2
+import queue_client
+
+NODES = 3
+BASE_PORT = 57000
+SETTLE = 3.0        # seconds of writes before the partition
+PARTITION = 8.0     # seconds the node stays cut off (several election timeouts)
+HEAL = 8.0          # seconds of writes after it heals, long enough for a new election
+WRITE_TIMEOUT = 2.0
+MODES = [("off", {"PRE_VOTE": "0", "CHECK_QUORUM": "0"}), ("on", {"PRE_VOTE": "1", "CHECK_QUORUM": "1"})]
+
+# Runs one node with its Raft channels wrapped so RPCs to peers outside its
+# line of PARTITION_FILE fail at once. Every node drops its own side, which
+# makes the partition symmetric; clients can still reach every node.
+NODE_MAIN = """
+import os
+from concurrent import futures
+import grpc, raft_server, raft_pb2_grpc, queue_pb2_grpc
+
+
+class Partitioned(grpc.RpcError):
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return "partitioned"
+
+
+class Partition(grpc.UnaryUnaryClientInterceptor):
+    def __init__(self, pid):
+        self.pid = pid
+
+    def intercept_unary_unary(self, continuation, details, request):
+        with open(os.environ['PARTITION_FILE']) as f:
+            for line in f:
+                group = {int(n) for n in line.split(',')}
+                if raft_server.NODE_ID in group and self.pid not in group:
+                    raise Partitioned()
+        return continuation(details, request)
+
+
+insecure_channel = grpc.insecure_channel
+addr_to_pid = {addr: pid for pid, addr in raft_server.PEERS.items()}
+grpc.insecure_channel = lambda addr, *args, **kwargs: grpc.intercept_channel(
+    insecure_channel(addr, *args, **kwargs), Partition(addr_to_pid[addr]))
+
+server = grpc.server(futures.ThreadPoolExecutor(max_workers=40))
+node = raft_server.RaftServer()
+raft_pb2_grpc.add_RaftServiceServicer_to_server(node, server)
+queue_pb2_grpc.add_QueueServiceServicer_to_server(node, server)
+server.add_insecure_port('[::]:' + os.environ['PORT'])
+server.start()
+server.wait_for_termination()
+"""
+
+
+def start_cluster(workdir, partition_file, **extra_env):
+    peers = ",".join(f"{i}=localhost:{BASE_PORT + i}" for i in range(1, NODES + 1))
+    procs, logs = [], []
+    for i in range(1, NODES + 1):
+        env = dict(os.environ, NODE_ID=str(i), PEERS=peers, PORT=str(BASE_PORT + i), **extra_env,
+                   PARTITION_FILE=partition_file, DATA_DIR=os.path.join(workdir, f"node{i}"))
+        log_path = os.path.join(workdir, f"node{i}.log")
+        with open(log_path, 'w') as log:
+            procs.append(subprocess.Popen([sys.executable, '-c', NODE_MAIN], cwd=QUEUE_SERVICE, env=env,
+                                          stdout=log, stderr=subprocess.STDOUT))
+        logs.append(log_path)
+    return procs, logs
+
+
+def partition(path, *groups):
+    # One line per side, e.g. partition(path, [1, 2], [3]); no groups heals it
+    with open(path, 'w') as f:
+        f.write("".join(",".join(map(str, g)) + "\n" for g in groups))
+
+
+def writer(nodes, stop, acked):
+    # One AddTrack at a time through the smart client; keeps the completion
+    # time of every write that was committed
+    client = queue_client.connect(nodes)
+    n = 0
+    while not stop.is_set():
+        track = queue_pb2.Track(id=f"w-{n}", title=f"Song {n}", artist="Bench", duration=200)
+        n += 1
+        try:
+            reply = client.AddTrack(track, metadata=[("write-reply", "ack")], timeout=WRITE_TIMEOUT)
+        except grpc.RpcError:
+            time.sleep(0.05)
+            continue
+        if reply.message == "Queued":
+            acked.append(time.time())
+        else:
+            time.sleep(0.05)  # not committed: no leader, or it lost leadership
+
+
+def unavailable(acked, start, end):
+    # Longest stretch of [start, end] without a committed write
+    times = [start] + [t for t in acked if start <= t <= end] + [end]
+    return max(b - a for a, b in zip(times, times[1:]))
+
+
+def elections(logs):
+    return sum(len(re.findall(r"became LEADER for term", open(path).read())) for path in logs)
+
+
+def run(mode_env, isolate_leader):
+    workdir = tempfile.mkdtemp(prefix="raft-partition-bench-")
+    partition_file = os.path.join(workdir, "partition")
+    partition(partition_file)
+    procs, logs = start_cluster(workdir, partition_file, **mode_env)
+    try:
+        leader = find_leader(logs)
+        victim = leader if isolate_leader else next(i for i in range(1, NODES + 1) if i != leader)
+        nodes = ",".join(f"{i}=localhost:{BASE_PORT + i}" for i in range(1, NODES + 1))
+        stop, acked = threading.Event(), []
+        thread = threading.Thread(target=writer, args=(nodes, stop, acked))
+        thread.start()
+        time.sleep(SETTLE)
+
+        cut = time.time()
+        partition(partition_file, [i for i in range(1, NODES + 1) if i != victim], [victim])
+        time.sleep(PARTITION)
+        healed = time.time()
+        partition(partition_file)
+        time.sleep(HEAL)
+        stop.set()
+        thread.join()
+        end = time.time()
+        return unavailable(acked, cut, healed), unavailable(acked, healed, end), elections(logs) - 1
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+if __name__ == '__main__':
+    print(f"{NODES}-node cluster, one node cut off for {PARTITION:.0f}s, then healed; "
+          f"longest gap between committed writes (s)")
+    print(f"{'isolated':>9} {'pre-vote/check-quorum':>22} {'partitioned':>12} {'after heal':>11} {'elections':>10}")
+    for isolate_leader in (False, True):
+        for name, env in MODES:
+            during, after, changes = run(env, isolate_leader)
+            print(f"{'leader' if isolate_leader else 'follower':>9} {name:>22} {during:>12.2f} {after:>11.2f} {changes:>10}")
@@ -0,0 +1,81 @@
+import random
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same local-cluster launcher as the throughput benchmark
+from replication_throughput_bench import start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 3
+BASE_PORT = 56500
+QUEUE_SIZE = 10000
+LOADERS = 16
+READS = 100          # calls timed per read variant
+VOTES = 300          # calls timed per write-reply mode
+PAGE = 100
+STREAM_CHUNK = 1000
+
+
+def preload(addr):
+    def load(worker):
+        stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(addr))
+        for i in range(worker, QUEUE_SIZE, LOADERS):
+            stub.AddTrack(queue_pb2.Track(id=str(i), title=f"Song {i}", artist="Bench", duration=200),
+                          metadata=[("commit-wait", "0"), ("write-reply", "ack")], timeout=10)
+
+    threads = [threading.Thread(target=load, args=(w,)) for w in range(LOADERS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+
+def timed(call, n):
+    # (mean reply bytes, sorted latencies in ms) over n calls; call() returns the bytes it received
+    sizes, latencies = [], []
+    for _ in range(n):
+        start = time.perf_counter()
+        sizes.append(call())
+        latencies.append((time.perf_counter() - start) * 1000)
+    return sum(sizes) / n, sorted(latencies)
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+if __name__ == '__main__':
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-paging-bench-"), nodes=NODES, base_port=BASE_PORT)
+    try:
+        stub = queue_pb2_grpc.QueueServiceStub(
+            grpc.insecure_channel(f"localhost:{BASE_PORT + find_leader(logs)}"))
+        preload(f"localhost:{BASE_PORT + find_leader(logs)}")
+        rng = random.Random(0)
+        runs = [
+            ("GetQueue", READS, lambda: stub.GetQueue(queue_pb2.Empty(), timeout=10).ByteSize()),
+            (f"GetQueuePage limit={PAGE}", READS,
+             lambda: stub.GetQueuePage(queue_pb2.PageRequest(offset=rng.randrange(QUEUE_SIZE), limit=PAGE),
+                                       timeout=10).ByteSize()),
+            (f"StreamQueue chunk={STREAM_CHUNK}", READS,
+             lambda: sum(m.ByteSize() for m in stub.StreamQueue(queue_pb2.PageRequest(limit=STREAM_CHUNK),
+                                                                timeout=10))),
+        ]
+        for mode in ("full", "delta", "ack"):
+            runs.append((f"VoteTrack write-reply={mode}", VOTES,
+                         lambda mode=mode: stub.VoteTrack(
+                             queue_pb2.VoteRequest(id=str(rng.randrange(QUEUE_SIZE)), up=True),
+                             metadata=[("write-reply", mode)], timeout=10).ByteSize()))
+
+        print(f"{NODES}-node cluster, {QUEUE_SIZE} queued tracks, one client on the leader")
+        print(f"{'call':>30} {'reply bytes':>12} {'p50 ms':>8} {'p99 ms':>8}")
+        for name, n, call in runs:
+            size, lat = timed(call, n)
+            print(f"{name:>30} {size:>12.0f} {percentile(lat, 50):>8.2f} {percentile(lat, 99):>8.2f}")
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
@@ -0,0 +1,80 @@
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/queue-service')))
+import queue_pb2
+from queue_state import QueueState
+
+SIZES = [10000, 100000, 1000000]
+OPS = 1000          # operations timed per (size, op)
+BUDGET = 2.0        # seconds; slow list operations stop early and report the mean so far
+
+
+def make_tracks(n):
+    return [queue_pb2.Track(id=str(i), title=f"Song {i}", artist="Bench", duration=200) for i in range(n)]
+
+
+# --- What _apply_logs and server.py did before: a plain list ---
+def list_add(queue, track):
+    if not any(x.id == track.id for x in queue):
+        queue.append(track)
+    return queue
+
+
+def list_get(queue, track_id):
+    for t in queue:
+        if t.id == track_id:
+            return t
+    return None
+
+
+def list_vote(queue, track_id):
+    for t in queue:
+        if t.id == track_id:
+            t.votes += 1
+    queue.sort(key=lambda x: -x.votes)
+    return queue
+
+
+def list_remove(queue, track_id):
+    return [x for x in queue if x.id != track_id]
+
+
+def timed(fn):
+    # Mean microseconds per call of fn(i), for i in 0..OPS-1 or until BUDGET runs out
+    start = time.perf_counter()
+    done = 0
+    while done < OPS and time.perf_counter() - start < BUDGET:
+        fn(done)
+        done += 1
+    return (time.perf_counter() - start) / done * 1e6
+
+
+def run(n):
+    rng = random.Random(n)
+    ids = [str(rng.randrange(n)) for _ in range(OPS)]
+    results = {}
+
+    queue = make_tracks(n)
+    box = [queue]
+    results["add"] = [timed(lambda i: list_add(box[0], queue_pb2.Track(id=f"new-{i}")))]
+    results["get"] = [timed(lambda i: list_get(box[0], ids[i]))]
+    results["vote"] = [timed(lambda i: list_vote(box[0], ids[i]))]
+    results["remove"] = [timed(lambda i: box.__setitem__(0, list_remove(box[0], ids[i])))]
+
+    state = QueueState(make_tracks(n))
+    results["add"].append(timed(lambda i: state.add(queue_pb2.Track(id=f"new-{i}"))))
+    results["get"].append(timed(lambda i: state.get(ids[i])))
+    results["vote"].append(timed(lambda i: state.vote(ids[i], 1)))
+    results["remove"].append(timed(lambda i: state.remove(ids[i])))
+    return results
+
+
+if __name__ == '__main__':
+    print("Mean microseconds per operation (list = previous music_queue, state = QueueState)")
+    print(f"{'tracks':>8} {'op':>7} {'list us':>12} {'state us':>10} {'speedup':>9}")
+    for n in SIZES:
+        for op, (old, new) in run(n).items():
+            print(f"{n:>8} {op:>7} {old:>12.1f} {new:>10.2f} {old / new:>8.0f}x")
@@ -0,0 +1,86 @@
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same local-cluster launcher as the throughput benchmark
+from replication_throughput_bench import start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 5
+BASE_PORT = 56300
+READERS = 15            # spread round-robin over all nodes
+DURATION = 3.0
+MODES = ["stale", "readindex", "lease"]
+
+
+def writer(addr, stop, acked):
+    # Background commit-wait writes; acked[0] only grows after a track is committed
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(addr))
+    n = 0
+    while not stop.is_set():
+        resp = stub.AddTrack(queue_pb2.Track(id=f"w-{n}", title="Song", artist="Bench", duration=200),
+                             metadata=[("commit-wait", "1")], timeout=10)
+        if resp.message == "Queued":
+            n += 1
+            acked[0] = n
+
+
+def reader(port, mode, stop_at, acked, results):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(f"localhost:{port}"))
+    latencies, stale, errors = [], 0, 0
+    while time.time() < stop_at:
+        # Every write acknowledged before the read starts must be visible
+        expected = acked[0]
+        start = time.perf_counter()
+        try:
+            queue = stub.GetQueue(queue_pb2.Empty(), metadata=[("read-mode", mode)], timeout=10).queue
+        except grpc.RpcError:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - start) * 1000)
+        if len(queue) < expected:
+            stale += 1
+    results.append((latencies, stale, errors))
+
+
+def run(mode):
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-read-bench-"), nodes=NODES, base_port=BASE_PORT)
+    try:
+        leader = find_leader(logs)
+        stop, acked, results = threading.Event(), [0], []
+        w = threading.Thread(target=writer, args=(f"localhost:{BASE_PORT + leader}", stop, acked))
+        w.start()
+        time.sleep(0.5)
+        stop_at = time.time() + DURATION
+        threads = [threading.Thread(target=reader, args=(BASE_PORT + 1 + r % NODES, mode, stop_at, acked, results))
+                   for r in range(READERS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stop.set()
+        w.join()
+
+        latencies = sorted(l for lat, _, _ in results for l in lat)
+        stale = sum(s for _, s, _ in results)
+        errors = sum(e for _, _, e in results)
+        return len(latencies) / DURATION, latencies, stale, errors
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+if __name__ == '__main__':
+    print(f"GetQueue across all {NODES} nodes, {READERS} readers, one commit-wait writer, {DURATION:.0f}s per mode")
+    print(f"{'mode':>10} {'reads/s':>8} {'p50 ms':>7} {'p99 ms':>7} {'stale reads':>12} {'errors':>7}")
+    for mode in MODES:
+        rate, lat, stale, errors = run(mode)
+        print(f"{mode:>10} {rate:>8.0f} {percentile(lat, 50):>7.1f} {percentile(lat, 99):>7.1f} {stale:>12} {errors:>7}")
@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same leader detection (and optional checkout to compare against) as the throughput benchmark
+from replication_throughput_bench import SRC, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 3
+BASE_PORT = 57900
+QUEUE_SIZES = [1000, 10000]
+READERS = 4             # GetQueue clients on the leader, one channel each
+VOTE_INTERVAL = 0.05    # the "writes" runs also vote once per interval, so the queue keeps changing
+DURATION = 5.0
+
+
+def start_cluster(workdir):
+    # Each node runs raft_server.py's own serve(), with its real handlers and worker pool
+    peers = ",".join(f"{i}=localhost:{BASE_PORT + i}" for i in range(1, NODES + 1))
+    procs, logs = [], []
+    for i in range(1, NODES + 1):
+        env = dict(os.environ, NODE_ID=str(i), PEERS=peers, PORT=str(BASE_PORT + i),
+                   DATA_DIR=os.path.join(workdir, f"node{i}"))
+        log_path = os.path.join(workdir, f"node{i}.log")
+        with open(log_path, 'w') as log:
+            procs.append(subprocess.Popen([sys.executable, "raft_server.py"], cwd=SRC, env=env,
+                                          stdout=log, stderr=subprocess.STDOUT))
+        logs.append(log_path)
+    return procs, logs
+
+
+def reader(addr, mode, size, stop_at, latencies):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(addr))
+    while time.time() < stop_at:
+        start = time.perf_counter()
+        try:
+            reply = stub.GetQueue(queue_pb2.Empty(), metadata=[("read-mode", mode)], timeout=10)
+        except grpc.RpcError:
+            continue
+        assert len(reply.queue) == size
+        latencies.append((time.perf_counter() - start) * 1000)
+
+
+def voter(stub, stop_at):
+    n = 0
+    while time.time() < stop_at:
+        stub.VoteTrack(queue_pb2.VoteRequest(id=f"t-{n * 7919 % 1000}", up=True),
+                       metadata=[("write-reply", "ack")], timeout=10)
+        n += 1
+        time.sleep(VOTE_INTERVAL)
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+def run(size):
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-view-bench-"))
+    try:
+        leader = find_leader(logs)
+        addr = f"localhost:{BASE_PORT + leader}"
+        stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(addr))
+        for start in range(0, size, 500):
+            batch = [queue_pb2.Track(id=f"t-{i}", title=f"Song {i}", artist="Bench", duration=200)
+                     for i in range(start, min(start + 500, size))]
+            stub.AddTracks(queue_pb2.TrackBatch(tracks=batch), metadata=[("write-reply", "ack")], timeout=30)
+
+        results = []
+        for mode, writes in [("stale", False), ("readindex", False), ("stale", True)]:
+            stop_at = time.time() + DURATION
+            reads = [[] for _ in range(READERS)]
+            threads = [threading.Thread(target=reader, args=(addr, mode, size, stop_at, reads[r]))
+                       for r in range(READERS)]
+            if writes:
+                threads.append(threading.Thread(target=voter, args=(stub, stop_at)))
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            results.append((mode + (" + votes" if writes else ""), sorted(l for lat in reads for l in lat)))
+        return results
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+if __name__ == '__main__':
+    print(f"{READERS} GetQueue clients on the leader, {NODES} nodes, {DURATION:.0f}s per run; "
+          f"'+ votes' adds a VoteTrack every {VOTE_INTERVAL * 1000:.0f} ms ({SRC})")
+    print(f"{'tracks':>7} {'read mode':>17} {'reads/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    for size in QUEUE_SIZES:
+        for label, reads in run(size):
+            print(f"{size:>7} {label:>17} {len(reads) / DURATION:>8.0f} {percentile(reads, 50):>8.1f} "
+                  f"{percentile(reads, 99):>8.1f}")
@@ -0,0 +1,135 @@
+import os
+import random
+import sys
+import threading
+import time
+
+import redis
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/queue-service')))
+import queue_pb2
+from server import QueueServiceServicer
+
+# Talks to a real Redis; point REDIS_HOST/REDIS_PORT at a scratch instance,
+# the benchmark deletes the queue keys it uses
+QUEUE_SIZE = 1000
+VOTER_COUNTS = [1, 50]
+DURATION = 3.0
+
+
+class NoMetadata:
+    # Stands in for the gRPC context: no per-call metadata, so server defaults apply
+    def invocation_metadata(self):
+        return ()
+
+
+CONTEXT = NoMetadata()
+
+
+def make_tracks():
+    return [queue_pb2.Track(id=str(i), title=f"Song {i}", artist="Bench", duration=200) for i in range(QUEUE_SIZE)]
+
+
+# --- What server.py's VoteTrack did before: rewrite the whole list ---
+class ListQueue:
+    def __init__(self, r):
+        self.redis = r
+        self.queue_key = 'queue'
+
+    def load(self, tracks):
+        self.redis.delete(self.queue_key)
+        self.redis.rpush(self.queue_key, *[t.SerializeToString() for t in tracks])
+
+    def _get_queue(self):
+        queue = []
+        for data in self.redis.lrange(self.queue_key, 0, -1):
+            t = queue_pb2.Track()
+            t.ParseFromString(data)
+            queue.append(t)
+        return queue
+
+    def vote(self, track_id, up):
+        queue = self._get_queue()
+        for t in queue:
+            if t.id == track_id:
+                t.votes += 1 if up else -1
+        queue.sort(key=lambda x: -x.votes)
+        self.redis.delete(self.queue_key)
+        for t in queue:
+            self.redis.rpush(self.queue_key, t.SerializeToString())
+
+    def total_votes(self):
+        return sum(t.votes for t in self._get_queue()), len(self.redis.lrange(self.queue_key, 0, -1))
+
+
+class ScriptQueue:
+    def __init__(self, r):
+        self.servicer = QueueServiceServicer()
+        self.redis = r
+
+    def load(self, tracks):
+        s = self.servicer
+        self.redis.delete(s.tracks_key, s.order_key, s.seq_key)
+        for t in tracks:
+            s.AddTrack(t, CONTEXT)
+
+    def vote(self, track_id, up):
+        self.servicer.VoteTrack(queue_pb2.VoteRequest(id=track_id, up=up), CONTEXT)
+
+    def total_votes(self):
+        queue = self.servicer.GetQueue(queue_pb2.Empty(), CONTEXT).queue
+        return sum(t.votes for t in queue), len(queue)
+
+
+class ScriptVoteOnly(ScriptQueue):
+    # Just the vote script; VoteTrack adds a read of the queue to echo it back
+    def vote(self, track_id, up):
+        s = self.servicer
+        s.vote_script(keys=[s.order_key], args=[track_id, 1 if up else -1])
+
+
+def redis_usec(r):
+    # Total time Redis itself spent executing commands since the last reset
+    return sum(stat['usec'] for stat in r.info('commandstats').values())
+
+
+def run(r, impl, voters):
+    impl.load(make_tracks())
+    r.config_resetstat()
+    stop_at = time.time() + DURATION
+    latencies, net = [[] for _ in range(voters)], [0] * voters
+
+    def voter(worker):
+        rng = random.Random(worker)
+        while time.time() < stop_at:
+            up = rng.random() < 0.7
+            start = time.perf_counter()
+            impl.vote(str(rng.randrange(QUEUE_SIZE)), up)
+            latencies[worker].append((time.perf_counter() - start) * 1000)
+            net[worker] += 1 if up else -1
+
+    threads = [threading.Thread(target=voter, args=(w,)) for w in range(voters)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    lat = sorted(l for worker in latencies for l in worker)
+    busy = redis_usec(r) / len(lat)
+    total, size = impl.total_votes()
+    return len(lat) / DURATION, lat, busy, sum(net) - total, size
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+if __name__ == '__main__':
+    r = redis.Redis(host=os.environ.get('REDIS_HOST', 'localhost'), port=int(os.environ.get('REDIS_PORT', 6379)))
+    print(f"VoteTrack against Redis, {QUEUE_SIZE} queued tracks, {DURATION:.0f}s per run")
+    print("list = previous server.py, script = VoteTrack now, vote-only = the vote script without the queue echo")
+    print(f"{'voters':>7} {'impl':>9} {'votes/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'redis us/vote':>14} {'lost votes':>11} {'tracks left':>12}")
+    impls = (("list", ListQueue(r)), ("script", ScriptQueue(r)), ("vote-only", ScriptVoteOnly(r)))
+    for voters in VOTER_COUNTS:
+        for name, impl in impls:
+            rate, lat, busy, lost, size = run(r, impl, voters)
+            print(f"{voters:>7} {name:>9} {rate:>8.0f} {percentile(lat, 50):>8.2f} {percentile(lat, 99):>8.2f} {busy:>14.0f} {lost:>11} {size:>12}")
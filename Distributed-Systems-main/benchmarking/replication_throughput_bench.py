@@ -0,0 +1,125 @@
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+QUEUE_SERVICE = os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/queue-service'))
+# Optional argument: another queue-service checkout to compare against
+SRC = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else QUEUE_SERVICE
+sys.path.append(QUEUE_SERVICE)
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 3
+BASE_PORT = 56100
+CLIENT_COUNTS = [1, 2, 4, 8, 16, 32]
+DURATION = 3.0          # seconds of AddTrack load per run
+CATCH_UP_TIMEOUT = 30.0
+
+# Runs one node in-process with a gRPC server on PORT (older revisions hardcode 50051 in serve())
+NODE_MAIN = """
+import os, sys
+from concurrent import futures
+import grpc, raft_server, raft_pb2_grpc, queue_pb2_grpc
+server = grpc.server(futures.ThreadPoolExecutor(max_workers=40 + int(os.environ.get('MAX_WATCHERS', 0))))
+node = raft_server.RaftServer()
+raft_pb2_grpc.add_RaftServiceServicer_to_server(node, server)
+queue_pb2_grpc.add_QueueServiceServicer_to_server(node, server)
+server.add_insecure_port('[::]:' + os.environ['PORT'])
+server.start()
+server.wait_for_termination()
+"""
+
+
+def start_cluster(workdir, nodes=NODES, base_port=BASE_PORT, **extra_env):
+    peers = ",".join(f"{i}=localhost:{base_port + i}" for i in range(1, nodes + 1))
+    procs, logs = [], []
+    for i in range(1, nodes + 1):
+        env = dict(os.environ, NODE_ID=str(i), PEERS=peers, PORT=str(base_port + i), **extra_env,
+                   DATA_DIR=os.path.join(workdir, f"node{i}"))
+        log_path = os.path.join(workdir, f"node{i}.log")
+        with open(log_path, 'w') as log:
+            procs.append(subprocess.Popen([sys.executable, '-c', NODE_MAIN], cwd=SRC, env=env,
+                                          stdout=log, stderr=subprocess.STDOUT))
+        logs.append(log_path)
+    return procs, logs
+
+
+def find_leader(logs, timeout=15.0):
+    # The node that logged the highest-term election win
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        best = None
+        for i, path in enumerate(logs, start=1):
+            with open(path) as f:
+                for term in re.findall(r"became LEADER for term (\d+)", f.read()):
+                    if best is None or int(term) > best[0]:
+                        best = (int(term), i)
+        if best:
+            time.sleep(0.5)  # let the leader settle its followers
+            return best[1]
+        time.sleep(0.2)
+    raise RuntimeError("No leader elected")
+
+
+def client(addr, worker, stop_at, acked):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(addr))
+    n = 0
+    while time.time() < stop_at:
+        track = queue_pb2.Track(id=f"{worker}-{n}", title=f"Song {n}", artist="Bench", duration=200)
+        try:
+            stub.AddTrack(track, timeout=5)
+            n += 1
+        except grpc.RpcError:
+            pass
+    acked[worker] = n
+
+
+def queue_length(port):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(f"localhost:{port}"))
+    try:
+        return len(stub.GetQueue(queue_pb2.Empty(), timeout=5).queue)
+    except grpc.RpcError:
+        return -1
+
+
+def run(clients):
+    workdir = tempfile.mkdtemp(prefix="raft-repl-bench-")
+    procs, logs = start_cluster(workdir)
+    try:
+        leader = find_leader(logs)
+        acked = [0] * clients
+        start = time.time()
+        threads = [threading.Thread(target=client, args=(f"localhost:{BASE_PORT + leader}", w, start + DURATION, acked))
+                   for w in range(clients)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        total = sum(acked)
+
+        # Replicated = every follower has applied every acknowledged track
+        followers = [BASE_PORT + i for i in range(1, NODES + 1) if i != leader]
+        while time.time() - start < DURATION + CATCH_UP_TIMEOUT:
+            if all(queue_length(port) >= total for port in followers):
+                break
+            time.sleep(0.05)
+        replicated_s = time.time() - start
+        return total / DURATION, total / replicated_s
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+if __name__ == '__main__':
+    print(f"AddTrack throughput, {NODES}-node cluster, {DURATION:.0f}s per run ({SRC})")
+    print(f"{'clients':>8} {'acked ops/s':>12} {'replicated ops/s':>17}")
+    for clients in CLIENT_COUNTS:
+        acked_rate, replicated_rate = run(clients)
+        print(f"{clients:>8} {acked_rate:>12.0f} {replicated_rate:>17.0f}")
@@ -0,0 +1,75 @@
+import tempfile
+import threading
+import time
+import uuid
+
+import grpc
+
+# Same local-cluster launcher as the throughput benchmark
+from replication_throughput_bench import start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 3
+BASE_PORT = 57600
+CLIENTS = 8
+DURATION = 5.0
+# Deadline of each attempt; a vote that misses it is sent again until one attempt is answered
+ATTEMPT_TIMEOUTS = [10.0, 0.03, 0.02, 0.015]
+
+
+def voter(stub, sessions, timeout, stop_at, results):
+    # Upvotes one track; with sessions every attempt of a vote carries the same seq
+    client_id, seq, acked, latencies = uuid.uuid4().hex, 0, 0, []
+    while time.time() < stop_at:
+        seq += 1
+        metadata = [("write-reply", "ack")]
+        if sessions:
+            metadata += [("client-id", client_id), ("seq", str(seq)), ("seq-floor", str(seq))]
+        start = time.perf_counter()
+        while True:
+            try:
+                stub.VoteTrack(queue_pb2.VoteRequest(id="hit", up=True), metadata=metadata, timeout=timeout)
+                break
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.DEADLINE_EXCEEDED:
+                    raise
+        latencies.append((time.perf_counter() - start) * 1000)
+        acked += 1
+    results.append((acked, latencies))
+
+
+def run(sessions, timeout):
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-dedup-bench-"), nodes=NODES, base_port=BASE_PORT)
+    try:
+        leader = find_leader(logs)
+        stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(f"localhost:{BASE_PORT + leader}"))
+        stub.AddTrack(queue_pb2.Track(id="hit", title="Song", artist="Bench", duration=200))
+        stop_at, results = time.time() + DURATION, []
+        threads = [threading.Thread(target=voter, args=(stub, sessions, timeout, stop_at, results))
+                   for _ in range(CLIENTS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        votes = stub.GetMetadata(queue_pb2.TrackId(id="hit")).votes
+        return sum(a for a, _ in results), votes, sorted(l for _, lat in results for l in lat)
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+if __name__ == '__main__':
+    print(f"VoteTrack from {CLIENTS} clients retried on DEADLINE_EXCEEDED, {NODES} nodes, {DURATION:.0f}s per run")
+    print(f"{'sessions':>8} {'attempt timeout ms':>19} {'acked votes':>12} {'applied votes':>14} {'p50 ms':>8} "
+          f"{'p99 ms':>8}")
+    for timeout in ATTEMPT_TIMEOUTS:
+        for sessions in (False, True):
+            acked, votes, lat = run(sessions, timeout)
+            print(f"{'on' if sessions else 'off':>8} {timeout * 1000:>19.0f} {acked:>12} {votes:>14} "
+                  f"{percentile(lat, 50):>8.1f} {percentile(lat, 99):>8.1f}")
@@ -0,0 +1,67 @@
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+# Same leader detection as the throughput benchmark, same writer as the partition benchmark
+from replication_throughput_bench import QUEUE_SERVICE, find_leader
+from partition_bench import writer, unavailable, elections
+
+NODES = 3
+BASE_PORT = 57100
+SETTLE = 3.0     # seconds of writes before the first restart
+CATCH_UP = 4.0   # seconds a restarted node gets before the next one goes down
+# How a node is stopped: SIGKILL is a leader that just dies (what SIGTERM
+# did before nodes handled it), SIGTERM lets a leader hand over first
+MODES = [("kill", signal.SIGKILL), ("transfer", signal.SIGTERM)]
+
+
+def start_node(i, workdir):
+    # Runs serve() itself, which owns the SIGTERM handling
+    peers = ",".join(f"{n}=localhost:{BASE_PORT + n}" for n in range(1, NODES + 1))
+    env = dict(os.environ, NODE_ID=str(i), PEERS=peers, PORT=str(BASE_PORT + i),
+               DATA_DIR=os.path.join(workdir, f"node{i}"))
+    with open(os.path.join(workdir, f"node{i}.log"), 'a') as log:
+        return subprocess.Popen([sys.executable, "raft_server.py"], cwd=QUEUE_SERVICE, env=env,
+                                stdout=log, stderr=subprocess.STDOUT)
+
+
+def run(stop_signal):
+    # Restart every node once, followers before the leader, while one client writes
+    workdir = tempfile.mkdtemp(prefix="raft-restart-bench-")
+    procs = {i: start_node(i, workdir) for i in range(1, NODES + 1)}
+    logs = [os.path.join(workdir, f"node{i}.log") for i in range(1, NODES + 1)]
+    try:
+        leader = find_leader(logs)
+        nodes = ",".join(f"{i}=localhost:{BASE_PORT + i}" for i in range(1, NODES + 1))
+        stop, acked = threading.Event(), []
+        thread = threading.Thread(target=writer, args=(nodes, stop, acked))
+        thread.start()
+        time.sleep(SETTLE)
+
+        start = time.time()
+        for i in sorted(procs, key=lambda n: n == leader):
+            procs[i].send_signal(stop_signal)
+            procs[i].wait()
+            procs[i] = start_node(i, workdir)
+            time.sleep(CATCH_UP)
+        stop.set()
+        thread.join()
+        end = time.time()
+        return unavailable(acked, start, end), len([t for t in acked if t >= start]) / (end - start), \
+            elections(logs) - 1
+    finally:
+        for p in procs.values():
+            p.kill()
+            p.wait()
+
+
+if __name__ == '__main__':
+    print(f"Rolling restart of a {NODES}-node cluster, leader last, one client writing")
+    print(f"{'stop':>9} {'longest gap s':>14} {'writes/s':>9} {'elections':>10}")
+    for name, stop_signal in MODES:
+        gap, rate, changes = run(stop_signal)
+        print(f"{name:>9} {gap:>14.3f} {rate:>9.0f} {changes:>10}")
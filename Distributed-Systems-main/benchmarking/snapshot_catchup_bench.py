@@ -0,0 +1,82 @@
+import os
+import sys
+import logging
+import tempfile
+import time
+
+os.environ.setdefault("NODE_ID", "1")
+os.environ.setdefault("PEERS", "1=raft-node1:50051")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/queue-service')))
+import raft_pb2
+import queue_pb2
+import raft_server
+
+HISTORY_LENGTHS = [10000, 50000, 100000]
+QUEUE_SIZE = 200          # tracks live in the queue at any time
+SNAPSHOT_THRESHOLD = 1000
+
+
+def make_history(length):
+    # Steady churn: the queue stays at QUEUE_SIZE tracks while the log keeps growing
+    entries = []
+    for i in range(length):
+        if i < QUEUE_SIZE or i % 2 == 0:
+            track = queue_pb2.Track(id=str(i), title=f"Song {i}", artist="Bench", duration=200)
+            entries.append(raft_pb2.LogEntry(term=1, op=raft_pb2.LogEntry.ADD, track=track))
+        else:
+            victim = queue_pb2.TrackId(id=str(i - QUEUE_SIZE - 1))
+            entries.append(raft_pb2.LogEntry(term=1, op=raft_pb2.LogEntry.REMOVE, track_id=victim))
+    return entries
+
+
+def new_server():
+    os.environ["DATA_DIR"] = tempfile.mkdtemp(prefix="raft-bench-")
+    raft_server.DATA_DIR = os.environ["DATA_DIR"]
+    server = raft_server.RaftServer()
+    server.stop()
+    return server
+
+
+def apply_all(server, entries, threshold):
+    raft_server.SNAPSHOT_THRESHOLD = threshold
+    with server.lock:
+        for entry in entries:
+            server.log.append(entry)
+            server.commit_index = server._last_log_index()
+            server._apply_logs()
+
+
+def catch_up_full_log(entries):
+    # Fresh follower replays the whole history
+    payload = sum(e.ByteSize() for e in entries)
+    follower = new_server()
+    start = time.perf_counter()
+    apply_all(follower, entries, threshold=len(entries) + 1)
+    return payload, time.perf_counter() - start, len(follower.log)
+
+
+def catch_up_snapshot(entries):
+    # Leader compacts every SNAPSHOT_THRESHOLD entries; follower installs snapshot + suffix
+    leader = new_server()
+    apply_all(leader, entries, threshold=SNAPSHOT_THRESHOLD)
+    suffix = list(leader.log)
+    payload = len(leader.snapshot_data) + sum(e.ByteSize() for e in suffix)
+    follower = new_server()
+    start = time.perf_counter()
+    with follower.lock:
+        follower._restore_state(leader.snapshot_data)
+        follower.snapshot_index = follower.last_applied = follower.commit_index = leader.snapshot_index
+        follower.snapshot_term = leader.snapshot_term
+    apply_all(follower, suffix, threshold=len(entries) + 1)
+    return payload, time.perf_counter() - start, len(leader.log)
+
+
+if __name__ == '__main__':
+    logging.getLogger().setLevel(logging.WARNING)
+    print(f"Fresh follower catch-up, queue held at {QUEUE_SIZE} tracks, snapshot every {SNAPSHOT_THRESHOLD} entries")
+    print(f"{'history':>8} {'full-log bytes':>15} {'replay s':>9} {'snapshot bytes':>15} {'install s':>10} {'leader log len':>15}")
+    for length in HISTORY_LENGTHS:
+        entries = make_history(length)
+        full_bytes, full_s, _ = catch_up_full_log(entries)
+        snap_bytes, snap_s, kept = catch_up_snapshot(entries)
+        print(f"{length:>8} {full_bytes:>15} {full_s:>9.2f} {snap_bytes:>15} {snap_s:>10.3f} {kept:>15}")
@@ -0,0 +1,62 @@
+import random
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same local-cluster launcher as the throughput benchmark
+from replication_throughput_bench import start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 3
+BASE_PORT = 56400
+QUEUE_SIZE = 1000
+VOTER_COUNTS = [1, 8, 32]
+DURATION = 3.0
+
+
+def preload(addr):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(addr))
+    for i in range(QUEUE_SIZE):
+        stub.AddTrack(queue_pb2.Track(id=str(i), title=f"Song {i}", artist="Bench", duration=200),
+                      metadata=[("commit-wait", "0")], timeout=10)
+
+
+def voter(addr, worker, commit_wait, stop_at, counts):
+    stub = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(addr))
+    rng = random.Random(worker)
+    metadata = [("commit-wait", "1" if commit_wait else "0")]
+    n = 0
+    while time.time() < stop_at:
+        vote = queue_pb2.VoteRequest(id=str(rng.randrange(QUEUE_SIZE)), up=rng.random() < 0.7)
+        stub.VoteTrack(vote, metadata=metadata, timeout=10)
+        n += 1
+    counts[worker] = n
+
+
+if __name__ == '__main__':
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-vote-bench-"), nodes=NODES, base_port=BASE_PORT)
+    try:
+        leader = f"localhost:{BASE_PORT + find_leader(logs)}"
+        preload(leader)
+        print(f"VoteTrack throughput, {NODES}-node cluster, {QUEUE_SIZE} queued tracks, {DURATION:.0f}s per run")
+        print(f"{'voters':>7} {'commit-wait votes/s':>20} {'fire-and-forget votes/s':>24}")
+        for voters in VOTER_COUNTS:
+            rates = []
+            for commit_wait in (True, False):
+                counts = [0] * voters
+                stop_at = time.time() + DURATION
+                threads = [threading.Thread(target=voter, args=(leader, w, commit_wait, stop_at, counts))
+                           for w in range(voters)]
+                for t in threads:
+                    t.start()
+                for t in threads:
+                    t.join()
+                rates.append(sum(counts) / DURATION)
+            print(f"{voters:>7} {rates[0]:>20.0f} {rates[1]:>24.0f}")
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
@@ -0,0 +1,56 @@
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import time
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '../microservices-grpc/queue-service')))
+import raft_pb2
+import queue_pb2
+from raft_storage import RaftStorage
+
+TOTAL_APPENDS = 2000
+WRITER_COUNTS = [1, 4, 16, 64]
+
+
+def make_entry(i):
+    track = queue_pb2.Track(id=str(i), title=f"Song {i}", artist="Bench", duration=200)
+    return raft_pb2.LogEntry(term=1, op=raft_pb2.LogEntry.ADD, track=track)
+
+
+def writer(storage, lock, n, offset):
+    # Mirrors AddTrack: append under the raft lock, then wait for durability outside it
+    for i in range(n):
+        with lock:
+            index = storage.append([make_entry(offset + i)])
+        storage.sync(index)
+
+
+def bench(sync_mode, writers, total=TOTAL_APPENDS):
+    data_dir = tempfile.mkdtemp(prefix="wal-bench-")
+    try:
+        storage = RaftStorage(data_dir, sync_mode=sync_mode)
+        storage.load_log()
+        lock = threading.Lock()
+        per_thread = total // writers
+        threads = [threading.Thread(target=writer, args=(storage, lock, per_thread, w * per_thread))
+                   for w in range(writers)]
+        start = time.time()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.time() - start
+        storage.close()
+        return per_thread * writers / elapsed
+    finally:
+        shutil.rmtree(data_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    print(f"WAL appends/sec ({TOTAL_APPENDS} durable appends per run)")
+    print(f"{'writers':>8} {'fsync per entry':>16} {'group commit':>13}")
+    for writers in WRITER_COUNTS:
+        per_entry = bench("entry", writers)
+        group = bench("group", writers)
+        print(f"{writers:>8} {per_entry:>16.0f} {group:>13.0f}")
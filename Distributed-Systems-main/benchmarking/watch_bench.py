@@ -0,0 +1,113 @@
+import os
+import tempfile
+import threading
+import time
+
+import grpc
+
+# Same local-cluster launcher as the throughput benchmark
+from replication_throughput_bench import start_cluster, find_leader
+import queue_pb2
+import queue_pb2_grpc
+
+NODES = 3
+BASE_PORT = 56600
+QUEUE_SIZE = 1000
+LISTENERS = 200         # spread round-robin over all nodes
+POLL_INTERVAL = 2.0     # how often a polling client re-reads the queue
+IDLE = 10.0             # seconds of no writes measured per mode
+WRITES = 50
+
+
+def cpu_seconds(procs):
+    # user + system CPU of the node processes so far
+    ticks = 0
+    for p in procs:
+        with open(f"/proc/{p.pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        ticks += int(fields[11]) + int(fields[12])
+    return ticks / os.sysconf('SC_CLK_TCK')
+
+
+def poller(stub, stop, received):
+    while not stop.wait(POLL_INTERVAL):
+        received[0] += stub.GetQueue(queue_pb2.Empty(), timeout=30).ByteSize()
+
+
+def watcher(call, ready, received, seen):
+    try:
+        for event in call:
+            received[0] += event.ByteSize()
+            if event.kind == queue_pb2.QueueEvent.SNAPSHOT:
+                ready.release()
+            elif event.kind == queue_pb2.QueueEvent.VOTED:
+                seen.append((event.track.id, time.perf_counter()))
+    except grpc.RpcError:
+        pass  # cancelled at the end of the run
+
+
+def idle_load(procs, received):
+    cpu, start_bytes = cpu_seconds(procs), received[0]
+    time.sleep(IDLE)
+    return (cpu_seconds(procs) - cpu) / IDLE * 100, (received[0] - start_bytes) / IDLE
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+if __name__ == '__main__':
+    procs, logs = start_cluster(tempfile.mkdtemp(prefix="raft-watch-bench-"), nodes=NODES, base_port=BASE_PORT,
+                                MAX_WATCHERS=str(LISTENERS))
+    try:
+        leader = queue_pb2_grpc.QueueServiceStub(
+            grpc.insecure_channel(f"localhost:{BASE_PORT + find_leader(logs)}"))
+        for i in range(QUEUE_SIZE):
+            leader.AddTrack(queue_pb2.Track(id=str(i), title=f"Song {i}", artist="Bench", duration=200),
+                            metadata=[("commit-wait", "0"), ("write-reply", "ack")], timeout=10)
+        stubs = [queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(f"localhost:{BASE_PORT + n}"))
+                 for n in range(1, NODES + 1)]
+        time.sleep(1.0)
+        print(f"{NODES}-node cluster, {QUEUE_SIZE} queued tracks, {LISTENERS} listeners, {IDLE:.0f}s idle per mode")
+        print(f"{'listeners':>22} {'cluster CPU %':>14} {'bytes/s to clients':>19}")
+        print(f"{'none':>22} {idle_load(procs, [0])[0]:>14.1f} {0:>19}")
+
+        stop, received = threading.Event(), [0]
+        threads = [threading.Thread(target=poller, args=(stubs[i % NODES], stop, received)) for i in range(LISTENERS)]
+        for t in threads:
+            t.start()
+        time.sleep(POLL_INTERVAL)
+        cpu, rate = idle_load(procs, received)
+        print(f"{f'GetQueue every {POLL_INTERVAL:.0f}s':>22} {cpu:>14.1f} {rate:>19.0f}")
+        stop.set()
+        for t in threads:
+            t.join()
+
+        ready, received, seen = threading.Semaphore(0), [0], []
+        calls = [stubs[i % NODES].WatchQueue(queue_pb2.WatchRequest()) for i in range(LISTENERS)]
+        threads = [threading.Thread(target=watcher, args=(call, ready, received, seen)) for call in calls]
+        for t in threads:
+            t.start()
+        for _ in range(LISTENERS):
+            ready.acquire()
+        cpu, rate = idle_load(procs, received)
+        print(f"{'WatchQueue':>22} {cpu:>14.1f} {rate:>19.0f}")
+
+        # Delivery latency: from just before each acknowledged vote to its event at every watcher
+        sent = {}
+        for i in range(WRITES):
+            sent[str(i)] = time.perf_counter()
+            leader.VoteTrack(queue_pb2.VoteRequest(id=str(i), up=True), metadata=[("write-reply", "ack")], timeout=10)
+            time.sleep(0.05)
+        time.sleep(1.0)
+        for call in calls:
+            call.cancel()
+        for t in threads:
+            t.join()
+        lat = sorted((at - sent[track_id]) * 1000 for track_id, at in seen)
+        print(f"vote to event at {LISTENERS} watchers: {len(lat)}/{LISTENERS * WRITES} delivered, "
+              f"p50 {percentile(lat, 50):.1f} ms, p99 {percentile(lat, 99):.1f} ms")
+    finally:
+        for p in procs:
+            p.kill()
+            p.wait()
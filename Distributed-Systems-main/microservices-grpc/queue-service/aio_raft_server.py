@@ -0,0 +1,585 @@
+import asyncio
+import heapq
+import signal
+import time
+
+import grpc
+
+import raft_pb2
+import raft_pb2_grpc
+import queue_pb2
+import queue_pb2_grpc
+from raft_server import (RaftServer, logger, NODE_ID, PORT, HEARTBEAT_INTERVAL, RPC_TIMEOUT, ELECTION_MAX,
+                         MAX_APPEND_ENTRIES, MAX_INFLIGHT_APPENDS, CLIENT_APPLY_TIMEOUT, MAX_WATCHERS, WATCH_IDLE_CHECK,
+                         MAX_MESSAGE_BYTES, MEMBERSHIP_TIMEOUT, SNAPSHOT_THRESHOLD, FORWARDED_METADATA,
+                         add_queue_service)
+
+# Same node as raft_server.py (same config, log format and RPCs, the two can
+# share a cluster) served by grpc.aio on one event loop: no worker pool to cap
+# concurrent clients, timers sleep until their deadline, RPC fan-out runs as
+# tasks, and a client waiting for its commit is a future instead of a thread.
+
+_LOST = object()  # resolves the commit waiters of a leader that stepped down
+
+
+class Signal:
+    # asyncio stand-in for the threading.Condition objects of RaftServer:
+    # notify_all() wakes every coroutine currently in wait()
+    def __init__(self):
+        self._event = asyncio.Event()
+
+    def notify_all(self):
+        self._event.set()
+        self._event = asyncio.Event()
+
+    async def wait(self, timeout=None):
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+class LoopTimers:
+    # The Timers interface of RaftServer on the event loop's own timer heap
+    def call_at(self, deadline, callback):
+        return asyncio.get_running_loop().call_later(max(0.0, deadline - time.time()), callback)
+
+    def cancel(self, timer):
+        if timer is not None:
+            timer.cancel()
+
+
+class AioRaftServer(RaftServer):
+    # Everything runs on the event loop thread, applying entries included, so
+    # the inherited code never contends for self.lock or state_lock. The
+    # fsyncs of the log, of the term and vote, and of our own snapshots run on
+    # executor threads; what still blocks the loop is rare: the directory
+    # fsyncs of segment rolls, compaction and truncation, sync_mode="entry",
+    # and saving a snapshot the leader sent us
+
+    def _start(self):
+        # Called at the end of RaftServer.__init__, inside the running loop
+        self.replicate_cond = Signal()
+        self.commit_cond = Signal()
+        self.apply_cond = Signal()
+        self.read_cond = Signal()
+        self.watch_cond = Signal()
+        self.commit_waiters = []  # heap of (log index, future) for client writes awaiting apply
+        self.flush = None  # the fsync in progress
+        self.meta_flush = None  # the save_meta in progress
+        self.meta_dirty = False  # term or vote changed since it started
+        self.snapshotting = None  # the snapshot being saved
+        self.timers = LoopTimers()
+        self.tasks = []
+
+    def _connect(self, pid, addr):
+        self.channels[pid] = channel = grpc.aio.insecure_channel(addr)
+        self.peer_stubs[pid] = stub = raft_pb2_grpc.RaftServiceStub(channel)
+        self.peer_queue_stubs[pid] = queue_pb2_grpc.QueueServiceStub(channel)
+        self.tasks.append(asyncio.ensure_future(self._replicator(pid, stub)))
+
+    def _disconnect(self, pid):
+        del self.peer_stubs[pid], self.peer_queue_stubs[pid]
+        asyncio.ensure_future(self.channels.pop(pid).close())
+        self.replicate_cond.notify_all()
+
+    async def _sync(self, index):
+        # Group commit: one fsync at a time runs on an executor thread and
+        # covers everything written before it started; other writers await it
+        while self.storage.synced_index < index:
+            if self.flush is None or self.flush.done():
+                self.flush = asyncio.get_running_loop().run_in_executor(None, self.storage.sync)
+            await asyncio.shield(self.flush)
+
+    def _sync_own(self, index):
+        # Our copy of log[index] counts once _count_own has synced it; until
+        # then only entries before it may, which cannot commit on their own
+        self.match_index[NODE_ID] = min(self.match_index.get(NODE_ID, -1), index - 1)
+        asyncio.ensure_future(self._count_own(index, self.current_term))
+
+    async def _count_own(self, index, term):
+        await self._sync(index)
+        if self.state == "LEADER" and self.current_term == term:
+            self.match_index[NODE_ID] = max(self.match_index[NODE_ID], index)
+            self._advance_commit_index()
+
+    def _persist_meta(self):
+        # Saved off the loop; RPC replies and vote requests wait for it with _meta_synced()
+        self.meta_dirty = True
+        if self.meta_flush is None or self.meta_flush.done():
+            self.meta_flush = asyncio.ensure_future(self._flush_meta())
+
+    async def _flush_meta(self):
+        # One save_meta at a time, each writing the latest term and vote
+        while self.meta_dirty:
+            self.meta_dirty = False
+            await asyncio.get_running_loop().run_in_executor(None, self.storage.save_meta,
+                                                             self.current_term, self.voted_for)
+
+    async def _meta_synced(self):
+        if self.meta_flush is not None:
+            await asyncio.shield(self.meta_flush)
+
+    def _maybe_snapshot(self):
+        if self.last_applied - self.snapshot_index >= SNAPSHOT_THRESHOLD and \
+                (self.snapshotting is None or self.snapshotting.done()):
+            self.snapshotting = asyncio.ensure_future(self._snapshot())
+
+    async def _snapshot(self):
+        # The state is captured on the loop and written off it; applying goes on meanwhile
+        index, term = self.last_applied, self._term_at(self.last_applied)
+        data = self._snapshot_state(index)
+        await asyncio.get_running_loop().run_in_executor(None, self.storage.save_snapshot, index, term, data)
+        if index > self.snapshot_index:
+            self._compact_log(index, term, data)
+
+    # =========================================================
+    # Elections
+    # =========================================================
+    def _request_votes(self, args):
+        asyncio.ensure_future(asyncio.gather(*(self._send_vote_request(pid, self.peer_stubs[pid], args)
+                                               for pid in self.voters - {NODE_ID})))
+
+    async def _send_vote_request(self, pid, stub, args):
+        await self._meta_synced()  # our vote for ourselves is on disk first
+        self.logger.info(f"sends RPC RequestVote to Node {pid}")
+        try:
+            resp = await stub.RequestVote(args, timeout=RPC_TIMEOUT)
+        except grpc.RpcError as e:
+            self.logger.warning(f"Vote request to Node {pid} failed: {e.code()}")
+            return
+        self._on_vote_reply(args, resp)
+
+    def _become_follower(self, term):
+        super()._become_follower(term)
+        # Pending client writes can no longer commit here
+        while self.commit_waiters:
+            index, future = heapq.heappop(self.commit_waiters)
+            if not future.done():
+                future.set_result(_LOST)
+
+    # =========================================================
+    # Log replication
+    # =========================================================
+    async def _replicator(self, pid, stub):
+        # One task per follower; the replies are handled by RaftServer's callbacks
+        while not self._stop.is_set() and self.peer_stubs.get(pid) is stub:
+            timeout = None
+            now = time.time()
+            if self.state != "LEADER":
+                pass
+            elif now < self.retry_at[pid]:
+                timeout = self.retry_at[pid] - now
+            elif self.send_index[pid] <= self.snapshot_index:
+                if pid not in self.snapshots_in_flight and self.inflight[pid] == 0:
+                    self._send_snapshot(pid, stub)
+                timeout = HEARTBEAT_INTERVAL
+            elif self.inflight[pid] >= MAX_INFLIGHT_APPENDS or \
+                    (self.inflight[pid] and self._last_log_index() - self.send_index[pid] < MAX_APPEND_ENTRIES):
+                # A reply (or its timeout) will wake us. Client writes arrive
+                # one per loop callback, so unlike the thread server nothing
+                # batches them: only pipeline a second RPC for a full one.
+                pass
+            elif (self.send_index[pid] <= self._last_log_index() or self.sent_commit[pid] < self.commit_index
+                  or self.sent_read_seq[pid] < self.read_seq or now >= self.heartbeat_due[pid]):
+                self._send_append(pid, stub)
+                continue
+            else:
+                timeout = self.heartbeat_due[pid] - now
+            await self.replicate_cond.wait(timeout)
+
+    def _send_append(self, pid, stub):
+        args = self._build_append_args(pid, self.send_index[pid])
+        self.send_index[pid] += len(args.entries)
+        on_reply = self._track_append(pid, args)
+        self.logger.info(f"sends RPC AppendEntries to Node {pid}")
+        call = stub.AppendEntries(self._compress_entries(args), timeout=RPC_TIMEOUT)
+        asyncio.ensure_future(call).add_done_callback(on_reply)
+
+    def _send_snapshot(self, pid, stub):
+        self.snapshots_in_flight.add(pid)
+        args = raft_pb2.SnapshotArgs(
+            term=self.current_term,
+            leader_id=NODE_ID,
+            last_included_index=self.snapshot_index,
+            last_included_term=self.snapshot_term,
+            data=self.snapshot_data,
+            group=self.group
+        )
+        self.logger.info(f"sends RPC InstallSnapshot to Node {pid} (last_included_index={args.last_included_index})")
+        future = asyncio.ensure_future(stub.InstallSnapshot(args, timeout=5.0))
+        future.add_done_callback(lambda f: self._on_snapshot_reply(pid, args, f))
+
+    def _committed(self):
+        # No apply thread: entries are applied on the loop as soon as they commit
+        super()._committed()
+        self._apply_logs()
+
+    def _apply_logs(self):
+        super()._apply_logs()
+        while self.commit_waiters and self.commit_waiters[0][0] <= self.last_applied:
+            index, future = heapq.heappop(self.commit_waiters)
+            if not future.done():
+                future.set_result(self.apply_results.pop(index, None))
+
+    # =========================================================
+    # Linearizable reads
+    # =========================================================
+    async def _confirm_read_index(self, lease):
+        deadline = time.time() + CLIENT_APPLY_TIMEOUT
+        term = self.current_term
+        # Until an entry of our term commits we may not know the latest commit index
+        while self.state == "LEADER" and self.current_term == term and self._term_at(self.commit_index) != term:
+            if not await self.commit_cond.wait(deadline - time.time()):
+                return None
+        if self.state != "LEADER" or self.current_term != term:
+            return None
+        read_index = self.commit_index
+        if lease and self._lease_holds():
+            return read_index
+
+        # One heartbeat round; concurrent reads share it
+        self.read_seq += 1
+        seq = self.read_seq
+        self.replicate_cond.notify_all()
+        while self.state == "LEADER" and self.current_term == term:
+            if self._read_confirmed(seq):
+                return read_index
+            if not await self.read_cond.wait(deadline - time.time()):
+                return None
+        return None
+
+    async def _read_barrier(self, lease):
+        leader = self.leader_id
+        if self.state == "LEADER":
+            read_index = await self._confirm_read_index(lease)
+        elif leader not in self.peer_stubs:
+            return False
+        else:
+            try:
+                reply = await self.peer_stubs[leader].ReadIndex(raft_pb2.ReadIndexArgs(lease=lease, group=self.group),
+                                                                timeout=CLIENT_APPLY_TIMEOUT)
+            except grpc.RpcError as e:
+                self.logger.warning(f"ReadIndex from leader {leader} failed: {e.code()}")
+                return False
+            read_index = reply.read_index if reply.success else None
+        if read_index is None:
+            return False
+
+        deadline = time.time() + CLIENT_APPLY_TIMEOUT
+        while self.last_applied < read_index:
+            if not await self.apply_cond.wait(deadline - time.time()):
+                return False
+        return True
+
+    async def _confirm_read(self, context):
+        self._leader_hint(context)
+        mode = self._read_mode(context)
+        if mode != "stale" and not await self._read_barrier(lease=(mode == "lease")):
+            await context.abort(grpc.StatusCode.UNAVAILABLE, "Could not confirm the read with a leader, retry")
+
+    # =========================================================
+    # Raft RPC handlers
+    # =========================================================
+    async def RequestVote(self, request, context):
+        # Like every Raft reply, sent once the term and vote it carries are on disk
+        reply = super().RequestVote(request, context)
+        await self._meta_synced()
+        return reply
+
+    async def AppendEntries(self, request, context):
+        self.logger.info(f"runs RPC AppendEntries called by Node {request.leader_id}")
+        reply, last_new = self._append_entries(request)
+        if last_new is not None:
+            await self._sync(last_new)
+        await self._meta_synced()
+        return reply
+
+    async def InstallSnapshot(self, request, context):
+        if self.snapshotting is not None:
+            await asyncio.wait([self.snapshotting])  # one writer of the snapshot file at a time
+        reply = super().InstallSnapshot(request, context)
+        await self._meta_synced()
+        return reply
+
+    async def TimeoutNow(self, request, context):
+        return super().TimeoutNow(request, context)
+
+    async def TransferLeadership(self, request, context):
+        self.logger.info(f"runs RPC TransferLeadership (target={request.target_id})")
+        success, message = await self.transfer_leadership(request.target_id)
+        return raft_pb2.TransferReply(success=success, leader_id=self.leader_id or 0, message=message)
+
+    # =========================================================
+    # Leadership transfer
+    # =========================================================
+    async def transfer_leadership(self, target=0):
+        target, error = self._begin_transfer(target)
+        if error:
+            return False, error
+        term = self.current_term
+        deadline = time.time() + ELECTION_MAX
+        try:
+            while not self._transfer_caught_up(target):
+                if self.state != "LEADER" or self.current_term != term:
+                    return False, "Leadership lost"
+                if not await self.read_cond.wait(deadline - time.time()):
+                    return False, f"Node {target} did not catch up"
+            self.timeout_now_term = term
+
+            self.logger.info(f"sends RPC TimeoutNow to Node {target}")
+            try:
+                await self.peer_stubs[target].TimeoutNow(
+                    raft_pb2.TimeoutNowArgs(term=term, leader_id=NODE_ID, group=self.group), timeout=RPC_TIMEOUT)
+            except grpc.RpcError as e:
+                return False, f"TimeoutNow to Node {target} failed: {e.code()}"
+
+            while self.leader_id != target:
+                if not await self.commit_cond.wait(deadline - time.time()):
+                    return False, f"Node {target} did not take over"
+            return True, f"Node {target} is the leader"
+        finally:
+            self._end_transfer()
+
+    # =========================================================
+    # Membership changes
+    # =========================================================
+    async def AddNode(self, request, context):
+        self.logger.info(f"runs RPC AddNode {request.node_id}={request.addr}")
+        node_id = request.node_id
+        if self.state != "LEADER":
+            return self._membership_reply(False, "Not the leader")
+        error = self._add_member(request)
+        if error:
+            return self._membership_reply(False, error)
+        done = await self._wait_config(lambda: self._added(node_id, request.learner))
+        role = "a read replica" if request.learner else "a voter"
+        return self._membership_reply(done, f"Node {node_id} is {role}" if done
+                                      else f"Node {node_id} has not caught up yet")
+
+    async def RemoveNode(self, request, context):
+        self.logger.info(f"runs RPC RemoveNode {request.node_id}")
+        node_id = request.node_id
+        if self.state != "LEADER":
+            return self._membership_reply(False, "Not the leader")
+        if node_id in self.peers or node_id == NODE_ID:
+            error = self._config_change_error()
+            if error:
+                return self._membership_reply(False, error)
+            members = [m for m in self.members if m.id != node_id]
+            if not any(m.voter for m in members):
+                return self._membership_reply(False, "Cannot remove the last voter")
+            self._append_config(members)
+        done = await self._wait_config(lambda: node_id not in self.peers and node_id not in self.voters)
+        return self._membership_reply(done, f"Node {node_id} removed" if done
+                                      else f"Removing Node {node_id} did not commit")
+
+    async def _wait_config(self, done):
+        deadline = time.time() + MEMBERSHIP_TIMEOUT
+        while not (done() and self.config_index <= self.commit_index):
+            if self.state != "LEADER" or not await self.commit_cond.wait(deadline - time.time()):
+                return False
+        return True
+
+    async def ReadIndex(self, request, context):
+        self.logger.info(f"runs RPC ReadIndex (lease={request.lease})")
+        read_index = await self._confirm_read_index(request.lease)
+        if read_index is None:
+            return raft_pb2.ReadIndexReply(success=False, leader_id=self.leader_id or 0)
+        return raft_pb2.ReadIndexReply(success=True, read_index=read_index, leader_id=NODE_ID)
+
+    # =========================================================
+    # Client writes
+    # =========================================================
+    async def _reject_not_leader(self, context):
+        self._leader_hint(context)
+        await context.abort(grpc.StatusCode.FAILED_PRECONDITION, "NOT_LEADER")
+
+    async def _forward_to_leader(self, request, method_name, metadata=()):
+        leader_id = self.leader_id
+        if leader_id is None:
+            return queue_pb2.QueueResponse(message="No leader elected yet")
+        if leader_id == NODE_ID:
+            return queue_pb2.QueueResponse(message="Error: I am leader but state mismatch")
+        stub = self.peer_queue_stubs.get(leader_id)
+        if stub is None:
+            return queue_pb2.QueueResponse(message="Leader not in our configuration yet")
+
+        self.logger.info(f"Forwarding {method_name} to leader {leader_id}")
+        try:
+            return await getattr(stub, method_name)(request, metadata=metadata)
+        except grpc.RpcError as e:
+            return queue_pb2.QueueResponse(message=f"Forwarding failed: {e}")
+
+    async def _append_client_entry(self, op, method_name, request, context):
+        while self.transfer_target is not None:
+            await self.commit_cond.wait()
+        if self.state != "LEADER":
+            if not self._forwarding(context):
+                await self._reject_not_leader(context)
+            self._leader_hint(context)
+            metadata = [(k, v) for k, v in context.invocation_metadata() if k in FORWARDED_METADATA]
+            return await self._forward_to_leader(request, method_name, metadata)
+        return self._leader_append(op, request, self._client_session(context))
+
+    async def _finish_client_write(self, index, term, context, reply, wait=None):
+        await self._count_own(index, term)
+        if not (self._commit_wait(context) if wait is None else wait):
+            self.apply_results.pop(index, None)
+            return reply(None, None)
+        if self.last_applied >= index:
+            return reply(self.apply_results.pop(index, None), None)
+        if self.state != "LEADER" or self.current_term != term:
+            self.apply_results.pop(index, None)
+            return reply(None, "Not committed: leadership lost")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.commit_waiters, (index, future))
+        try:
+            result = await asyncio.wait_for(future, CLIENT_APPLY_TIMEOUT)
+        except asyncio.TimeoutError:
+            self.logger.warning(f"log[{index}] not committed within {CLIENT_APPLY_TIMEOUT}s")
+            return reply(None, "Not committed (timeout)")
+        finally:
+            self.apply_results.pop(index, None)
+        if result is _LOST:
+            return reply(None, "Not committed: leadership lost")
+        return reply(result, None)
+
+    async def _client_write(self, op, method_name, request, context, reply):
+        appended = await self._append_client_entry(op, method_name, request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return await self._finish_client_write(*appended, context, reply)
+
+    async def AddTrack(self, request, context):
+        self.logger.info("AddTrack called")
+        return await self._client_write(raft_pb2.LogEntry.ADD, "AddTrack", request, context,
+                                        self._queue_reply("Queued", context, [request.id]))
+
+    async def RemoveTrack(self, request, context):
+        self.logger.info("RemoveTrack called")
+        return await self._client_write(raft_pb2.LogEntry.REMOVE, "RemoveTrack", request, context,
+                                        self._queue_reply("Removed", context, [request.id]))
+
+    async def AddTracks(self, request, context):
+        self.logger.info(f"AddTracks called with {len(request.tracks)} tracks")
+        ids = [t.id for t in request.tracks]
+        return await self._client_write(raft_pb2.LogEntry.ADD_BATCH, "AddTracks", request, context,
+                                        self._queue_reply("Queued", context, ids))
+
+    async def RemoveTracks(self, request, context):
+        self.logger.info(f"RemoveTracks called with {len(request.ids)} ids")
+        return await self._client_write(raft_pb2.LogEntry.REMOVE_BATCH, "RemoveTracks", request, context,
+                                        self._queue_reply("Removed", context, request.ids))
+
+    async def VoteTrack(self, request, context):
+        self.logger.info("VoteTrack called")
+        return await self._client_write(raft_pb2.LogEntry.VOTE, "VoteTrack", request, context,
+                                        self._queue_reply("Vote updated", context, [request.id]))
+
+    async def PlayNext(self, request, context):
+        self.logger.info("PlayNext called")
+        appended = await self._append_client_entry(raft_pb2.LogEntry.PLAY, "PlayNext", request, context)
+        if isinstance(appended, queue_pb2.QueueResponse):
+            # No leader, or forwarding failed: PlayNext has no message field to carry it
+            await context.abort(grpc.StatusCode.UNAVAILABLE, appended.message)
+        if not isinstance(appended, tuple):
+            return appended
+
+        # Which track plays is only known once the entry is applied, so always wait
+        track, error = await self._finish_client_write(*appended, context, lambda t, e: (t, e), wait=True)
+        if error:
+            await context.abort(grpc.StatusCode.UNAVAILABLE, error)
+        return queue_pb2.Track() if track is None else track  # empty when the queue was empty
+
+    # =========================================================
+    # Client reads
+    # =========================================================
+    async def GetQueue(self, request, context):
+        await self._confirm_read(context)
+        return self._view("queue", lambda: queue_pb2.QueueList(queue=self.music_queue.tracks()))
+
+    async def GetMetadata(self, request, context):
+        await self._confirm_read(context)
+        reply = queue_pb2.Track()
+        track = self.music_queue.get(request.id)
+        if track is not None:
+            reply.CopyFrom(track)
+        return reply
+
+    async def GetHistory(self, request, context):
+        await self._confirm_read(context)
+        return self._view("history", lambda: queue_pb2.QueueList(queue=self.history))
+
+    async def GetQueuePage(self, request, context):
+        await self._confirm_read(context)
+        offset, limit = self._page_bounds(request)
+        return self._page(self.music_queue.page(offset, limit), len(self.music_queue), offset)
+
+    async def GetHistoryPage(self, request, context):
+        await self._confirm_read(context)
+        offset, limit = self._page_bounds(request)
+        return self._page(self.history[offset:offset + limit], len(self.history), offset)
+
+    async def StreamQueue(self, request, context):
+        await self._confirm_read(context)
+        for page in self._queue_pages(request):
+            yield page
+
+    async def StreamHistory(self, request, context):
+        await self._confirm_read(context)
+        for page in self._history_pages(request):
+            yield page
+
+    async def WatchQueue(self, request, context):
+        # See RaftServer.WatchQueue; a cancelled stream cancels this coroutine
+        try:
+            token = int(request.resume_token) if request.resume_token else None
+        except ValueError:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Bad resume token")
+        if self.watchers >= MAX_WATCHERS:
+            await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many watchers")
+        self.watchers += 1
+        try:
+            while not self._stop.is_set():
+                events = None if token is None else self.events.since(token)
+                if events is None:
+                    events = [queue_pb2.QueueEvent(kind=queue_pb2.QueueEvent.SNAPSHOT,
+                                                   token=str(self.last_applied),
+                                                   queue=self.music_queue.tracks())]
+                elif not events:
+                    await self.watch_cond.wait(WATCH_IDLE_CHECK)
+                    continue
+                for event in events:
+                    yield event
+                token = int(events[-1].token)
+        finally:
+            self.watchers -= 1
+
+
+# =========================================================
+# gRPC server
+# =========================================================
+async def serve():
+    server = grpc.aio.server(options=[('grpc.max_receive_message_length', MAX_MESSAGE_BYTES)])
+    raft_server = AioRaftServer()
+    raft_pb2_grpc.add_RaftServiceServicer_to_server(raft_server, server)
+    add_queue_service(raft_server, server)
+    server.add_insecure_port(f'[::]:{PORT}')
+    logger.info(f"Raft Node {NODE_ID} (asyncio) started on port {PORT}")
+    await server.start()
+
+    # Same as raft_server.serve(): a leader hands over before a SIGTERM stop
+    stopping = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+    await stopping.wait()
+    if raft_server.state == "LEADER":
+        success, message = await raft_server.transfer_leadership()
+        logger.info(f"Leadership transfer before shutdown: {message}")
+    raft_server.stop()
+    await server.stop(grace=1)
+
+if __name__ == "__main__":
+    asyncio.run(serve())
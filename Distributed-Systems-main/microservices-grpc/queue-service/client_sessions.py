@@ -0,0 +1,69 @@
+from collections import OrderedDict
+
+
+class ClientSessions:
+    """Replies to recent client writes, so a retried write is applied once.
+
+    A smart client (queue_client.py) numbers its writes: each one carries the
+    client's id, its seq and the client's floor, the lowest seq it is still
+    waiting on. The reply of every applied seq at or above the floor is kept,
+    so a retry finds it with a dict lookup instead of applying the command a
+    second time. Below the floor the client has its replies, so they are
+    dropped.
+
+    Sessions are kept least recently used first. Those idle for `timeout`
+    seconds, and the oldest beyond `max_sessions`, are dropped. Time is the
+    leader's timestamp on the log entry, so every replica drops the same ones.
+    """
+
+    def __init__(self, timeout, max_sessions, max_replies, sessions=()):
+        self._sessions = OrderedDict()  # client id -> [last active, floor, {seq: reply}]
+        self._timeout = timeout
+        self._max_sessions = max_sessions
+        self._max_replies = max_replies  # per session, in case a client never moves its floor
+        for client_id, last_active, floor, replies in sessions:
+            self._sessions[client_id] = [last_active, floor, dict(replies)]
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def sessions(self):
+        # (client id, last active, floor, {seq: reply}) of every session, for snapshots
+        return [(client_id, *session) for client_id, session in self._sessions.items()]
+
+    def lookup(self, client_id, seq, floor, now):
+        # (True, reply) if seq was applied already, else (False, None). The
+        # reply is None for a seq below the floor: that client has its reply
+        self._expire(now)
+        session = self._sessions.get(client_id)
+        if session is None:
+            session = self._sessions[client_id] = [now, floor, {}]
+            if len(self._sessions) > self._max_sessions:
+                self._sessions.popitem(last=False)
+        else:
+            self._sessions.move_to_end(client_id)
+            session[0] = max(session[0], now)
+        replies = session[2]
+        if floor > session[1]:
+            session[1] = floor
+            for old in [s for s in replies if s < floor]:
+                del replies[old]
+        if seq < session[1]:
+            return True, None
+        if seq in replies:
+            return True, replies[seq]
+        return False, None
+
+    def record(self, client_id, seq, reply):
+        # After lookup(client_id, ...) missed and the command was applied
+        replies = self._sessions[client_id][2]
+        replies[seq] = reply
+        if len(replies) > self._max_replies:
+            del replies[next(iter(replies))]
+
+    def _expire(self, now):
+        while self._sessions:
+            client_id, session = next(iter(self._sessions.items()))
+            if session[0] >= now - self._timeout:
+                break
+            del self._sessions[client_id]
@@ -1,5 +1,8 @@
 #!/bin/sh
 set -e
 
-# Start the gRPC server
+# Start the gRPC server: one Raft group per queue when QUEUES lists extra queues
+if [ -n "$QUEUES" ]; then
+    exec python3 /app/multi_raft_server.py
+fi
 exec python3 /app/raft_server.py
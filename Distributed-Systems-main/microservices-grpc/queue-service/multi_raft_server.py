@@ -0,0 +1,243 @@
+import os
+import re
+import signal
+import threading
+from concurrent import futures
+
+import grpc
+
+import raft_pb2
+import raft_pb2_grpc
+import queue_pb2_grpc
+from raft_server import RaftServer, logger, NODE_ID, PORT, HEARTBEAT_INTERVAL, RPC_TIMEOUT, MAX_WATCHERS, \
+    MAX_MESSAGE_BYTES, add_queue_service
+from timers import Timers
+
+# One Raft group per queue (room), all in this process. Each group has its own
+# leader, log and state machine, so writes to different queues commit
+# independently and their leaders spread over the nodes. Every node lists the
+# same QUEUES; the default queue ('') is always there.
+QUEUES = [q for q in os.environ.get('QUEUES', '').split(',') if q]
+for _queue_id in QUEUES:
+    if not re.fullmatch(r'[A-Za-z0-9_-]+', _queue_id):
+        # It names the group's directory under DATA_DIR/queues
+        raise ValueError(f"Bad queue id {_queue_id!r}: use letters, digits, '_' and '-'")
+
+
+class UnknownGroup(grpc.RpcError):
+    # What a batched heartbeat for a group the peer does not run fails with,
+    # as the same AppendEntries sent on its own would
+    def code(self):
+        return grpc.StatusCode.NOT_FOUND
+
+    def details(self):
+        return "Unknown queue"
+
+
+class RaftGroup(RaftServer):
+    # The Raft group of one queue. It shares the node's channel to each peer
+    # and its timer thread, and the node sends its idle heartbeats in batches
+    def __init__(self, node, queue_id):
+        self.node = node
+        super().__init__(group=queue_id)
+        self.batched_heartbeats = True
+
+    @property
+    def serialized_replies(self):
+        # The node's handlers carry this group's replies
+        return self.node.serialized_replies
+
+    def _start(self):
+        self.timers = self.node.timers
+        threading.Thread(target=self._apply_loop, daemon=True).start()
+
+    def _connect(self, pid, addr):
+        # Caller holds the lock
+        channel = self.node.channel(pid, addr)
+        self.peer_stubs[pid] = stub = raft_pb2_grpc.RaftServiceStub(channel)
+        self.peer_queue_stubs[pid] = queue_pb2_grpc.QueueServiceStub(channel)
+        threading.Thread(target=self._replicator_loop, args=(pid, stub), daemon=True).start()
+
+    def _disconnect(self, pid):
+        # Caller holds the lock. The channel stays open for the other groups
+        del self.peer_stubs[pid], self.peer_queue_stubs[pid]
+        self.replicate_cond.notify_all()
+
+
+class MultiRaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceServicer):
+    # Routes client calls by queue_id and Raft messages by group to the RaftGroup
+    serialized_replies = False
+    def __init__(self, queue_ids=QUEUES):
+        self.lock = threading.Lock()
+        self.channels = {}  # peer_id -> channel shared by every group
+        self._stop = threading.Event()
+        self.timers = Timers()  # election and check-quorum deadlines of every group
+        # Heartbeat batchers start while the groups are built; they see them once all exist
+        self.groups = {}
+        self.groups = {queue_id: RaftGroup(self, queue_id) for queue_id in [''] + list(queue_ids)}
+
+    def channel(self, pid, addr):
+        # One channel and one heartbeat batcher per peer, whatever groups it is in
+        with self.lock:
+            if pid not in self.channels:
+                self.channels[pid] = channel = grpc.insecure_channel(addr)
+                threading.Thread(target=self._heartbeat_loop, args=(pid, raft_pb2_grpc.RaftServiceStub(channel)),
+                                 daemon=True).start()
+            return self.channels[pid]
+
+    # =========================================================
+    # Batched heartbeats
+    # =========================================================
+    def _heartbeat_loop(self, pid, stub):
+        # Every HEARTBEAT_INTERVAL one Heartbeats call carries an empty
+        # AppendEntries from each group this node leads, instead of one call per group
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            beats = [beat for beat in (group.heartbeat(pid) for group in self.groups.values()) if beat]
+            if not beats:
+                continue
+            batch = raft_pb2.HeartbeatBatch(heartbeats=[args for args, _ in beats])
+            logger.info(f"sends RPC Heartbeats for {len(beats)} queues to Node {pid}")
+            future = stub.Heartbeats.future(batch, timeout=RPC_TIMEOUT)
+            future.add_done_callback(lambda f, beats=beats: self._on_heartbeats(f, beats))
+
+    def _on_heartbeats(self, future, beats):
+        # Hand each group its own reply (or the error) as the future its callback expects
+        try:
+            batch = future.result()
+            replies = list(batch.replies)
+            for i in batch.unknown:
+                replies[i] = UnknownGroup()
+        except grpc.RpcError as e:
+            replies = [e] * len(beats)
+        for (args, on_reply), reply in zip(beats, replies):
+            result = futures.Future()
+            if isinstance(reply, grpc.RpcError):
+                result.set_exception(reply)
+            else:
+                result.set_result(reply)
+            on_reply(result)
+
+    def Heartbeats(self, request, context):
+        reply = raft_pb2.HeartbeatBatchReply()
+        for i, args in enumerate(request.heartbeats):
+            group = self.groups.get(args.group)
+            if group is None:
+                # The placeholder keeps the replies in order; unknown says it is not an answer
+                logger.warning(f"Heartbeat from Node {args.leader_id} for unknown queue {args.group!r}")
+                reply.replies.add()
+                reply.unknown.append(i)
+            else:
+                reply.replies.append(group.AppendEntries(args, context))
+        return reply
+
+    # =========================================================
+    # Routing
+    # =========================================================
+    def _group(self, queue_id, context):
+        group = self.groups.get(queue_id)
+        if group is None:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"Unknown queue {queue_id!r}")
+        return group
+
+    # Raft messages name their group
+    def RequestVote(self, request, context):
+        return self._group(request.group, context).RequestVote(request, context)
+
+    def AppendEntries(self, request, context):
+        return self._group(request.group, context).AppendEntries(request, context)
+
+    def InstallSnapshot(self, request, context):
+        return self._group(request.group, context).InstallSnapshot(request, context)
+
+    def ReadIndex(self, request, context):
+        return self._group(request.group, context).ReadIndex(request, context)
+
+    def TimeoutNow(self, request, context):
+        return self._group(request.group, context).TimeoutNow(request, context)
+
+    def TransferLeadership(self, request, context):
+        return self._group(request.group, context).TransferLeadership(request, context)
+
+    def AddNode(self, request, context):
+        return self._group(request.group, context).AddNode(request, context)
+
+    def RemoveNode(self, request, context):
+        return self._group(request.group, context).RemoveNode(request, context)
+
+    # Client calls name their queue
+    def AddTrack(self, request, context):
+        return self._group(request.queue_id, context).AddTrack(request, context)
+
+    def RemoveTrack(self, request, context):
+        return self._group(request.queue_id, context).RemoveTrack(request, context)
+
+    def AddTracks(self, request, context):
+        return self._group(request.queue_id, context).AddTracks(request, context)
+
+    def RemoveTracks(self, request, context):
+        return self._group(request.queue_id, context).RemoveTracks(request, context)
+
+    def VoteTrack(self, request, context):
+        return self._group(request.queue_id, context).VoteTrack(request, context)
+
+    def GetQueue(self, request, context):
+        return self._group(request.queue_id, context).GetQueue(request, context)
+
+    def GetMetadata(self, request, context):
+        return self._group(request.queue_id, context).GetMetadata(request, context)
+
+    def PlayNext(self, request, context):
+        return self._group(request.queue_id, context).PlayNext(request, context)
+
+    def GetHistory(self, request, context):
+        return self._group(request.queue_id, context).GetHistory(request, context)
+
+    def GetQueuePage(self, request, context):
+        return self._group(request.queue_id, context).GetQueuePage(request, context)
+
+    def GetHistoryPage(self, request, context):
+        return self._group(request.queue_id, context).GetHistoryPage(request, context)
+
+    def StreamQueue(self, request, context):
+        return self._group(request.queue_id, context).StreamQueue(request, context)
+
+    def StreamHistory(self, request, context):
+        return self._group(request.queue_id, context).StreamHistory(request, context)
+
+    def WatchQueue(self, request, context):
+        return self._group(request.queue_id, context).WatchQueue(request, context)
+
+    def stop(self):
+        self._stop.set()
+        for group in self.groups.values():
+            group.stop()
+
+
+# =========================================================
+# gRPC server
+# =========================================================
+def serve():
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=10 + MAX_WATCHERS),
+        options=[('grpc.max_receive_message_length', MAX_MESSAGE_BYTES)]
+    )
+    node = MultiRaftServer()
+    raft_pb2_grpc.add_RaftServiceServicer_to_server(node, server)
+    add_queue_service(node, server)
+    server.add_insecure_port(f'[::]:{PORT}')
+    logger.info(f"Raft Node {NODE_ID} started on port {PORT} with queues {sorted(node.groups)}")
+    server.start()
+
+    # Same SIGTERM handling as raft_server.serve(), for every group this node leads
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    stopping.wait()
+    for group in node.groups.values():
+        if group.state == "LEADER":
+            success, message = group.transfer_leadership()
+            group.logger.info(f"Leadership transfer before shutdown: {message}")
+    node.stop()
+    server.stop(grace=1).wait()
+
+if __name__ == "__main__":
+    serve()
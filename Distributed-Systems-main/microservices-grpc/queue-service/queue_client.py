@@ -0,0 +1,154 @@
+import threading
+import time
+import uuid
+
+import grpc
+
+import queue_pb2_grpc
+
+# Smart client for the Raft queue: writes go straight to the leader it has
+# learned about, reads are spread over the followers. Every node names the
+# current leader in the "leader-id"/"leader-addr" trailing metadata. With one
+# Raft group per queue (multi_raft_server.py) each queue_id has its own leader.
+# Writes carry a client id and sequence number that the nodes deduplicate on
+# (client_sessions.py), so a write that timed out can be sent again safely.
+
+WRITE_METHODS = {"AddTrack", "RemoveTrack", "AddTracks", "RemoveTracks", "VoteTrack", "PlayNext"}
+STREAM_METHODS = {"StreamQueue", "StreamHistory", "WatchQueue"}
+NOT_LEADER = "NOT_LEADER"  # details of the FAILED_PRECONDITION a follower answers with
+RETRIES = 5
+RETRY_BACKOFF = 0.1  # seconds, doubled after each failed attempt
+# Replies of a leader that could not tell whether the write committed
+RETRY_MESSAGES = ("Not committed", "Not leader anymore")
+
+
+def parse_nodes(spec):
+    # "1=host:port,2=host:port" like PEERS; a bare "host:port" (e.g. nginx)
+    # is kept under a placeholder id until the leader hints add real ones
+    nodes = {}
+    for i, item in enumerate(spec.split(",")):
+        node_id, _, addr = item.strip().rpartition("=")
+        nodes[node_id or f"addr{i}"] = addr
+    return nodes
+
+
+def connect(spec):
+    return QueueClient(parse_nodes(spec))
+
+
+class QueueClient:
+    # Drop-in for queue_pb2_grpc.QueueServiceStub: client.AddTrack(track, metadata=..., timeout=...)
+
+    def __init__(self, nodes):
+        self.nodes = dict(nodes)
+        self.stubs = {}
+        self.leaders = {}  # queue_id -> id of the node leading that queue
+        self.next_read = 0
+        self.client_id = uuid.uuid4().hex
+        self.next_seq = 0
+        self.pending = set()  # seqs of the writes still waiting for a reply
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name in STREAM_METHODS:
+            return lambda request, **kwargs: getattr(self._stub(self._read_node(request.queue_id)), name)(
+                request, **kwargs)
+        if name in WRITE_METHODS:
+            return lambda request, **kwargs: self._write(name, request, **kwargs)
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda request, **kwargs: self._read(name, request, **kwargs)
+
+    def _stub(self, node):
+        with self.lock:
+            stub = self.stubs.get(node)
+            if stub is None:
+                stub = self.stubs[node] = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(self.nodes[node]))
+            return stub
+
+    def _learn(self, queue_id, metadata):
+        # Remember the leader a node named for queue_id; returns whether it named one
+        hint = dict(metadata or ())
+        leader = hint.get("leader-id")
+        if leader is None:
+            return False
+        with self.lock:
+            if leader not in self.nodes:
+                if "leader-addr" not in hint:
+                    return False
+                self.nodes[leader] = hint["leader-addr"]
+            self.leaders[queue_id] = leader
+        return True
+
+    def _read_node(self, queue_id):
+        # Round robin over the followers, or over every node while the leader is unknown
+        with self.lock:
+            nodes = [n for n in self.nodes if n != self.leaders.get(queue_id)] or list(self.nodes)
+            self.next_read += 1
+            return nodes[self.next_read % len(nodes)]
+
+    def _write_node(self, queue_id):
+        with self.lock:
+            leader = self.leaders.get(queue_id)
+        return leader if leader is not None else self._read_node(queue_id)
+
+    def _read(self, name, request, **kwargs):
+        # Reads have no side effects, so any failure is retried on the next node
+        delay = RETRY_BACKOFF
+        for attempt in range(RETRIES):
+            try:
+                reply, call = getattr(self._stub(self._read_node(request.queue_id)), name).with_call(request, **kwargs)
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNAVAILABLE or attempt == RETRIES - 1:
+                    raise
+                time.sleep(delay)
+                delay *= 2
+                continue
+            self._learn(request.queue_id, call.trailing_metadata())
+            return reply
+
+    def _write(self, name, request, metadata=(), **kwargs):
+        # Followers reject instead of forwarding. Every attempt carries the
+        # same seq, so a retry after a timeout or a lost leader is applied at
+        # most once even if the first attempt did commit
+        with self.lock:
+            self.next_seq += 1
+            seq = self.next_seq
+            self.pending.add(seq)
+        try:
+            return self._send_write(name, request, list(metadata) + [("forward", "0")], seq, **kwargs)
+        finally:
+            with self.lock:
+                self.pending.discard(seq)
+
+    def _send_write(self, name, request, metadata, seq, **kwargs):
+        delay = RETRY_BACKOFF
+        queue_id = request.queue_id
+        for attempt in range(RETRIES):
+            node = self._write_node(queue_id)
+            with self.lock:
+                session = [("client-id", self.client_id), ("seq", str(seq)), ("seq-floor", str(min(self.pending)))]
+            try:
+                reply, call = getattr(self._stub(node), name).with_call(request, metadata=metadata + session, **kwargs)
+            except grpc.RpcError as e:
+                if attempt == RETRIES - 1:
+                    raise
+                if e.code() == grpc.StatusCode.FAILED_PRECONDITION and e.details() == NOT_LEADER:
+                    if self._learn(queue_id, e.trailing_metadata()):
+                        continue
+                elif e.code() not in (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED):
+                    raise
+                # no leader yet (election running) or it is unreachable: back off and rediscover it
+                with self.lock:
+                    if self.leaders.get(queue_id) == node:
+                        del self.leaders[queue_id]
+                time.sleep(delay)
+                delay *= 2
+                continue
+            if getattr(reply, "message", "").startswith(RETRY_MESSAGES) and attempt < RETRIES - 1:
+                time.sleep(delay)
+                delay *= 2
+                continue
+            with self.lock:
+                self.leaders[queue_id] = node
+            return reply
@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0bqueue.proto\x12\x05queue\"S\n\x05Track\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61rtist\x18\x03 \x01(\t\x12\r\n\x05votes\x18\x04 \x01(\x05\x12\x10\n\x08\x64uration\x18\x05 \x01(\x05\"\x15\n\x07TrackId\x12\n\n\x02id\x18\x01 \x01(\t\"%\n\x0bVoteRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\n\n\x02up\x18\x02 \x01(\x08\"(\n\tQueueList\x12\x1b\n\x05queue\x18\x01 \x03(\x0b\x32\x0c.queue.Track\"=\n\rQueueResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x1b\n\x05queue\x18\x02 \x03(\x0b\x32\x0c.queue.Track\"\x07\n\x05\x45mpty2\xd9\x02\n\x0cQueueService\x12.\n\x08\x41\x64\x64Track\x12\x0c.queue.Track\x1a\x14.queue.QueueResponse\x12\x33\n\x0bRemoveTrack\x12\x0e.queue.TrackId\x1a\x14.queue.QueueResponse\x12\x35\n\tVoteTrack\x12\x12.queue.VoteRequest\x1a\x14.queue.QueueResponse\x12*\n\x08GetQueue\x12\x0c.queue.Empty\x1a\x10.queue.QueueList\x12+\n\x0bGetMetadata\x12\x0e.queue.TrackId\x1a\x0c.queue.Track\x12&\n\x08PlayNext\x12\x0c.queue.Empty\x1a\x0c.queue.Track\x12,\n\nGetHistory\x12\x0c.queue.Empty\x1a\x10.queue.QueueListb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0bqueue.proto\x12\x05queue\"e\n\x05Track\x12\n\n\x02id\x18\x01 \x01(\t\x12\r\n\x05title\x18\x02 \x01(\t\x12\x0e\n\x06\x61rtist\x18\x03 \x01(\t\x12\r\n\x05votes\x18\x04 \x01(\x05\x12\x10\n\x08\x64uration\x18\x05 \x01(\x05\x12\x10\n\x08queue_id\x18\x06 \x01(\t\"\'\n\x07TrackId\x12\n\n\x02id\x18\x01 \x01(\t\x12\x10\n\x08queue_id\x18\x02 \x01(\t\"<\n\nTrackBatch\x12\x1c\n\x06tracks\x18\x01 \x03(\x0b\x32\x0c.queue.Track\x12\x10\n\x08queue_id\x18\x02 \x01(\t\"-\n\x0cTrackIdBatch\x12\x0b\n\x03ids\x18\x01 \x03(\t\x12\x10\n\x08queue_id\x18\x02 \x01(\t\"7\n\x0bVoteRequest\x12\n\n\x02id\x18\x01 \x01(\t\x12\n\n\x02up\x18\x02 \x01(\x08\x12\x10\n\x08queue_id\x18\x03 \x01(\t\"L\n\tQueueList\x12\x1b\n\x05queue\x18\x01 \x03(\x0b\x32\x0c.queue.Track\x12\r\n\x05total\x18\x02 \x01(\x05\x12\x13\n\x0bnext_offset\x18\x03 \x01(\x05\">\n\x0bPageRequest\x12\x0e\n\x06offset\x18\x01 \x01(\x05\x12\r\n\x05limit\x18\x02 \x01(\x05\x12\x10\n\x08queue_id\x18\x03 \x01(\t\"=\n\rQueueResponse\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x1b\n\x05queue\x18\x02 \x03(\x0b\x32\x0c.queue.Track\"\x19\n\x05\x45mpty\x12\x10\n\x08queue_id\x18\x01 \x01(\t\"6\n\x0cWatchRequest\x12\x14\n\x0cresume_token\x18\x01 \x01(\t\x12\x10\n\x08queue_id\x18\x02 \x01(\t\"\xc0\x01\n\nQueueEvent\x12$\n\x04kind\x18\x01 \x01(\x0e\x32\x16.queue.QueueEvent.Kind\x12\r\n\x05token\x18\x02 \x01(\t\x12\x1b\n\x05track\x18\x03 \x01(\x0b\x32\x0c.queue.Track\x12\x1b\n\x05queue\x18\x04 \x03(\x0b\x32\x0c.queue.Track\"C\n\x04Kind\x12\x0c\n\x08SNAPSHOT\x10\x00\x12\t\n\x05\x41\x44\x44\x45\x44\x10\x01\x12\x0b\n\x07REMOVED\x10\x02\x12\t\n\x05VOTED\x10\x03\x12\n\n\x06PLAYED\x10\x04\x32\xe0\x05\n\x0cQueueService\x12.\n\x08\x41\x64\x64Track\x12\x0c.queue.Track\x1a\x14.queue.QueueResponse\x12\x33\n\x0bRemoveTrack\x12\x0e.queue.TrackId\x1a\x14.queue.QueueResponse\x12\x34\n\tAddTracks\x12\x11.queue.TrackBatch\x1a\x14.queue.QueueResponse\x12\x39\n\x0cRemoveTracks\x12\x13.queue.TrackIdBatch\x1a\x14.queue.QueueResponse\x12\x35\n\tVoteTrack\x12\x12.queue.VoteRequest\x1a\x14.queue.QueueResponse\x12*\n\x08GetQueue\x12\x0c.queue.Empty\x1a\x10.queue.QueueList\x12+\n\x0bGetMetadata\x12\x0e.queue.TrackId\x1a\x0c.queue.Track\x12&\n\x08PlayNext\x12\x0c.queue.Empty\x1a\x0c.queue.Track\x12,\n\nGetHistory\x12\x0c.queue.Empty\x1a\x10.queue.QueueList\x12\x34\n\x0cGetQueuePage\x12\x12.queue.PageRequest\x1a\x10.queue.QueueList\x12\x36\n\x0eGetHistoryPage\x12\x12.queue.PageRequest\x1a\x10.queue.QueueList\x12\x35\n\x0bStreamQueue\x12\x12.queue.PageRequest\x1a\x10.queue.QueueList0\x01\x12\x37\n\rStreamHistory\x12\x12.queue.PageRequest\x1a\x10.queue.QueueList0\x01\x12\x36\n\nWatchQueue\x12\x13.queue.WatchRequest\x1a\x11.queue.QueueEvent0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,17 +32,29 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'queue_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_TRACK']._serialized_start=22
-  _globals['_TRACK']._serialized_end=105
-  _globals['_TRACKID']._serialized_start=107
-  _globals['_TRACKID']._serialized_end=128
-  _globals['_VOTEREQUEST']._serialized_start=130
-  _globals['_VOTEREQUEST']._serialized_end=167
-  _globals['_QUEUELIST']._serialized_start=169
-  _globals['_QUEUELIST']._serialized_end=209
-  _globals['_QUEUERESPONSE']._serialized_start=211
-  _globals['_QUEUERESPONSE']._serialized_end=272
-  _globals['_EMPTY']._serialized_start=274
-  _globals['_EMPTY']._serialized_end=281
-  _globals['_QUEUESERVICE']._serialized_start=284
-  _globals['_QUEUESERVICE']._serialized_end=629
+  _globals['_TRACK']._serialized_end=123
+  _globals['_TRACKID']._serialized_start=125
+  _globals['_TRACKID']._serialized_end=164
+  _globals['_TRACKBATCH']._serialized_start=166
+  _globals['_TRACKBATCH']._serialized_end=226
+  _globals['_TRACKIDBATCH']._serialized_start=228
+  _globals['_TRACKIDBATCH']._serialized_end=273
+  _globals['_VOTEREQUEST']._serialized_start=275
+  _globals['_VOTEREQUEST']._serialized_end=330
+  _globals['_QUEUELIST']._serialized_start=332
+  _globals['_QUEUELIST']._serialized_end=408
+  _globals['_PAGEREQUEST']._serialized_start=410
+  _globals['_PAGEREQUEST']._serialized_end=472
+  _globals['_QUEUERESPONSE']._serialized_start=474
+  _globals['_QUEUERESPONSE']._serialized_end=535
+  _globals['_EMPTY']._serialized_start=537
+  _globals['_EMPTY']._serialized_end=562
+  _globals['_WATCHREQUEST']._serialized_start=564
+  _globals['_WATCHREQUEST']._serialized_end=618
+  _globals['_QUEUEEVENT']._serialized_start=621
+  _globals['_QUEUEEVENT']._serialized_end=813
+  _globals['_QUEUEEVENT_KIND']._serialized_start=746
+  _globals['_QUEUEEVENT_KIND']._serialized_end=813
+  _globals['_QUEUESERVICE']._serialized_start=816
+  _globals['_QUEUESERVICE']._serialized_end=1552
 # @@protoc_insertion_point(module_scope)
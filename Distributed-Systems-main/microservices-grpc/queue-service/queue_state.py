@@ -0,0 +1,93 @@
+from itertools import islice
+
+from sortedcontainers import SortedList
+
+
+class QueueState:
+    """The music queue: most votes first, ties in arrival order.
+
+    Tracks are indexed by id, so lookups are O(1). The play order is a
+    SortedList of (-votes, seq, id) keys, so a vote moves a track in O(log n).
+    remove() only drops the id from the index. Its key stays in the order as
+    a stale entry that iteration skips, and the order is rebuilt once stale
+    keys outnumber live ones, which keeps removal amortized O(1).
+    """
+
+    def __init__(self, tracks=()):
+        self._index = {}           # track id -> (order key, Track)
+        self._order = SortedList()
+        self._seq = 0
+        self._stale = 0
+        for track in tracks:
+            self.add(track)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, track_id):
+        return track_id in self._index
+
+    def __iter__(self):
+        for key in self._order:
+            entry = self._index.get(key[2])
+            if entry is not None and entry[0] == key:
+                yield entry[1]
+
+    def tracks(self):
+        return list(self)
+
+    def page(self, offset, limit):
+        # Tracks at positions [offset, offset + limit) of the play order
+        return list(islice(self, offset, offset + limit))
+
+    def get(self, track_id):
+        entry = self._index.get(track_id)
+        return entry[1] if entry else None
+
+    def add(self, track):
+        # Returns False (and keeps the existing track) if the id is already queued
+        if track.id in self._index:
+            return False
+        key = (-track.votes, self._seq, track.id)
+        self._seq += 1
+        self._index[track.id] = (key, track)
+        self._order.add(key)
+        return True
+
+    def remove(self, track_id):
+        entry = self._index.pop(track_id, None)
+        if entry is None:
+            return None
+        self._stale += 1
+        if self._stale > len(self._index):
+            self._compact()
+        return entry[1]
+
+    def vote(self, track_id, delta):
+        entry = self._index.get(track_id)
+        if entry is None:
+            return None
+        old_key, track = entry
+        track.votes += delta
+        key = (-track.votes, old_key[1], track_id)
+        self._order.remove(old_key)
+        self._order.add(key)
+        self._index[track_id] = (key, track)
+        return track
+
+    def pop_next(self):
+        # Remove and return the track that plays next, or None if the queue is empty
+        while self._order:
+            key = self._order.pop(0)
+            entry = self._index.get(key[2])
+            if entry is not None and entry[0] == key:
+                del self._index[key[2]]
+                return entry[1]
+            self._stale -= 1
+        return None
+
+    def _compact(self):
+        # Drop stale keys; the survivors are already sorted so this is O(n)
+        self._order = SortedList(key for key in self._order
+                                 if self._index.get(key[2], (None,))[0] == key)
+        self._stale = 0
@@ -22,25 +22,64 @@ _runtime_version.ValidateProtobufRuntimeVersion(
 _sym_db = _symbol_database.Default()
 
 
+import queue_pb2 as queue__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nraft.proto\x12\x04raft\"]\n\x08VoteArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0c\x63\x61ndidate_id\x18\x02 \x01(\x05\x12\x16\n\x0elast_log_index\x18\x03 \x01(\x05\x12\x15\n\rlast_log_term\x18\x04 \x01(\x05\"/\n\tVoteReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0cvote_granted\x18\x02 \x01(\x08\"\x94\x01\n\nAppendArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\x16\n\x0eprev_log_index\x18\x03 \x01(\x05\x12\x15\n\rprev_log_term\x18\x04 \x01(\x05\x12\x1f\n\x07\x65ntries\x18\x05 \x03(\x0b\x32\x0e.raft.LogEntry\x12\x15\n\rleader_commit\x18\x06 \x01(\x05\",\n\x0b\x41ppendReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\"7\n\x08LogEntry\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07\x63ommand\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x32w\n\x0bRaftService\x12\x30\n\x0bRequestVote\x12\x0e.raft.VoteArgs\x1a\x0f.raft.VoteReply\"\x00\x12\x36\n\rAppendEntries\x12\x10.raft.AppendArgs\x1a\x11.raft.AppendReply\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nraft.proto\x12\x04raft\x1a\x0bqueue.proto\"\x90\x01\n\x08VoteArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0c\x63\x61ndidate_id\x18\x02 \x01(\x05\x12\x16\n\x0elast_log_index\x18\x03 \x01(\x05\x12\x15\n\rlast_log_term\x18\x04 \x01(\x05\x12\x10\n\x08pre_vote\x18\x05 \x01(\x08\x12\x10\n\x08transfer\x18\x06 \x01(\x08\x12\r\n\x05group\x18\x07 \x01(\t\"/\n\tVoteReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0cvote_granted\x18\x02 \x01(\x08\"\xb9\x01\n\nAppendArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\x16\n\x0eprev_log_index\x18\x03 \x01(\x05\x12\x15\n\rprev_log_term\x18\x04 \x01(\x05\x12\x1f\n\x07\x65ntries\x18\x05 \x03(\x0b\x32\x0e.raft.LogEntry\x12\x15\n\rleader_commit\x18\x06 \x01(\x05\x12\r\n\x05group\x18\x07 \x01(\t\x12\x14\n\x0czlib_entries\x18\x08 \x01(\x0c\"s\n\x0b\x41ppendReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x15\n\rconflict_term\x18\x03 \x01(\x05\x12\x1b\n\x0e\x63onflict_index\x18\x04 \x01(\x05H\x00\x88\x01\x01\x42\x11\n\x0f_conflict_index\"6\n\x0eHeartbeatBatch\x12$\n\nheartbeats\x18\x01 \x03(\x0b\x32\x10.raft.AppendArgs\"J\n\x13HeartbeatBatchReply\x12\"\n\x07replies\x18\x01 \x03(\x0b\x32\x11.raft.AppendReply\x12\x0f\n\x07unknown\x18\x02 \x03(\x05\"\xe2\x03\n\x08LogEntry\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07\x63ommand\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x12\x11\n\tclient_id\x18\x04 \x01(\t\x12\x0b\n\x03seq\x18\x05 \x01(\x04\x12\x11\n\tseq_floor\x18\x06 \x01(\x04\x12\x0c\n\x04time\x18\x07 \x01(\x01\x12\x1d\n\x02op\x18\x08 \x01(\x0e\x32\x11.raft.LogEntry.Op\x12\x1d\n\x05track\x18\t \x01(\x0b\x32\x0c.queue.TrackH\x00\x12\"\n\x08track_id\x18\n \x01(\x0b\x32\x0e.queue.TrackIdH\x00\x12\"\n\x04vote\x18\x0b \x01(\x0b\x32\x12.queue.VoteRequestH\x00\x12#\n\x06tracks\x18\x0c \x01(\x0b\x32\x11.queue.TrackBatchH\x00\x12(\n\ttrack_ids\x18\r \x01(\x0b\x32\x13.queue.TrackIdBatchH\x00\x12\"\n\x06\x63onfig\x18\x0e \x01(\x0b\x32\x10.raft.MembershipH\x00\"d\n\x02Op\x12\x08\n\x04NOOP\x10\x00\x12\x07\n\x03\x41\x44\x44\x10\x01\x12\n\n\x06REMOVE\x10\x02\x12\x08\n\x04VOTE\x10\x03\x12\r\n\tADD_BATCH\x10\x04\x12\x10\n\x0cREMOVE_BATCH\x10\x05\x12\x08\n\x04PLAY\x10\x06\x12\n\n\x06\x43ONFIG\x10\x07\x42\t\n\x07payload\"-\n\nEntryBatch\x12\x1f\n\x07\x65ntries\x18\x01 \x03(\x0b\x32\x0e.raft.LogEntry\"\x85\x01\n\x0cSnapshotArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\x1b\n\x13last_included_index\x18\x03 \x01(\x05\x12\x1a\n\x12last_included_term\x18\x04 \x01(\x05\x12\x0c\n\x04\x64\x61ta\x18\x05 \x01(\x0c\x12\r\n\x05group\x18\x06 \x01(\t\"\x1d\n\rSnapshotReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\"-\n\rReadIndexArgs\x12\r\n\x05lease\x18\x01 \x01(\x08\x12\r\n\x05group\x18\x02 \x01(\t\"H\n\x0eReadIndexReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x12\n\nread_index\x18\x02 \x01(\x05\x12\x11\n\tleader_id\x18\x03 \x01(\x05\"@\n\x0eTimeoutNowArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\r\n\x05group\x18\x03 \x01(\t\"\x1f\n\x0fTimeoutNowReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\"0\n\x0cTransferArgs\x12\x11\n\ttarget_id\x18\x01 \x01(\x05\x12\r\n\x05group\x18\x02 \x01(\t\"D\n\rTransferReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\x0f\n\x07message\x18\x03 \x01(\t\"B\n\x06Member\x12\n\n\x02id\x18\x01 \x01(\x05\x12\x0c\n\x04\x61\x64\x64r\x18\x02 \x01(\t\x12\r\n\x05voter\x18\x03 \x01(\x08\x12\x0f\n\x07learner\x18\x04 \x01(\x08\"+\n\nMembership\x12\x1d\n\x07members\x18\x01 \x03(\x0b\x32\x0c.raft.Member\"I\n\x08NodeArgs\x12\x0f\n\x07node_id\x18\x01 \x01(\x05\x12\x0c\n\x04\x61\x64\x64r\x18\x02 \x01(\t\x12\x0f\n\x07learner\x18\x03 \x01(\x08\x12\r\n\x05group\x18\x04 \x01(\t\"e\n\x0fMembershipReply\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x0f\n\x07message\x18\x02 \x01(\t\x12\x11\n\tleader_id\x18\x03 \x01(\x05\x12\x1d\n\x07members\x18\x04 \x03(\x0b\x32\x0c.raft.Member\"\x91\x01\n\rStateSnapshot\x12\x1b\n\x05queue\x18\x01 \x03(\x0b\x32\x0c.queue.Track\x12\x1d\n\x07history\x18\x02 \x03(\x0b\x32\x0c.queue.Track\x12\x1d\n\x07members\x18\x03 \x03(\x0b\x32\x0c.raft.Member\x12%\n\x08sessions\x18\x04 \x03(\x0b\x32\x13.raft.ClientSession\"k\n\rClientSession\x12\x11\n\tclient_id\x18\x01 \x01(\t\x12\x13\n\x0blast_active\x18\x02 \x01(\x01\x12\r\n\x05\x66loor\x18\x03 \x01(\x04\x12#\n\x07replies\x18\x04 \x03(\x0b\x32\x12.raft.SessionReply\"U\n\x0cSessionReply\x12\x0b\n\x03seq\x18\x01 \x01(\x04\x12\x1d\n\x05track\x18\x02 \x01(\x0b\x32\x0c.queue.TrackH\x00\x12\x0f\n\x05\x63ount\x18\x03 \x01(\x03H\x00\x42\x08\n\x06result2\x99\x04\n\x0bRaftService\x12\x30\n\x0bRequestVote\x12\x0e.raft.VoteArgs\x1a\x0f.raft.VoteReply\"\x00\x12\x36\n\rAppendEntries\x12\x10.raft.AppendArgs\x1a\x11.raft.AppendReply\"\x00\x12<\n\x0fInstallSnapshot\x12\x12.raft.SnapshotArgs\x1a\x13.raft.SnapshotReply\"\x00\x12\x38\n\tReadIndex\x12\x13.raft.ReadIndexArgs\x1a\x14.raft.ReadIndexReply\"\x00\x12;\n\nTimeoutNow\x12\x14.raft.TimeoutNowArgs\x1a\x15.raft.TimeoutNowReply\"\x00\x12?\n\x12TransferLeadership\x12\x12.raft.TransferArgs\x1a\x13.raft.TransferReply\"\x00\x12\x32\n\x07\x41\x64\x64Node\x12\x0e.raft.NodeArgs\x1a\x15.raft.MembershipReply\"\x00\x12\x35\n\nRemoveNode\x12\x0e.raft.NodeArgs\x1a\x15.raft.MembershipReply\"\x00\x12?\n\nHeartbeats\x12\x14.raft.HeartbeatBatch\x1a\x19.raft.HeartbeatBatchReply\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'raft_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_VOTEARGS']._serialized_start=20
-  _globals['_VOTEARGS']._serialized_end=113
-  _globals['_VOTEREPLY']._serialized_start=115
-  _globals['_VOTEREPLY']._serialized_end=162
-  _globals['_APPENDARGS']._serialized_start=165
-  _globals['_APPENDARGS']._serialized_end=313
-  _globals['_APPENDREPLY']._serialized_start=315
-  _globals['_APPENDREPLY']._serialized_end=359
-  _globals['_LOGENTRY']._serialized_start=361
-  _globals['_LOGENTRY']._serialized_end=416
-  _globals['_RAFTSERVICE']._serialized_start=418
-  _globals['_RAFTSERVICE']._serialized_end=537
+  _globals['_VOTEARGS']._serialized_start=34
+  _globals['_VOTEARGS']._serialized_end=178
+  _globals['_VOTEREPLY']._serialized_start=180
+  _globals['_VOTEREPLY']._serialized_end=227
+  _globals['_APPENDARGS']._serialized_start=230
+  _globals['_APPENDARGS']._serialized_end=415
+  _globals['_APPENDREPLY']._serialized_start=417
+  _globals['_APPENDREPLY']._serialized_end=532
+  _globals['_HEARTBEATBATCH']._serialized_start=534
+  _globals['_HEARTBEATBATCH']._serialized_end=588
+  _globals['_HEARTBEATBATCHREPLY']._serialized_start=590
+  _globals['_HEARTBEATBATCHREPLY']._serialized_end=664
+  _globals['_LOGENTRY']._serialized_start=667
+  _globals['_LOGENTRY']._serialized_end=1149
+  _globals['_LOGENTRY_OP']._serialized_start=1038
+  _globals['_LOGENTRY_OP']._serialized_end=1138
+  _globals['_ENTRYBATCH']._serialized_start=1151
+  _globals['_ENTRYBATCH']._serialized_end=1196
+  _globals['_SNAPSHOTARGS']._serialized_start=1199
+  _globals['_SNAPSHOTARGS']._serialized_end=1332
+  _globals['_SNAPSHOTREPLY']._serialized_start=1334
+  _globals['_SNAPSHOTREPLY']._serialized_end=1363
+  _globals['_READINDEXARGS']._serialized_start=1365
+  _globals['_READINDEXARGS']._serialized_end=1410
+  _globals['_READINDEXREPLY']._serialized_start=1412
+  _globals['_READINDEXREPLY']._serialized_end=1484
+  _globals['_TIMEOUTNOWARGS']._serialized_start=1486
+  _globals['_TIMEOUTNOWARGS']._serialized_end=1550
+  _globals['_TIMEOUTNOWREPLY']._serialized_start=1552
+  _globals['_TIMEOUTNOWREPLY']._serialized_end=1583
+  _globals['_TRANSFERARGS']._serialized_start=1585
+  _globals['_TRANSFERARGS']._serialized_end=1633
+  _globals['_TRANSFERREPLY']._serialized_start=1635
+  _globals['_TRANSFERREPLY']._serialized_end=1703
+  _globals['_MEMBER']._serialized_start=1705
+  _globals['_MEMBER']._serialized_end=1771
+  _globals['_MEMBERSHIP']._serialized_start=1773
+  _globals['_MEMBERSHIP']._serialized_end=1816
+  _globals['_NODEARGS']._serialized_start=1818
+  _globals['_NODEARGS']._serialized_end=1891
+  _globals['_MEMBERSHIPREPLY']._serialized_start=1893
+  _globals['_MEMBERSHIPREPLY']._serialized_end=1994
+  _globals['_STATESNAPSHOT']._serialized_start=1997
+  _globals['_STATESNAPSHOT']._serialized_end=2142
+  _globals['_CLIENTSESSION']._serialized_start=2144
+  _globals['_CLIENTSESSION']._serialized_end=2251
+  _globals['_SESSIONREPLY']._serialized_start=2253
+  _globals['_SESSIONREPLY']._serialized_end=2338
+  _globals['_RAFTSERVICE']._serialized_start=2341
+  _globals['_RAFTSERVICE']._serialized_end=2878
 # @@protoc_insertion_point(module_scope)
@@ -44,6 +44,41 @@ class RaftServiceStub(object):
                 request_serializer=raft__pb2.AppendArgs.SerializeToString,
                 response_deserializer=raft__pb2.AppendReply.FromString,
                 _registered_method=True)
+        self.InstallSnapshot = channel.unary_unary(
+                '/raft.RaftService/InstallSnapshot',
+                request_serializer=raft__pb2.SnapshotArgs.SerializeToString,
+                response_deserializer=raft__pb2.SnapshotReply.FromString,
+                _registered_method=True)
+        self.ReadIndex = channel.unary_unary(
+                '/raft.RaftService/ReadIndex',
+                request_serializer=raft__pb2.ReadIndexArgs.SerializeToString,
+                response_deserializer=raft__pb2.ReadIndexReply.FromString,
+                _registered_method=True)
+        self.TimeoutNow = channel.unary_unary(
+                '/raft.RaftService/TimeoutNow',
+                request_serializer=raft__pb2.TimeoutNowArgs.SerializeToString,
+                response_deserializer=raft__pb2.TimeoutNowReply.FromString,
+                _registered_method=True)
+        self.TransferLeadership = channel.unary_unary(
+                '/raft.RaftService/TransferLeadership',
+                request_serializer=raft__pb2.TransferArgs.SerializeToString,
+                response_deserializer=raft__pb2.TransferReply.FromString,
+                _registered_method=True)
+        self.AddNode = channel.unary_unary(
+                '/raft.RaftService/AddNode',
+                request_serializer=raft__pb2.NodeArgs.SerializeToString,
+                response_deserializer=raft__pb2.MembershipReply.FromString,
+                _registered_method=True)
+        self.RemoveNode = channel.unary_unary(
+                '/raft.RaftService/RemoveNode',
+                request_serializer=raft__pb2.NodeArgs.SerializeToString,
+                response_deserializer=raft__pb2.MembershipReply.FromString,
+                _registered_method=True)
+        self.Heartbeats = channel.unary_unary(
+                '/raft.RaftService/Heartbeats',
+                request_serializer=raft__pb2.HeartbeatBatch.SerializeToString,
+                response_deserializer=raft__pb2.HeartbeatBatchReply.FromString,
+                _registered_method=True)
 
 
 class RaftServiceServicer(object):
@@ -61,6 +96,51 @@ class RaftServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def InstallSnapshot(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ReadIndex(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TimeoutNow(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def TransferLeadership(self, request, context):
+        """Admin: hand leadership to another node, e.g. before restarting this one
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AddNode(self, request, context):
+        """Admin: grow or shrink the cluster, one node at a time
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RemoveNode(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Heartbeats(self, request, context):
+        """Empty AppendEntries of every group the caller leads, in one call per follower
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_RaftServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -74,6 +154,41 @@ def add_RaftServiceServicer_to_server(servicer, server):
                     request_deserializer=raft__pb2.AppendArgs.FromString,
                     response_serializer=raft__pb2.AppendReply.SerializeToString,
             ),
+            'InstallSnapshot': grpc.unary_unary_rpc_method_handler(
+                    servicer.InstallSnapshot,
+                    request_deserializer=raft__pb2.SnapshotArgs.FromString,
+                    response_serializer=raft__pb2.SnapshotReply.SerializeToString,
+            ),
+            'ReadIndex': grpc.unary_unary_rpc_method_handler(
+                    servicer.ReadIndex,
+                    request_deserializer=raft__pb2.ReadIndexArgs.FromString,
+                    response_serializer=raft__pb2.ReadIndexReply.SerializeToString,
+            ),
+            'TimeoutNow': grpc.unary_unary_rpc_method_handler(
+                    servicer.TimeoutNow,
+                    request_deserializer=raft__pb2.TimeoutNowArgs.FromString,
+                    response_serializer=raft__pb2.TimeoutNowReply.SerializeToString,
+            ),
+            'TransferLeadership': grpc.unary_unary_rpc_method_handler(
+                    servicer.TransferLeadership,
+                    request_deserializer=raft__pb2.TransferArgs.FromString,
+                    response_serializer=raft__pb2.TransferReply.SerializeToString,
+            ),
+            'AddNode': grpc.unary_unary_rpc_method_handler(
+                    servicer.AddNode,
+                    request_deserializer=raft__pb2.NodeArgs.FromString,
+                    response_serializer=raft__pb2.MembershipReply.SerializeToString,
+            ),
+            'RemoveNode': grpc.unary_unary_rpc_method_handler(
+                    servicer.RemoveNode,
+                    request_deserializer=raft__pb2.NodeArgs.FromString,
+                    response_serializer=raft__pb2.MembershipReply.SerializeToString,
+            ),
+            'Heartbeats': grpc.unary_unary_rpc_method_handler(
+                    servicer.Heartbeats,
+                    request_deserializer=raft__pb2.HeartbeatBatch.FromString,
+                    response_serializer=raft__pb2.HeartbeatBatchReply.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'raft.RaftService', rpc_method_handlers)
@@ -138,3 +253,192 @@ class RaftService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def InstallSnapshot(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/raft.RaftService/InstallSnapshot',
+            raft__pb2.SnapshotArgs.SerializeToString,
+            raft__pb2.SnapshotReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ReadIndex(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/raft.RaftService/ReadIndex',
+            raft__pb2.ReadIndexArgs.SerializeToString,
+            raft__pb2.ReadIndexReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def TimeoutNow(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/raft.RaftService/TimeoutNow',
+            raft__pb2.TimeoutNowArgs.SerializeToString,
+            raft__pb2.TimeoutNowReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def TransferLeadership(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/raft.RaftService/TransferLeadership',
+            raft__pb2.TransferArgs.SerializeToString,
+            raft__pb2.TransferReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def AddNode(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/raft.RaftService/AddNode',
+            raft__pb2.NodeArgs.SerializeToString,
+            raft__pb2.MembershipReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RemoveNode(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/raft.RaftService/RemoveNode',
+            raft__pb2.NodeArgs.SerializeToString,
+            raft__pb2.MembershipReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def Heartbeats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/raft.RaftService/Heartbeats',
+            raft__pb2.HeartbeatBatch.SerializeToString,
+            raft__pb2.HeartbeatBatchReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -1,17 +1,25 @@
 import grpc
 from concurrent import futures
+import bisect
 import time
 import random
 import threading
 import os
 import sys
+import signal
 import logging
+import zlib
 
 # Import generated gRPC code
 import raft_pb2
 import raft_pb2_grpc
 import queue_pb2
 import queue_pb2_grpc
+from raft_storage import RaftStorage
+from queue_state import QueueState
+from queue_events import QueueEvents
+from client_sessions import ClientSessions
+from timers import Timers
 
 # Setup logging
 logging.basicConfig(
@@ -21,281 +29,1640 @@ logging.basicConfig(
 logger = logging.getLogger()
 logger = logging.LoggerAdapter(logger, {"node": int(os.environ.get("NODE_ID", 1))})
 
+
+class GroupLogger(logging.LoggerAdapter):
+    # Tags the messages of one Raft group when a node runs several (multi_raft_server.py)
+    def process(self, msg, kwargs):
+        return f"[queue {self.extra['group']}] {msg}", kwargs
+
 # --- Configuration ---
 NODE_ID = int(os.environ.get('NODE_ID', 1))
 PEERS_MAP = os.environ.get('PEERS', '')  # Example: "1=raft-node1:50051,2=raft-node2:50051,..."
 PEERS = {}
+SELF_ADDR = ''
 if PEERS_MAP:
     for p in PEERS_MAP.split(','):
         pid, addr = p.split('=')
         if int(pid) != NODE_ID:
             PEERS[int(pid)] = addr
+        else:
+            SELF_ADDR = addr
+# PEERS is only the first configuration; AddNode/RemoveNode change it through
+# the log. A node started with JOIN=1 waits for the leader to add it instead.
+JOIN = os.environ.get('JOIN', '0') == '1'
+# PEERS ids that start as learners for good: they replicate and serve reads but never vote
+LEARNERS = {int(pid) for pid in os.environ.get('LEARNERS', '').split(',') if pid}
+MEMBERSHIP_TIMEOUT = float(os.environ.get('MEMBERSHIP_TIMEOUT', 30.0))  # AddNode waits for the learner to catch up
 
 # --- Raft timing settings ---
 HEARTBEAT_INTERVAL = 1.0      # Heartbeat timeout (seconds)
 ELECTION_MIN = 1.5            # Election timeout min
 ELECTION_MAX = 3.0            # Election timeout max
+RPC_TIMEOUT = 0.5             # AppendEntries / RequestVote deadline
+# Ask a majority whether we could win before bumping the term, so a node
+# that was cut off does not come back with a higher term and depose the leader
+PRE_VOTE = os.environ.get('PRE_VOTE', '1') == '1'
+# A leader that has not heard from a majority for ELECTION_MAX steps down
+CHECK_QUORUM = os.environ.get('CHECK_QUORUM', '1') == '1'
+MAX_APPEND_ENTRIES = int(os.environ.get('MAX_APPEND_ENTRIES', 512))  # Entries per AppendEntries RPC
+MAX_APPEND_BYTES = int(os.environ.get('MAX_APPEND_BYTES', 1024 * 1024))  # Payload cap, batch entries are large
+MAX_INFLIGHT_APPENDS = int(os.environ.get('MAX_INFLIGHT_APPENDS', 4))  # Pipelined AppendEntries per follower
+# AppendEntries whose entries serialize to at least this many bytes (catch-up,
+# big AddTracks batches) ship them zlib-compressed; 0 turns compression off
+COMPRESS_APPEND_BYTES = int(os.environ.get('COMPRESS_APPEND_BYTES', 16384))
+COMPRESS_LEVEL = 1  # fastest; level 6 costs more CPU for a few percent smaller batches
+PORT = int(os.environ.get('PORT', 50051))
+
+# --- Client acknowledgements ---
+# With COMMIT_WAIT on, AddTrack/RemoveTrack reply only once a majority has the
+# entry and it has been applied. A client can override it per call with the
+# "commit-wait" metadata key ("1"/"0").
+COMMIT_WAIT = os.environ.get('COMMIT_WAIT', '1') == '1'
+CLIENT_APPLY_TIMEOUT = float(os.environ.get('CLIENT_APPLY_TIMEOUT', 5.0))
+# What AddTrack/RemoveTrack/VoteTrack send back in the queue field,
+# overridable per call with the "write-reply" metadata key:
+#   full  - the whole queue
+#   delta - just the track the write touched (nothing once it is gone)
+#   ack   - nothing, only the message
+WRITE_REPLY = os.environ.get('WRITE_REPLY', 'full')
+# Smart clients tag each write with "client-id", "seq" and "seq-floor"
+# metadata, and a retried seq gets the first reply instead of being applied
+# again. Sessions idle for SESSION_TIMEOUT seconds are dropped, as are the
+# least recently used beyond MAX_SESSIONS.
+SESSION_TIMEOUT = float(os.environ.get('SESSION_TIMEOUT', 3600.0))
+MAX_SESSIONS = int(os.environ.get('MAX_SESSIONS', 10000))
+MAX_SESSION_REPLIES = 1000  # Replies kept per session
+# Metadata a follower passes on when it forwards a write to the leader
+FORWARDED_METADATA = ("commit-wait", "write-reply", "client-id", "seq", "seq-floor")
+
+# --- Reads ---
+# GetQueue consistency, overridable per call with the "read-mode" metadata key:
+#   readindex - linearizable: the leader confirms it still leads with one heartbeat round
+#   lease     - linearizable while the leader's lease holds, no extra round trip
+#   stale     - whatever this node has applied
+READ_MODE = os.environ.get('READ_MODE', 'readindex')
+# Followers that heard from a leader within ELECTION_MIN refuse to vote, so a
+# lease shorter than that (with margin for clock drift) cannot overlap a new leader
+LEASE_DURATION = ELECTION_MIN * 0.8
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 100))  # Default tracks per page and per streamed message
+
+# --- Watchers ---
+WATCH_BACKLOG = int(os.environ.get('WATCH_BACKLOG', 10000))  # Recent queue events kept for WatchQueue resumes
+MAX_WATCHERS = int(os.environ.get('MAX_WATCHERS', 200))  # Concurrent WatchQueue streams, one server thread each
+WATCH_IDLE_CHECK = 5.0  # Seconds an idle watcher sleeps before checking its client is still there
+
+# --- Persistence ---
+DATA_DIR = os.environ.get('DATA_DIR', f'raft-data/node{NODE_ID}')  # WAL segments + term/vote file
+WAL_SYNC = os.environ.get('WAL_SYNC', 'group')  # "group" (batched fsync) or "entry" (fsync per entry)
+SNAPSHOT_THRESHOLD = int(os.environ.get('SNAPSHOT_THRESHOLD', 1000))  # Applied entries between snapshots
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024  # InstallSnapshot ships the whole queue in one message
+
+# LogEntry payload field holding the request of each op (NOOP and PLAY have none)
+PAYLOAD_FIELDS = {
+    raft_pb2.LogEntry.ADD: "track",
+    raft_pb2.LogEntry.REMOVE: "track_id",
+    raft_pb2.LogEntry.VOTE: "vote",
+    raft_pb2.LogEntry.ADD_BATCH: "tracks",
+    raft_pb2.LogEntry.REMOVE_BATCH: "track_ids",
+    raft_pb2.LogEntry.CONFIG: "config",
+}
 
 class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceServicer):
-    def __init__(self):
+    serialized_replies = False  # set by add_queue_service: reads may reply with bytes
+
+    def __init__(self, group=''):
+        # group names this Raft group when the node runs one per queue; the
+        # default queue's group ('') keeps its log directly in DATA_DIR
+        self.group = group
+        self.logger = GroupLogger(logger, {"group": group}) if group else logger
+        # self.lock guards the Raft state (term, log, commit index, replication);
+        # state_lock the state machine below. The apply thread copies committed
+        # entries out under self.lock and applies them under state_lock, so
+        # reads and consensus never wait for each other. A thread that takes
+        # both takes self.lock first.
         self.lock = threading.RLock()
-
-        # Raft state
-        self.current_term = 0
-        self.voted_for = None
-        self.log = []  # List of LogEntry
-        self.commit_index = -1
-        self.last_applied = -1
-        self.state = "FOLLOWER"
+        self.state_lock = threading.RLock()
+
+        # App state, as applied up to last_applied
+        self.music_queue = QueueState()
+        self.history = []  # Tracks already played, oldest first
+        self.sessions = ClientSessions(SESSION_TIMEOUT, MAX_SESSIONS, MAX_SESSION_REPLIES)
+        # Whole-queue read replies, built once per applied index: name -> (index, reply)
+        self.views = {}
+
+        # Persistent Raft state, recovered from DATA_DIR on restart.
+        # The log only holds entries after the snapshot: self.log[0] is index snapshot_index + 1.
+        self.storage = RaftStorage(os.path.join(DATA_DIR, 'queues', group) if group else DATA_DIR,
+                                   sync_mode=WAL_SYNC)
+        self.current_term, self.voted_for = self.storage.load_meta()
+        self.snapshot_index = -1
+        self.snapshot_term = 0
+        self.snapshot_members = self._initial_members()  # configuration as of the snapshot
+        self.snapshot_data = self._snapshot_state(self.snapshot_index)
+        snapshot = self.storage.load_snapshot()
+        if snapshot:
+            self.snapshot_index, self.snapshot_term, self.snapshot_data = snapshot
+            self._restore_state(self.snapshot_data)
+        self.log = self.storage.load_log(self.snapshot_index + 1)  # List of LogEntry
+        for entry in self.log:
+            self._upgrade_entry(entry)
+        # Changes applied after the snapshot, replayed to WatchQueue streams
+        self.events = QueueEvents(WATCH_BACKLOG, floor=self.snapshot_index)
+        self.logger.info(f"Recovered term={self.current_term} voted_for={self.voted_for} "
+                    f"snapshot_index={self.snapshot_index} log entries={len(self.log)}")
+
+        # Volatile Raft state
+        self.commit_index = self.snapshot_index
+        self.last_applied = self.snapshot_index  # guarded by state_lock; the apply thread moves it
+        # log index -> result of applying it, for a client waiting on the leader. The
+        # key is added under self.lock before the entry can commit, the rest under state_lock
+        self.apply_results = {}
+        self.state = "FOLLOWER"  # or PRE_CANDIDATE, CANDIDATE, LEADER
         self.leader_id = None
         self.last_heartbeat = time.time()
         self.election_timeout = random.uniform(ELECTION_MIN, ELECTION_MAX)
+        self.leader_since = 0  # when we last became leader
+
+        # Leader-only replication state
+        self.next_index = {}   # peer_id -> next log index to send
+        self.match_index = {}  # peer_id -> highest index known to be replicated (NODE_ID: durable on the leader)
+        self.snapshots_in_flight = set()  # peer_ids with an InstallSnapshot outstanding
+        self.send_index = {}   # peer_id -> next index to put on the wire (ahead of next_index while pipelining)
+        self.inflight = {}     # peer_id -> AppendEntries RPCs awaiting a reply
+        self.sent_commit = {}  # peer_id -> leader_commit carried by the last AppendEntries
+        self.heartbeat_due = {}  # peer_id -> time the next (possibly empty) AppendEntries is due
+        self.retry_at = {}     # peer_id -> back off until this time after an RPC error
+        self.read_seq = 0      # bumped by each ReadIndex that needs leadership confirmed
+        self.sent_read_seq = {}  # peer_id -> read_seq carried by the last AppendEntries
+        self.acked_read_seq = {}  # peer_id -> highest read_seq the follower answered in our term
+        self.acked_sent_at = {}  # peer_id -> send time of the latest AppendEntries answered in our term
+
+        # One long-lived channel and replicator thread per follower. Replicators
+        # sleep on replicate_cond and are woken by new entries or a commit advance.
+        self.replicate_cond = threading.Condition(self.lock)
+        # Set when the node sends the idle heartbeats of all its groups in one
+        # Heartbeats call per follower; replicators then only send real work
+        self.batched_heartbeats = False
+        # Client writes waiting for their entry to commit, and the apply thread
+        self.commit_cond = threading.Condition(self.lock)
+        # Client writes and reads waiting for an index to be applied
+        self.apply_cond = threading.Condition(self.state_lock)
+        # ReadIndex requests waiting for a heartbeat round to confirm leadership
+        self.read_cond = threading.Condition(self.lock)
+        # WatchQueue streams waiting for the next applied change
+        self.watch_cond = threading.Condition(self.state_lock)
+        self.watchers = 0
+
+        # Cluster configuration: the latest CONFIG entry in the log, else the snapshot's.
+        # Filled in by _set_members once the node has started.
+        self.members = []      # raft_pb2.Member of every node, this one included
+        self.peers = {}        # peer_id -> address of every other member, learners included
+        self.voters = set()    # ids that vote and count for commits (this node too, normally)
+        self.config_index = -1  # log index of the configuration in force
 
         # Votes for election
         self.votes_received = 0
+        # Follower we are handing leadership to; client writes wait meanwhile
+        self.transfer_target = None
+        # Term in which we last sent TimeoutNow: the target may still win an election for it
+        self.timeout_now_term = None
+
+        self._stop = threading.Event()
+        self.timer = None  # the election (or, on a leader, check-quorum) deadline
+        self.channels = {}
+        self.peer_stubs = {}
+        self.peer_queue_stubs = {}
+        self._start()
+        with self.lock:
+            self._set_members(*self._members_at(self._last_log_index()))
+            self._schedule_timer()
+
+    def _start(self):
+        # Deadlines are kept on a timer thread that sleeps until the next one is due
+        self.timers = Timers()
+        threading.Thread(target=self._apply_loop, daemon=True).start()
+
+    def _connect(self, pid, addr):
+        # Caller holds the lock. One long-lived channel and replicator thread per peer
+        self.channels[pid] = channel = grpc.insecure_channel(addr)
+        self.peer_stubs[pid] = stub = raft_pb2_grpc.RaftServiceStub(channel)
+        # Client writes forwarded to the leader share the Raft connections
+        self.peer_queue_stubs[pid] = queue_pb2_grpc.QueueServiceStub(channel)
+        threading.Thread(target=self._replicator_loop, args=(pid, stub), daemon=True).start()
+
+    def _disconnect(self, pid):
+        # Caller holds the lock. The replicator exits once its stub is gone
+        del self.peer_stubs[pid], self.peer_queue_stubs[pid]
+        self.channels.pop(pid).close()
+        self.replicate_cond.notify_all()
 
-        # App state
-        self.music_queue = []
+    # =========================================================
+    # Persistence helpers (caller holds the lock)
+    # =========================================================
+    def _persist_meta(self):
+        self.storage.save_meta(self.current_term, self.voted_for)
+
+    def _log_append(self, entries):
+        self.log.extend(entries)
+        last = self.storage.append(entries)
+        for i in range(len(entries) - 1, -1, -1):
+            if entries[i].op == raft_pb2.LogEntry.CONFIG:
+                # A configuration is used as soon as it is in the log
+                self._set_members(list(entries[i].config.members), last - len(entries) + 1 + i)
+                break
+        return last
+
+    def _log_truncate(self, index):
+        del self.log[index - self.snapshot_index - 1:]
+        self.storage.truncate(index)
+        if self.config_index >= index:
+            # The configuration came from the discarded suffix: fall back to the one before
+            self._set_members(*self._members_at(index - 1))
 
-        # Start background timer loop
-        threading.Thread(target=self._timer_loop, daemon=True).start()
+    # =========================================================
+    # Log indexing (absolute indexes, the prefix may be in the snapshot)
+    # =========================================================
+    def _last_log_index(self):
+        return self.snapshot_index + len(self.log)
+
+    def _term_at(self, index):
+        if index == self.snapshot_index:
+            return self.snapshot_term
+        return self.log[index - self.snapshot_index - 1].term
+
+    def _entry_at(self, index):
+        return self.log[index - self.snapshot_index - 1]
+
+    def _upgrade_entry(self, entry):
+        # Entries logged before LogEntry.op name it in command and carry the
+        # serialized request in data; move both to op and its payload field
+        if not entry.command:
+            return
+        entry.op = raft_pb2.LogEntry.Op.Value(entry.command)
+        if entry.op in PAYLOAD_FIELDS:
+            getattr(entry, PAYLOAD_FIELDS[entry.op]).ParseFromString(entry.data)
+        entry.ClearField("command")
+        entry.ClearField("data")
 
     # =========================================================
-    # Timer loop: heartbeat & election
+    # Snapshots
     # =========================================================
-    def _timer_loop(self):
-        while True:
-            with self.lock:
-                now = time.time()
+    def _snapshot_state(self, index):
+        # State machine as applied up to index, with the configuration in force there
+        sessions = [raft_pb2.ClientSession(client_id=client_id, last_active=last_active, floor=floor,
+                                           replies=[self._session_reply(seq, reply) for seq, reply in replies.items()])
+                    for client_id, last_active, floor, replies in self.sessions.sessions()]
+        return raft_pb2.StateSnapshot(queue=self.music_queue.tracks(), history=self.history,
+                                      members=self._members_at(index)[0], sessions=sessions).SerializeToString()
+
+    def _session_reply(self, seq, result):
+        # Apply results are a Track, a count (True/False for ADD) or None
+        if isinstance(result, queue_pb2.Track):
+            return raft_pb2.SessionReply(seq=seq, track=result)
+        if result is None:
+            return raft_pb2.SessionReply(seq=seq)
+        return raft_pb2.SessionReply(seq=seq, count=int(result))
+
+    def _session_result(self, reply):
+        field = reply.WhichOneof("result")
+        return getattr(reply, field) if field else None
+
+    def _restore_state(self, data):
+        state = raft_pb2.StateSnapshot()
+        state.ParseFromString(data)
+        self.music_queue = QueueState(state.queue)
+        self.history = list(state.history)
+        self.sessions = ClientSessions(SESSION_TIMEOUT, MAX_SESSIONS, MAX_SESSION_REPLIES, [
+            (session.client_id, session.last_active, session.floor,
+             {reply.seq: self._session_result(reply) for reply in session.replies})
+            for session in state.sessions])
+        if state.members:
+            self.snapshot_members = list(state.members)
+
+    def _maybe_snapshot(self):
+        # Replace the applied log prefix with a snapshot every SNAPSHOT_THRESHOLD entries
+        with self.lock, self.state_lock:
+            if self.last_applied - self.snapshot_index < SNAPSHOT_THRESHOLD:
+                return
+            index, term = self.last_applied, self._term_at(self.last_applied)
+            data = self._snapshot_state(index)
+            self.storage.save_snapshot(index, term, data)
+            self._compact_log(index, term, data)
+
+    def _compact_log(self, index, term, data):
+        # Caller holds the lock: the snapshot of log[index] just saved replaces the log up to it
+        self.snapshot_members = self._members_at(index)[0]
+        del self.log[:index - self.snapshot_index]
+        self.snapshot_index, self.snapshot_term, self.snapshot_data = index, term, data
+        self.storage.compact(index)
+        self.logger.info(f"Snapshot taken at log[{index}] ({len(data)} bytes), {len(self.log)} entries kept")
+
+    # =========================================================
+    # Cluster membership (single-server changes, see AddNode/RemoveNode)
+    # =========================================================
+    def _initial_members(self):
+        # Every node in PEERS votes except LEARNERS; a joining node knows nobody until the leader adds it
+        if JOIN:
+            return []
+        return [raft_pb2.Member(id=pid, addr=addr, voter=pid not in LEARNERS, learner=pid in LEARNERS)
+                for pid, addr in [(NODE_ID, SELF_ADDR)] + list(PEERS.items())]
+
+    def _members_at(self, index):
+        # Caller holds the lock. (members, index of the entry that set them) in
+        # force at log[index]: the latest CONFIG entry up to it, else the snapshot's
+        for i in range(index, self.snapshot_index, -1):
+            entry = self._entry_at(i)
+            if entry.op == raft_pb2.LogEntry.CONFIG:
+                return list(entry.config.members), i
+        return self.snapshot_members, self.snapshot_index
+
+    def _set_members(self, members, index):
+        # Caller holds the lock. Connects to new peers and drops removed ones
+        self.members, self.config_index = members, index
+        self.voters = {m.id for m in members if m.voter}
+        peers = {m.id: m.addr for m in members if m.id != NODE_ID}
+        for pid in self.peers.keys() - peers.keys():
+            self._disconnect(pid)
+        old, self.peers = self.peers, peers
+        for pid, addr in peers.items():
+            if pid not in old:
                 if self.state == "LEADER":
-                    if now - self.last_heartbeat >= HEARTBEAT_INTERVAL:
-                        self._send_heartbeats()
-                        self.last_heartbeat = now
-                else:
-                    if now - self.last_heartbeat >= self.election_timeout:
-                        logger.info(f"Election timeout -> start election")
-                        self._start_election()
-            time.sleep(0.05)
+                    # A new member usually starts empty: ship everything after the snapshot
+                    self._reset_peer(pid, self.snapshot_index + 1)
+                self._connect(pid, addr)
+        self.logger.info(f"Configuration at log[{index}]: voters={sorted(self.voters)} "
+                    f"learners={sorted(m.id for m in members if not m.voter)}")
+
+    def _member(self, node_id):
+        # Caller holds the lock
+        return next((m for m in self.members if m.id == node_id), None)
+
+    def _quorum(self):
+        return len(self.voters) // 2 + 1
+
+    def _config_change_error(self):
+        # Caller holds the lock. One change at a time, and only once the
+        # leader has committed an entry of its own term
+        if self.state != "LEADER":
+            return "Not the leader"
+        if self.config_index > self.commit_index or self._term_at(self.commit_index) != self.current_term:
+            return "Another membership change is in progress, retry"
+        return None
+
+    def _append_config(self, members):
+        # Caller holds the lock and has checked _config_change_error()
+        entry = raft_pb2.LogEntry(term=self.current_term, op=raft_pb2.LogEntry.CONFIG,
+                                  config=raft_pb2.Membership(members=members))
+        index = self._log_append([entry])
+        self._sync_own(index)
+        self._send_heartbeats()
+        return index
+
+    def _maybe_promote(self, pid):
+        # Caller holds the lock. A learner that has caught up with the commit index
+        # becomes a voter, unless it was added as a read replica
+        if pid in self.voters or pid not in self.peers or self._member(pid).learner \
+                or self.match_index[pid] < self.commit_index:
+            return
+        if self._config_change_error() is None:
+            self.logger.info(f"Node {pid} caught up -> promote to voter")
+            self._append_config([raft_pb2.Member(id=m.id, addr=m.addr, voter=m.voter or m.id == pid,
+                                                 learner=m.learner) for m in self.members])
+
+    def _add_member(self, request):
+        # Caller holds the lock. Appends the CONFIG entry for AddNode unless the
+        # node already has the requested role; returns an error message or None
+        member = self._member(request.node_id)
+        if member is not None and member.learner == request.learner:
+            return None
+        error = self._config_change_error()
+        if error:
+            return error
+        if member is None and not request.addr:
+            return f"Node {request.node_id} needs an address"
+        others = [m for m in self.members if m.id != request.node_id]
+        if not any(m.voter for m in others) and request.learner:
+            return "Cannot turn the last voter into a learner"
+        # Joins (or stays) a learner; _maybe_promote makes it a voter unless it is a read replica
+        self._append_config(others + [raft_pb2.Member(id=request.node_id, learner=request.learner,
+                                                      addr=request.addr or member.addr)])
+        return None
+
+    def _added(self, node_id, learner):
+        # Caller holds the lock. A voter counts once promoted, a read replica
+        # once it has the configuration that made it one
+        if not learner:
+            return node_id in self.voters
+        return node_id not in self.voters and self.match_index.get(node_id, 0) >= self.config_index
+
+    # =========================================================
+    # Timers: election & check-quorum
+    # =========================================================
+    def _schedule_timer(self):
+        # Caller holds the lock. Arms the one timer of this node for its next
+        # deadline. Heartbeats only move last_heartbeat, not the timer: when it
+        # fires early it re-arms for the moved deadline, so a follower wakes
+        # about once per election timeout instead of polling.
+        # Leaders heartbeat from the per-peer replicator threads
+        self.timers.cancel(self.timer)
+        if self.state != "LEADER":
+            deadline = self.last_heartbeat + self.election_timeout
+        elif CHECK_QUORUM:
+            # Looked at again within ELECTION_MAX even when alone (no quorum to lose)
+            deadline = min(max(self.leader_since, self._quorum_acked_at()), time.time()) + ELECTION_MAX
+        else:
+            self.timer = None
+            return
+        self.timer = self.timers.call_at(deadline, self._on_timer)
+
+    def _on_timer(self):
+        with self.lock:
+            if self._stop.is_set():
+                return
+            now = time.time()
+            if self.state != "LEADER":
+                # Learners never campaign
+                if NODE_ID in self.voters and now - self.last_heartbeat >= self.election_timeout:
+                    self.logger.info(f"Election timeout -> start election")
+                    self._start_election()
+            else:
+                self._check_quorum(now)
+            self._schedule_timer()
+
+    def _check_quorum(self, now):
+        # Caller holds the lock. A leader cut off from a majority steps down
+        # instead of taking writes it can never commit
+        if CHECK_QUORUM and now - max(self.leader_since, self._quorum_acked_at()) >= ELECTION_MAX:
+            self.logger.info(f"No reply from a majority for {ELECTION_MAX}s -> step down")
+            self._become_follower(self.current_term)
 
     # =========================================================
     # Leader election
     # =========================================================
     def _start_election(self):
+        self.last_heartbeat = time.time()
+        self.election_timeout = random.uniform(ELECTION_MIN, ELECTION_MAX)
+        if PRE_VOTE:
+            self._start_pre_vote()
+        else:
+            self._become_candidate()
+
+    def _start_pre_vote(self):
+        # Our term and vote stay as they are until a majority says we could win
+        self.state = "PRE_CANDIDATE"
+        self.leader_id = None
+        self.votes_received = 1
+        self.logger.info(f"Became PRE_CANDIDATE for term {self.current_term + 1}")
+        self._request_votes(self._vote_args(self.current_term + 1, pre_vote=True))
+
+    def _become_candidate(self, transfer=False):
         self.state = "CANDIDATE"
         self.current_term += 1
         self.voted_for = NODE_ID
         self.votes_received = 1  # Vote for self
-        self.last_heartbeat = time.time()
-        self.election_timeout = random.uniform(ELECTION_MIN, ELECTION_MAX)
-
-        logger.info(f"Became CANDIDATE for term {self.current_term}")
-
-        last_idx = len(self.log) - 1
-        last_term = self.log[last_idx].term if last_idx >= 0 else 0
-
-        args = raft_pb2.VoteArgs(
-            term=self.current_term,
+        self._persist_meta()
+        self.logger.info(f"Became CANDIDATE for term {self.current_term}")
+        self._request_votes(self._vote_args(self.current_term, transfer=transfer))
+
+    def _vote_args(self, term, pre_vote=False, transfer=False):
+        last_idx = self._last_log_index()
+        return raft_pb2.VoteArgs(
+            term=term,
             candidate_id=NODE_ID,
             last_log_index=last_idx,
-            last_log_term=last_term
+            last_log_term=self._term_at(last_idx),
+            pre_vote=pre_vote,
+            transfer=transfer,
+            group=self.group
         )
 
-        for pid, addr in PEERS.items():
-            threading.Thread(target=self._send_vote_request, args=(pid, addr, args)).start()
+    def _request_votes(self, args):
+        # Caller holds the lock. Only voters are asked
+        for pid in self.voters - {NODE_ID}:
+            threading.Thread(target=self._send_vote_request, args=(pid, self.peer_stubs[pid], args)).start()
 
-    def _send_vote_request(self, pid, addr, args):
-        logger.info(f"sends RPC RequestVote to Node {pid}")
+    def _send_vote_request(self, pid, stub, args):
+        self.logger.info(f"sends RPC RequestVote to Node {pid}")
         try:
-            channel = grpc.insecure_channel(addr)
-            stub = raft_pb2_grpc.RaftServiceStub(channel)
-            resp = stub.RequestVote(args, timeout=0.5)
-
+            resp = stub.RequestVote(args, timeout=RPC_TIMEOUT)
             with self.lock:
-                if resp.term > self.current_term:
-                    self._become_follower(resp.term)
-                    return
-                if self.state == "CANDIDATE" and resp.vote_granted:
-                    self.votes_received += 1
-                    if self.votes_received > (len(PEERS) + 1) // 2:
-                        self._become_leader()
+                self._on_vote_reply(args, resp)
         except grpc.RpcError as e:
-            logger.warning(f"Vote request to Node {pid} failed: {e}")
+            self.logger.warning(f"Vote request to Node {pid} failed: {e}")
+
+    def _on_vote_reply(self, args, resp):
+        # Caller holds the lock. A granted pre-vote carries the proposed term
+        if resp.term > self.current_term and not resp.vote_granted:
+            self._become_follower(resp.term)
+            return
+        if not resp.vote_granted:
+            return
+        if args.pre_vote:
+            if self.state == "PRE_CANDIDATE" and args.term == self.current_term + 1:
+                self.votes_received += 1
+                if self.votes_received >= self._quorum():
+                    self._become_candidate()
+        elif self.state == "CANDIDATE" and args.term == self.current_term:
+            self.votes_received += 1
+            if self.votes_received >= self._quorum():
+                self._become_leader()
 
     def _become_leader(self):
         self.state = "LEADER"
         self.leader_id = NODE_ID
-        self.last_heartbeat = time.time()
-        logger.info(f"Won election and became LEADER for term {self.current_term}")
+        self.last_heartbeat = self.leader_since = time.time()
+        self.logger.info(f"Won election and became LEADER for term {self.current_term}")
+        # Optimistically assume followers are up to date; the consistency
+        # check in AppendEntries walks next_index back if they are not.
+        nxt = self._last_log_index() + 1
+        # A no-op of our own term lets entries from earlier terms commit with it
+        noop = raft_pb2.LogEntry(term=self.current_term, op=raft_pb2.LogEntry.NOOP)
+        self._sync_own(self._log_append([noop]))
+        for pid in self.peers:
+            self._reset_peer(pid, nxt)
+        self.read_seq = 0
         self._send_heartbeats()
+        self._schedule_timer()
+
+    def _sync_own(self, index):
+        # Caller holds the lock and appended log[index] as leader: our own
+        # copy counts toward a majority once it is on disk
+        self.storage.sync()
+        self.match_index[NODE_ID] = index
+
+    def _reset_peer(self, pid, nxt):
+        # Caller holds the lock: replication state for one follower or learner
+        self.next_index[pid] = self.send_index[pid] = nxt
+        self.match_index[pid] = -1
+        self.inflight[pid] = 0
+        self.sent_commit[pid] = -1
+        self.heartbeat_due[pid] = self.retry_at[pid] = 0
+        self.sent_read_seq[pid] = self.acked_read_seq[pid] = 0
+        self.acked_sent_at[pid] = 0
 
     def _become_follower(self, term):
+        if term > self.current_term:
+            self.voted_for = None
+            self.current_term = term
+            self._persist_meta()
         self.state = "FOLLOWER"
-        self.current_term = term
-        self.voted_for = None
         self.leader_id = None
         self.last_heartbeat = time.time()
-        logger.info(f"Transition to FOLLOWER term={term}")
+        self.logger.info(f"Transition to FOLLOWER term={term}")
+        self._schedule_timer()
+        self.commit_cond.notify_all()  # pending client writes can no longer commit here
+        self.read_cond.notify_all()
 
     # =========================================================
     # Log replication
     # =========================================================
-    def _send_heartbeats(self):
-        entries = list(self.log)
-        args = raft_pb2.AppendArgs(
+    def _build_append_args(self, pid, nxt=None, max_entries=MAX_APPEND_ENTRIES):
+        # Only ship the suffix the follower is missing (empty for a heartbeat)
+        if nxt is None:
+            nxt = self.next_index.get(pid, self._last_log_index() + 1)
+        prev_idx = nxt - 1
+        start = nxt - self.snapshot_index - 1
+        entries = self.log[start:start + max_entries]
+        size = 0
+        for n, entry in enumerate(entries):
+            size += entry.ByteSize()
+            if size > MAX_APPEND_BYTES and n > 0:  # always at least one entry
+                entries = entries[:n]
+                break
+        return raft_pb2.AppendArgs(
             term=self.current_term,
             leader_id=NODE_ID,
-            prev_log_index=len(self.log)-1,
-            prev_log_term=self.log[-1].term if self.log else 0,
+            prev_log_index=prev_idx,
+            prev_log_term=self._term_at(prev_idx),
             entries=entries,
-            leader_commit=self.commit_index
+            leader_commit=self.commit_index,
+            group=self.group
         )
-        for pid, addr in PEERS.items():
-            threading.Thread(target=self._send_append, args=(pid, addr, args)).start()
 
-    def _send_append(self, pid, addr, args):
-        logger.info(f"sends RPC AppendEntries to Node {pid}")
-        try:
-            channel = grpc.insecure_channel(addr)
-            stub = raft_pb2_grpc.RaftServiceStub(channel)
-            resp = stub.AppendEntries(args, timeout=0.5)
+    def _send_heartbeats(self):
+        # Wake every replicator; each one sends whatever its follower is missing
+        self.replicate_cond.notify_all()
+
+    def _replicator_loop(self, pid, stub):
+        # Long-lived sender for one follower. Entries appended while the
+        # pipeline is full are coalesced into the next AppendEntries.
+        # Runs until the peer leaves the configuration.
+        with self.lock:
+            while not self._stop.is_set() and self.peer_stubs.get(pid) is stub:
+                if self.state != "LEADER":
+                    self.replicate_cond.wait()
+                    continue
+                now = time.time()
+                if now < self.retry_at[pid]:
+                    self.replicate_cond.wait(self.retry_at[pid] - now)
+                    continue
+
+                if self.send_index[pid] <= self.snapshot_index:
+                    # The entries this follower needs were compacted away: send the snapshot
+                    if pid not in self.snapshots_in_flight and self.inflight[pid] == 0:
+                        self._send_snapshot(pid, stub)
+                    self.replicate_cond.wait(HEARTBEAT_INTERVAL)
+                    continue
+
+                pending = self.send_index[pid] <= self._last_log_index()
+                stale_commit = self.sent_commit[pid] < self.commit_index
+                read_pending = self.sent_read_seq[pid] < self.read_seq
+                due = now >= self.heartbeat_due[pid] and not self.batched_heartbeats
+                if self.inflight[pid] >= MAX_INFLIGHT_APPENDS:
+                    # Pipeline full: a reply (or its timeout) will wake us
+                    self.replicate_cond.wait()
+                elif pending or stale_commit or read_pending or due:
+                    self._send_append(pid, stub)
+                else:
+                    self.replicate_cond.wait(HEARTBEAT_INTERVAL if self.batched_heartbeats
+                                             else self.heartbeat_due[pid] - now)
+
+    def _send_append(self, pid, stub):
+        # Caller holds the lock; the reply is handled on a gRPC callback thread
+        args = self._build_append_args(pid, self.send_index[pid])
+        self.send_index[pid] += len(args.entries)
+        on_reply = self._track_append(pid, args)
+        self.logger.info(f"sends RPC AppendEntries to Node {pid}")
+        stub.AppendEntries.future(self._compress_entries(args), timeout=RPC_TIMEOUT).add_done_callback(on_reply)
+
+    def _compress_entries(self, args):
+        # What goes on the wire for args: the same AppendEntries, with its
+        # entries as one zlib blob when they are large. args itself is kept
+        # for the reply bookkeeping
+        if not COMPRESS_APPEND_BYTES or sum(entry.ByteSize() for entry in args.entries) < COMPRESS_APPEND_BYTES:
+            return args
+        data = raft_pb2.EntryBatch(entries=args.entries).SerializeToString()
+        return raft_pb2.AppendArgs(term=args.term, leader_id=args.leader_id, prev_log_index=args.prev_log_index,
+                                   prev_log_term=args.prev_log_term, leader_commit=args.leader_commit,
+                                   group=args.group, zlib_entries=zlib.compress(data, COMPRESS_LEVEL))
+
+    def _track_append(self, pid, args):
+        # Caller holds the lock. Books an AppendEntries about to go to pid and
+        # returns the callback that takes the future of its reply
+        self.sent_commit[pid] = args.leader_commit
+        self.sent_read_seq[pid] = read_seq = self.read_seq
+        self.inflight[pid] += 1
+        sent_at = time.time()
+        self.heartbeat_due[pid] = sent_at + HEARTBEAT_INTERVAL
+        return lambda future: self._on_append_reply(pid, args, future, read_seq, sent_at)
+
+    def heartbeat(self, pid):
+        # An empty AppendEntries for pid and the callback for its reply, for
+        # the node-wide heartbeat batch; None when there is nothing to send
+        with self.lock:
+            if self.state != "LEADER" or pid not in self.peer_stubs or time.time() < self.retry_at[pid] \
+                    or self.inflight[pid] >= MAX_INFLIGHT_APPENDS or self.next_index[pid] <= self.snapshot_index:
+                return None
+            # From the last acknowledged entry, so it does not race the pipeline
+            args = self._build_append_args(pid, self.next_index[pid], max_entries=0)
+            return args, self._track_append(pid, args)
+
+    def _on_append_reply(self, pid, args, future, read_seq, sent_at):
+        with self.lock:
+            self.inflight[pid] -= 1
+            self.replicate_cond.notify_all()
+            try:
+                resp = future.result()
+            except grpc.RpcError as e:
+                self.logger.warning(f"AppendEntries to Node {pid} failed: {e.code()}")
+                if self.state == "LEADER" and args.term == self.current_term:
+                    # Resend from the last acknowledged entry once the follower is reachable
+                    self.send_index[pid] = self.next_index[pid]
+                    self.retry_at[pid] = time.time() + HEARTBEAT_INTERVAL
+                return
+
+            if resp.term > self.current_term:
+                self._become_follower(resp.term)
+                return
+            if self.state != "LEADER" or args.term != self.current_term:
+                return
+
+            # Any answer in our term means the follower still accepts us as leader
+            self.acked_read_seq[pid] = max(self.acked_read_seq[pid], read_seq)
+            self.acked_sent_at[pid] = max(self.acked_sent_at[pid], sent_at)
+            self.read_cond.notify_all()
+
+            if resp.success:
+                # Replies may arrive out of order, never move backwards
+                replicated = args.prev_log_index + len(args.entries)
+                self.match_index[pid] = max(self.match_index[pid], replicated)
+                self.next_index[pid] = max(self.next_index[pid], replicated + 1)
+                self.send_index[pid] = max(self.send_index[pid], self.next_index[pid])
+                self._advance_commit_index()
+                self._maybe_promote(pid)
+            else:
+                # Log mismatch: jump back to where the follower's hint says our
+                # logs can agree and restart the pipeline from there at once.
+                # Terms never decrease along a log, so the search is a bisection.
+                # A follower without hints (older build) leaves conflict_index unset
+                nxt = resp.conflict_index if resp.HasField("conflict_index") else args.prev_log_index
+                if resp.conflict_term:
+                    # Right after our last entry of that term, if we have one
+                    i = bisect.bisect_right(self.log, resp.conflict_term, key=lambda e: e.term)
+                    if i > 0 and self.log[i - 1].term == resp.conflict_term:
+                        nxt = self.snapshot_index + 1 + i
+                self.next_index[pid] = max(0, min(self.next_index[pid], args.prev_log_index, nxt))
+                self.send_index[pid] = self.next_index[pid]
+
+    def _send_snapshot(self, pid, stub):
+        # Caller holds the lock
+        self.snapshots_in_flight.add(pid)
+        args = raft_pb2.SnapshotArgs(
+            term=self.current_term,
+            leader_id=NODE_ID,
+            last_included_index=self.snapshot_index,
+            last_included_term=self.snapshot_term,
+            data=self.snapshot_data,
+            group=self.group
+        )
+        self.logger.info(f"sends RPC InstallSnapshot to Node {pid} (last_included_index={args.last_included_index})")
+        future = stub.InstallSnapshot.future(args, timeout=5.0)
+        future.add_done_callback(lambda f: self._on_snapshot_reply(pid, args, f))
+
+    def _on_snapshot_reply(self, pid, args, future):
+        with self.lock:
+            self.snapshots_in_flight.discard(pid)
+            self.replicate_cond.notify_all()
+            try:
+                resp = future.result()
+            except grpc.RpcError as e:
+                self.logger.warning(f"InstallSnapshot to Node {pid} failed: {e.code()}")
+                return
+
+            if resp.term > self.current_term:
+                self._become_follower(resp.term)
+                return
+            if self.state != "LEADER" or args.term != self.current_term:
+                return
+            self.match_index[pid] = max(self.match_index[pid], args.last_included_index)
+            self.next_index[pid] = max(self.next_index[pid], args.last_included_index + 1)
+            self.send_index[pid] = max(self.send_index[pid], self.next_index[pid])
+
+    def _advance_commit_index(self):
+        # Caller holds the lock. The highest index stored on a majority of
+        # voters (the leader counts once its own copy is durable, and not at
+        # all while it removes itself) commits, but only if it is from the
+        # current term; earlier entries commit with it.
+        matched = sorted((self.match_index.get(pid, -1) for pid in self.voters), reverse=True)
+        n = matched[self._quorum() - 1]
+        if n > self.commit_index and self._term_at(n) == self.current_term:
+            self.commit_index = n
+            self._committed()
+            self.replicate_cond.notify_all()  # followers learn the new commit index
+            if NODE_ID not in self.voters and self.commit_index >= self.config_index:
+                # The configuration that removed us committed: leave now
+                self.logger.info(f"Removed from the cluster -> step down")
+                self._become_follower(self.current_term)
+
+    # =========================================================
+    # Linearizable reads
+    # =========================================================
+    def _quorum_acked_at(self):
+        # Caller holds the lock. A majority of voters (us plus enough followers)
+        # answered AppendEntries sent at or after the returned time.
+        needed = self._quorum() - (NODE_ID in self.voters)
+        if needed <= 0:
+            return float('inf')
+        sent = sorted((self.acked_sent_at.get(pid, 0) for pid in self.voters - {NODE_ID}), reverse=True)
+        return sent[needed - 1]
+
+    def _lease_expiry(self):
+        # Caller holds the lock
+        return self._quorum_acked_at() + LEASE_DURATION
+
+    def _lease_holds(self):
+        # Caller holds the lock. Followers grant a transfer target's vote even
+        # though they heard from us recently, which is what the lease relies
+        # on, so it is not trusted during a transfer, nor for the rest of a
+        # term in which TimeoutNow went out
+        return (self.transfer_target is None and self.timeout_now_term != self.current_term
+                and time.time() < self._lease_expiry())
+
+    def _confirm_read_index(self, lease):
+        # Leader side of ReadIndex: the commit index a read has to wait for,
+        # or None if we cannot prove we are still the leader
+        deadline = time.time() + CLIENT_APPLY_TIMEOUT
+        with self.lock:
+            term = self.current_term
+            # Until an entry of our term commits we may not know the latest commit index
+            while self.state == "LEADER" and self.current_term == term and self._term_at(self.commit_index) != term:
+                if not self.commit_cond.wait(deadline - time.time()):
+                    return None
+            if self.state != "LEADER" or self.current_term != term:
+                return None
+            read_index = self.commit_index
+            if lease and self._lease_holds():
+                return read_index
+
+            # One heartbeat round; concurrent reads share it
+            self.read_seq += 1
+            seq = self.read_seq
+            self.replicate_cond.notify_all()
+            while self.state == "LEADER" and self.current_term == term:
+                if self._read_confirmed(seq):
+                    return read_index
+                if not self.read_cond.wait(deadline - time.time()):
+                    return None
+            return None
+
+    def _read_confirmed(self, seq):
+        # Caller holds the lock. A majority of voters answered a heartbeat carrying seq
+        acks = sum(1 for pid in self.voters if pid == NODE_ID or self.acked_read_seq.get(pid, 0) >= seq)
+        return acks >= self._quorum()
+
+    def _read_barrier(self, lease):
+        # Block until this node has applied everything committed before the
+        # read arrived; followers ask the leader for that index
+        with self.lock:
+            leader, is_leader = self.leader_id, self.state == "LEADER"
+        if is_leader:
+            read_index = self._confirm_read_index(lease)
+        elif leader not in self.peer_stubs:
+            return False
+        else:
+            try:
+                reply = self.peer_stubs[leader].ReadIndex(raft_pb2.ReadIndexArgs(lease=lease, group=self.group),
+                                                          timeout=CLIENT_APPLY_TIMEOUT)
+            except grpc.RpcError as e:
+                self.logger.warning(f"ReadIndex from leader {leader} failed: {e.code()}")
+                return False
+            read_index = reply.read_index if reply.success else None
+        if read_index is None:
+            return False
+
+        deadline = time.time() + CLIENT_APPLY_TIMEOUT
+        with self.apply_cond:
+            while self.last_applied < read_index:
+                if not self.apply_cond.wait(deadline - time.time()):
+                    return False
+        return True
 
+    # =========================================================
+    # Applying committed entries
+    # =========================================================
+    def _committed(self):
+        # Caller holds the lock and has moved commit_index: wake the client
+        # writes waiting for it and the apply thread
+        self.commit_cond.notify_all()
+
+    def _apply_loop(self):
+        # Applies entries as they commit, off the threads that handle RPCs
+        while not self._stop.is_set():
             with self.lock:
-                if resp.term > self.current_term:
-                    self._become_follower(resp.term)
-                    return
-
-                # Commit if majority ACK
-                if self.state == "LEADER" and resp.success:
-                    if len(self.log)-1 > self.commit_index:
-                        self.commit_index = len(self.log)-1
-                        self._apply_logs()
-        except grpc.RpcError as e:
-            logger.warning(f"AppendEntries to Node {pid} failed: {e}")
+                while self.last_applied >= self.commit_index and not self._stop.is_set():
+                    self.commit_cond.wait()
+            self._apply_logs()
 
     def _apply_logs(self):
-        while self.last_applied < self.commit_index:
-            self.last_applied += 1
-            entry = self.log[self.last_applied]
-            logger.info(f"Applying log[{self.last_applied}] cmd={entry.command}")
-            if entry.command == "ADD":
-                t = queue_pb2.Track()
-                t.ParseFromString(entry.data)
-                if not any(x.id == t.id for x in self.music_queue):
-                    self.music_queue.append(t)
-            elif entry.command == "REMOVE":
-                tid = queue_pb2.TrackId()
-                tid.ParseFromString(entry.data)
-                self.music_queue = [x for x in self.music_queue if x.id != tid.id]
+        # Applies everything committed so far. Batches are copied out under
+        # the lock and applied under state_lock alone
+        while True:
+            with self.lock:
+                start = self.last_applied + 1
+                end = min(self.commit_index, start + MAX_APPEND_ENTRIES - 1)
+                entries = [(index, self._entry_at(index)) for index in range(start, end + 1)]
+            if not entries:
+                return
+            with self.state_lock:
+                for index, entry in entries:
+                    if index <= self.last_applied:
+                        continue  # an installed snapshot already covers it
+                    self._apply_logged(index, entry)
+                    self.last_applied = index
+                self.apply_cond.notify_all()
+                self.watch_cond.notify_all()
+            self._maybe_snapshot()
+
+    def _apply_logged(self, index, entry):
+        # Caller holds state_lock
+        self.logger.info(f"Applying log[{index}] cmd={raft_pb2.LogEntry.Op.Name(entry.op)}")
+        if entry.client_id:
+            # A retried write that was applied already gets its first reply again
+            duplicate, result = self.sessions.lookup(entry.client_id, entry.seq, entry.seq_floor, entry.time)
+            if duplicate:
+                self.logger.info(f"log[{index}] repeats seq {entry.seq} of client {entry.client_id}")
+            else:
+                result = self._apply_entry(index, entry)
+                self.sessions.record(entry.client_id, entry.seq, result)
+        else:
+            result = self._apply_entry(index, entry)
+        if index in self.apply_results:
+            self.apply_results[index] = result
+
+    def _apply_entry(self, index, entry):
+        # Tracks are copied out of the entry: the log keeps its own unchanged
+        if entry.op == raft_pb2.LogEntry.ADD:
+            t = queue_pb2.Track()
+            t.CopyFrom(entry.track)
+            added = self.music_queue.add(t)
+            if added:
+                self._record_event(index, queue_pb2.QueueEvent.ADDED, t)
+            return added
+        elif entry.op == raft_pb2.LogEntry.REMOVE:
+            track = self.music_queue.remove(entry.track_id.id)
+            if track is not None:
+                self._record_event(index, queue_pb2.QueueEvent.REMOVED, track)
+            return track
+        elif entry.op == raft_pb2.LogEntry.VOTE:
+            track = self.music_queue.vote(entry.vote.id, 1 if entry.vote.up else -1)
+            if track is not None:
+                self._record_event(index, queue_pb2.QueueEvent.VOTED, track)
+            return track
+        elif entry.op == raft_pb2.LogEntry.ADD_BATCH:
+            batch = queue_pb2.TrackBatch()
+            batch.CopyFrom(entry.tracks)
+            added = [t for t in batch.tracks if self.music_queue.add(t)]
+            if added:
+                self._record_event(index, queue_pb2.QueueEvent.ADDED, tracks=added)
+            return len(added)
+        elif entry.op == raft_pb2.LogEntry.REMOVE_BATCH:
+            removed = [t for t in map(self.music_queue.remove, entry.track_ids.ids) if t is not None]
+            if removed:
+                self._record_event(index, queue_pb2.QueueEvent.REMOVED, tracks=removed)
+            return len(removed)
+        elif entry.op == raft_pb2.LogEntry.PLAY:
+            track = self.music_queue.pop_next()
+            if track is not None:
+                self.history.append(track)
+                self._record_event(index, queue_pb2.QueueEvent.PLAYED, track)
+            return track
+        # NOOP, and CONFIG (in force since it was appended): nothing to apply
+        return None
+
+    def _record_event(self, index, kind, track=None, tracks=()):
+        # The event holds copies, so later votes do not change it
+        self.events.append(index, queue_pb2.QueueEvent(kind=kind, token=str(index), track=track, queue=tracks))
 
     # =========================================================
     # RPC handlers
     # =========================================================
     def RequestVote(self, request, context):
-        logger.info(f"runs RPC RequestVote called by Node {request.candidate_id}")
+        self.logger.info(f"runs RPC RequestVote called by Node {request.candidate_id}")
         with self.lock:
+            # A live leader may be serving lease reads; don't help depose it
+            leader_alive = self.state == "FOLLOWER" and self.leader_id is not None and \
+                time.time() - self.last_heartbeat < ELECTION_MIN
+            if request.pre_vote:
+                # Answer as if for request.term, without touching our term or vote
+                if request.term > self.current_term and self.state != "LEADER" and not leader_alive \
+                        and self._log_up_to_date(request):
+                    return raft_pb2.VoteReply(term=request.term, vote_granted=True)
+                return raft_pb2.VoteReply(term=self.current_term, vote_granted=False)
+            if leader_alive and not request.transfer:
+                return raft_pb2.VoteReply(term=self.current_term, vote_granted=False)
             if request.term > self.current_term:
                 self._become_follower(request.term)
 
             vote_granted = False
             if request.term == self.current_term and (self.voted_for is None or self.voted_for == request.candidate_id):
-                last_idx = len(self.log)-1
-                last_term = self.log[last_idx].term if last_idx >= 0 else 0
-                if request.last_log_term > last_term or (request.last_log_term == last_term and request.last_log_index >= last_idx):
+                if self._log_up_to_date(request):
                     vote_granted = True
                     self.voted_for = request.candidate_id
+                    self._persist_meta()
                     self.last_heartbeat = time.time()
             return raft_pb2.VoteReply(term=self.current_term, vote_granted=vote_granted)
 
+    def _log_up_to_date(self, request):
+        # Caller holds the lock. The candidate's log is at least as recent as ours
+        last_idx = self._last_log_index()
+        last_term = self._term_at(last_idx)
+        return request.last_log_term > last_term or \
+            (request.last_log_term == last_term and request.last_log_index >= last_idx)
+
     def AppendEntries(self, request, context):
-        logger.info(f"runs RPC AppendEntries called by Node {request.leader_id}")
+        self.logger.info(f"runs RPC AppendEntries called by Node {request.leader_id}")
+        reply, last_new = self._append_entries(request)
+        if last_new is not None:
+            # Only acknowledge once the entries are durable; concurrent calls share one fsync
+            self.storage.sync(last_new)
+        return reply
+
+    def _append_entries(self, request):
+        # AppendEntries without the fsync: (reply, last index to sync before
+        # replying, or None when the request was refused)
+        if request.zlib_entries:
+            batch = raft_pb2.EntryBatch()
+            batch.ParseFromString(zlib.decompress(request.zlib_entries))
+            request.entries.extend(batch.entries)
+        for entry in request.entries:
+            self._upgrade_entry(entry)  # from a leader not yet upgraded
         with self.lock:
-            if request.term >= self.current_term:
+            if request.term < self.current_term:
+                return raft_pb2.AppendReply(term=self.current_term, success=False), None
+            if request.term > self.current_term or self.state != "FOLLOWER":
+                self._become_follower(request.term)
+            if self.leader_id != request.leader_id:
                 self.leader_id = request.leader_id
-                self.last_heartbeat = time.time()
-                if self.state != "FOLLOWER":
-                    self._become_follower(request.term)
+                self.commit_cond.notify_all()  # writes held back by a leadership transfer
+            self.last_heartbeat = time.time()
+
+            prev_index, prev_term, entries = request.prev_log_index, request.prev_log_term, request.entries
+            if prev_index < self.snapshot_index:
+                # Everything up to our snapshot is already committed; skip that part
+                entries = entries[self.snapshot_index - prev_index:]
+                prev_index, prev_term = self.snapshot_index, self.snapshot_term
+
+            # Consistency check: our log must contain prev_log_index with a matching term
+            if prev_index > self._last_log_index():
+                return raft_pb2.AppendReply(term=self.current_term, success=False,
+                                            conflict_index=self._last_log_index() + 1), None
+            if self._term_at(prev_index) != prev_term:
+                # Point the leader at the start of our conflicting term, so it
+                # skips the whole term in one round trip
+                term = self._term_at(prev_index)
+                first = self.snapshot_index + 1 + bisect.bisect_left(self.log, term, key=lambda e: e.term)
+                return raft_pb2.AppendReply(term=self.current_term, success=False,
+                                            conflict_term=term, conflict_index=first), None
+
+            # Append new entries, truncating our log only where it conflicts
+            idx = prev_index + 1
+            for i, entry in enumerate(entries):
+                if idx + i <= self._last_log_index():
+                    if self._term_at(idx + i) == entry.term:
+                        continue
+                    self._log_truncate(idx + i)
+                self._log_append(entries[i:])
+                break
+
+            last_new = prev_index + len(entries)
+            if request.leader_commit > self.commit_index:
+                self.commit_index = min(request.leader_commit, last_new)
+                self._committed()
+            return raft_pb2.AppendReply(term=self.current_term, success=True), last_new
+
+    def InstallSnapshot(self, request, context):
+        self.logger.info(f"runs RPC InstallSnapshot called by Node {request.leader_id}")
+        with self.lock:
             if request.term < self.current_term:
-                return raft_pb2.AppendReply(term=self.current_term, success=False)
+                return raft_pb2.SnapshotReply(term=self.current_term)
+            if request.term > self.current_term or self.state != "FOLLOWER":
+                self._become_follower(request.term)
+            self.leader_id = request.leader_id
+            self.last_heartbeat = time.time()
+
+            index = request.last_included_index
+            with self.state_lock:
+                if index <= self.last_applied:
+                    # Our state machine is already past this snapshot
+                    return raft_pb2.SnapshotReply(term=self.current_term)
+
+            self.storage.save_snapshot(index, request.last_included_term, request.data)
+            if index <= self._last_log_index() and self._term_at(index) == request.last_included_term:
+                # Our log extends the snapshot consistently: keep the suffix
+                self.snapshot_members = self._members_at(index)[0]
+                del self.log[:index - self.snapshot_index]
+                self.storage.compact(index)
+            else:
+                self.log = []
+                self.storage.reset(index + 1)
+            self.snapshot_index, self.snapshot_term, self.snapshot_data = index, request.last_included_term, request.data
+            with self.state_lock:
+                # The apply thread may have got past index meanwhile, from our own log
+                if index > self.last_applied:
+                    self._restore_state(request.data)
+                    self.last_applied = index
+                    self.events.reset(index)
+                    self.apply_cond.notify_all()
+                    self.watch_cond.notify_all()
+                tracks = len(self.music_queue)
+            self._set_members(*self._members_at(self._last_log_index()))
+            self.commit_index = max(self.commit_index, index)
+            self.commit_cond.notify_all()
+            self.logger.info(f"Installed snapshot at log[{index}] with {tracks} tracks")
+            return raft_pb2.SnapshotReply(term=self.current_term)
+
+    def ReadIndex(self, request, context):
+        self.logger.info(f"runs RPC ReadIndex (lease={request.lease})")
+        read_index = self._confirm_read_index(request.lease)
+        if read_index is None:
+            return raft_pb2.ReadIndexReply(success=False, leader_id=self.leader_id or 0)
+        return raft_pb2.ReadIndexReply(success=True, read_index=read_index, leader_id=NODE_ID)
+
+    def TimeoutNow(self, request, context):
+        self.logger.info(f"runs RPC TimeoutNow called by Node {request.leader_id}")
+        with self.lock:
+            if request.term == self.current_term and self.state == "FOLLOWER":
+                # The leader has caught us up and wants us to take over: no pre-vote
+                self.logger.info(f"Leadership handed over -> start election")
+                self.last_heartbeat = time.time()
+                self.election_timeout = random.uniform(ELECTION_MIN, ELECTION_MAX)
+                self._become_candidate(transfer=True)
+                self._schedule_timer()
+            return raft_pb2.TimeoutNowReply(term=self.current_term)
 
-            # Replace log with leader's log
-            self.log = list(request.entries)
-            if request.leader_commit > self.commit_index:
-                self.commit_index = min(request.leader_commit, len(self.log)-1)
-                self._apply_logs()
-            return raft_pb2.AppendReply(term=self.current_term, success=True)
+    def TransferLeadership(self, request, context):
+        self.logger.info(f"runs RPC TransferLeadership (target={request.target_id})")
+        success, message = self.transfer_leadership(request.target_id)
+        return raft_pb2.TransferReply(success=success, leader_id=self.leader_id or 0, message=message)
+
+    # =========================================================
+    # Leadership transfer
+    # =========================================================
+    def transfer_leadership(self, target=0):
+        # Hold new writes back, wait until target has our whole log, then send
+        # it TimeoutNow. Its RequestVote for the next term makes us a follower.
+        # Returns (success, message).
+        with self.lock:
+            target, error = self._begin_transfer(target)
+            if error:
+                return False, error
+            term = self.current_term
+        deadline = time.time() + ELECTION_MAX
+        try:
+            with self.lock:
+                while not self._transfer_caught_up(target):
+                    if self.state != "LEADER" or self.current_term != term:
+                        return False, "Leadership lost"
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False, f"Node {target} did not catch up"
+                    self.read_cond.wait(remaining)  # notified by every AppendEntries reply
+                self.timeout_now_term = term
+
+            self.logger.info(f"sends RPC TimeoutNow to Node {target}")
+            try:
+                self.peer_stubs[target].TimeoutNow(
+                    raft_pb2.TimeoutNowArgs(term=term, leader_id=NODE_ID, group=self.group), timeout=RPC_TIMEOUT)
+            except grpc.RpcError as e:
+                return False, f"TimeoutNow to Node {target} failed: {e.code()}"
+
+            with self.lock:
+                # Held-back writes are only released once they can go to the new leader
+                while self.leader_id != target:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False, f"Node {target} did not take over"
+                    self.commit_cond.wait(remaining)
+                return True, f"Node {target} is the leader"
+        finally:
+            with self.lock:
+                self._end_transfer()
+
+    def _begin_transfer(self, target):
+        # Caller holds the lock. Returns (target, error); target 0 picks the
+        # most up-to-date follower
+        if self.state != "LEADER":
+            return None, "Not the leader"
+        if self.transfer_target is not None:
+            return None, f"Already transferring to Node {self.transfer_target}"
+        candidates = self.voters - {NODE_ID}
+        if not target and candidates:
+            target = max(candidates, key=lambda pid: self.match_index[pid])
+        if target not in candidates:
+            return None, f"Node {target} is not a voter"
+        self.logger.info(f"Transferring leadership to Node {target}")
+        self.transfer_target = target
+        return target, None
+
+    def _transfer_caught_up(self, target):
+        # Caller holds the lock. Waiting for the commit as well lets the
+        # writes already in the log get their replies from us
+        last = self._last_log_index()
+        return self.match_index[target] >= last and self.commit_index >= last
+
+    def _end_transfer(self):
+        # Caller holds the lock
+        self.transfer_target = None
+        self.commit_cond.notify_all()
+
+    # =========================================================
+    # Membership changes
+    # =========================================================
+    def AddNode(self, request, context):
+        # The node joins as a learner (started with JOIN=1) and is promoted to
+        # voter by _maybe_promote once it has caught up; the reply waits for that.
+        # With learner set it stays a read replica, which also demotes a voter
+        self.logger.info(f"runs RPC AddNode {request.node_id}={request.addr}")
+        node_id = request.node_id
+        with self.lock:
+            if self.state != "LEADER":
+                return self._membership_reply(False, "Not the leader")
+            error = self._add_member(request)
+            if error:
+                return self._membership_reply(False, error)
+            done = self._wait_config(lambda: self._added(node_id, request.learner))
+            role = "a read replica" if request.learner else "a voter"
+            return self._membership_reply(done, f"Node {node_id} is {role}" if done
+                                          else f"Node {node_id} has not caught up yet")
+
+    def RemoveNode(self, request, context):
+        self.logger.info(f"runs RPC RemoveNode {request.node_id}")
+        node_id = request.node_id
+        with self.lock:
+            if self.state != "LEADER":
+                return self._membership_reply(False, "Not the leader")
+            if node_id in self.peers or node_id == NODE_ID:
+                error = self._config_change_error()
+                if error:
+                    return self._membership_reply(False, error)
+                members = [m for m in self.members if m.id != node_id]
+                if not any(m.voter for m in members):
+                    return self._membership_reply(False, "Cannot remove the last voter")
+                self._append_config(members)
+            done = self._wait_config(lambda: node_id not in self.peers and node_id not in self.voters)
+            return self._membership_reply(done, f"Node {node_id} removed" if done
+                                          else f"Removing Node {node_id} did not commit")
+
+    def _wait_config(self, done):
+        # Caller holds the lock. Wait until done() holds and the configuration
+        # in force has committed (a leader that removed itself has stepped down by then)
+        deadline = time.time() + MEMBERSHIP_TIMEOUT
+        while not (done() and self.config_index <= self.commit_index):
+            remaining = deadline - time.time()
+            if remaining <= 0 or self.state != "LEADER":
+                return False
+            self.commit_cond.wait(remaining)
+        return True
+
+    def _membership_reply(self, success, message):
+        # Caller holds the lock
+        return raft_pb2.MembershipReply(success=success, message=message, leader_id=self.leader_id or 0,
+                                        members=self.members)
 
     # =========================================================
     # Client requests (forward if not leader)
     # =========================================================
-    def _forward_to_leader(self, request, method_name):
-        if self.leader_id is None:
+    def _leader_hint(self, context):
+        # Name the leader in the trailing metadata so smart clients
+        # (queue_client.py) can send their writes there directly
+        leader_id = self.leader_id
+        if leader_id is None:
+            return
+        hint = [("leader-id", str(leader_id))]
+        if leader_id in self.peers:
+            hint.append(("leader-addr", self.peers[leader_id]))
+        context.set_trailing_metadata(hint)
+
+    def _reject_not_leader(self, context):
+        # The client asked not to be forwarded (metadata forward=0)
+        self._leader_hint(context)
+        context.abort(grpc.StatusCode.FAILED_PRECONDITION, "NOT_LEADER")
+
+    def _forward_to_leader(self, request, method_name, metadata=()):
+        # Called without the lock: the leader only answers once our
+        # AppendEntries handler has acknowledged the entry
+        leader_id = self.leader_id
+        if leader_id is None:
             return queue_pb2.QueueResponse(message="No leader elected yet")
-        if self.leader_id == NODE_ID:
+        if leader_id == NODE_ID:
             return queue_pb2.QueueResponse(message="Error: I am leader but state mismatch")
+        stub = self.peer_queue_stubs.get(leader_id)
+        if stub is None:
+            return queue_pb2.QueueResponse(message="Leader not in our configuration yet")
 
-        target_addr = PEERS[self.leader_id]
-        logger.info(f"Forwarding {method_name} to leader {self.leader_id}")
+        self.logger.info(f"Forwarding {method_name} to leader {leader_id}")
         try:
-            channel = grpc.insecure_channel(target_addr)
-            stub = queue_pb2_grpc.QueueServiceStub(channel)
             method = getattr(stub, method_name)
-            return method(request)
+            return method(request, metadata=metadata)
         except grpc.RpcError as e:
             return queue_pb2.QueueResponse(message=f"Forwarding failed: {e}")
 
-    def AddTrack(self, request, context):
-        logger.info("AddTrack called")
+    def _commit_wait(self, context):
+        for key, value in context.invocation_metadata():
+            if key == "commit-wait":
+                return value not in ("0", "false", "no")
+        return COMMIT_WAIT
+
+    def _forwarding(self, context):
+        for key, value in context.invocation_metadata():
+            if key == "forward":
+                return value not in ("0", "false", "no")
+        return True
+
+    def _append_client_entry(self, op, method_name, request, context):
+        # Append on the leader and hand back (index, term), or the forwarded
+        # reply when another node leads
         with self.lock:
-            if self.state != "LEADER":
-                return self._forward_to_leader(request, "AddTrack")
-
-            entry = raft_pb2.LogEntry(
-                term=self.current_term,
-                command="ADD",
-                data=request.SerializeToString()
-            )
-            self.log.append(entry)
-            logger.info(f"Leader appended log[{len(self.log)-1}]")
-            self._send_heartbeats()  # trigger replication immediately
-            return queue_pb2.QueueResponse(message="Queued", queue=self.music_queue)
+            while self.transfer_target is not None:
+                # Handing leadership over: wait to find out who leads next
+                self.commit_cond.wait()
+            is_leader = self.state == "LEADER"
+        if not is_leader:
+            if not self._forwarding(context):
+                self._reject_not_leader(context)
+            self._leader_hint(context)
+            metadata = [(k, v) for k, v in context.invocation_metadata() if k in FORWARDED_METADATA]
+            return self._forward_to_leader(request, method_name, metadata)
 
-    def RemoveTrack(self, request, context):
-        logger.info("RemoveTrack called")
         with self.lock:
             if self.state != "LEADER":
-                return self._forward_to_leader(request, "RemoveTrack")
-
-            entry = raft_pb2.LogEntry(
-                term=self.current_term,
-                command="REMOVE",
-                data=request.SerializeToString()
-            )
-            self.log.append(entry)
-            logger.info(f"Leader appended log[{len(self.log)-1}]")
-            self._send_heartbeats()
-            return queue_pb2.QueueResponse(message="Removed", queue=self.music_queue)
+                if not self._forwarding(context):
+                    self._reject_not_leader(context)
+                return queue_pb2.QueueResponse(message="Not leader anymore, retry")
+            return self._leader_append(op, request, self._client_session(context))
+
+    def _client_session(self, context):
+        # (client id, seq, seq floor) of a write from a smart client, else None
+        metadata = dict(context.invocation_metadata())
+        if "client-id" not in metadata:
+            return None
+        try:
+            seq, floor = int(metadata["seq"]), int(metadata.get("seq-floor", 0))
+            if seq < 0 or floor < 0:
+                raise ValueError(seq, floor)
+            return metadata["client-id"], seq, floor
+        except (KeyError, ValueError):
+            self.logger.warning(f"Ignoring bad session metadata from client {metadata['client-id']}")
+            return None
+
+    def _leader_append(self, op, request, session=None):
+        # Caller holds the lock and has checked we lead
+        entry = raft_pb2.LogEntry(term=self.current_term, op=op)
+        if op in PAYLOAD_FIELDS:
+            getattr(entry, PAYLOAD_FIELDS[op]).CopyFrom(request)
+        if session:
+            entry.client_id, entry.seq, entry.seq_floor = session
+            entry.time = time.time()
+        index = self._log_append([entry])
+        self.apply_results[index] = None
+        self.logger.info(f"Leader appended log[{index}]")
+        self._send_heartbeats()  # trigger replication immediately
+        return index, entry.term
+
+    def _finish_client_write(self, index, term, context, reply, wait=None):
+        # Wait (unless commit-wait is off) for log[index] to commit and apply,
+        # then build the response under state_lock with reply(result, error)
+        # Group commit: concurrent writers share a single fsync of the leader's log
+        self.storage.sync(index)
+
+        deadline = time.time() + CLIENT_APPLY_TIMEOUT
+        wait = self._commit_wait(context) if wait is None else wait
+        error = None
+        with self.commit_cond:
+            if self.state == "LEADER" and self.current_term == term:
+                self.match_index[NODE_ID] = max(self.match_index[NODE_ID], index)
+                self._advance_commit_index()
+            while wait and self.commit_index < index:
+                if self.state != "LEADER" or self.current_term != term:
+                    # A new leader may overwrite the entry; the client has to retry
+                    error = "Not committed: leadership lost"
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    self.logger.warning(f"log[{index}] not committed within {CLIENT_APPLY_TIMEOUT}s")
+                    error = "Not committed (timeout)"
+                    break
+                self.commit_cond.wait(remaining)
+
+        with self.apply_cond:
+            try:
+                if not wait or error:
+                    return reply(None, error)
+                while self.last_applied < index:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        self.logger.warning(f"log[{index}] not applied within {CLIENT_APPLY_TIMEOUT}s")
+                        return reply(None, "Committed, not applied yet (timeout)")
+                    self.apply_cond.wait(remaining)
+                return reply(self.apply_results.get(index), None)
+            finally:
+                self.apply_results.pop(index, None)
+
+    def _write_reply(self, context):
+        for key, value in context.invocation_metadata():
+            if key == "write-reply":
+                return value
+        return WRITE_REPLY
+
+    def _queue_reply(self, message, context, track_ids):
+        mode = self._write_reply(context)
+
+        def reply(result, error):
+            if mode == "ack":
+                queue = []
+            elif mode == "delta":
+                queue = [t for t in map(self.music_queue.get, track_ids) if t is not None]
+            else:
+                queue = self.music_queue.tracks()
+            return queue_pb2.QueueResponse(message=error or message, queue=queue)
+        return reply
 
-    def GetQueue(self, request, context):
-        return queue_pb2.QueueList(queue=self.music_queue)
+    def AddTrack(self, request, context):
+        self.logger.info("AddTrack called")
+        appended = self._append_client_entry(raft_pb2.LogEntry.ADD, "AddTrack", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return self._finish_client_write(*appended, context, self._queue_reply("Queued", context, [request.id]))
+
+    def RemoveTrack(self, request, context):
+        self.logger.info("RemoveTrack called")
+        appended = self._append_client_entry(raft_pb2.LogEntry.REMOVE, "RemoveTrack", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return self._finish_client_write(*appended, context, self._queue_reply("Removed", context, [request.id]))
+
+    def AddTracks(self, request, context):
+        self.logger.info(f"AddTracks called with {len(request.tracks)} tracks")
+        appended = self._append_client_entry(raft_pb2.LogEntry.ADD_BATCH, "AddTracks", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        ids = [t.id for t in request.tracks]
+        return self._finish_client_write(*appended, context, self._queue_reply("Queued", context, ids))
+
+    def RemoveTracks(self, request, context):
+        self.logger.info(f"RemoveTracks called with {len(request.ids)} ids")
+        appended = self._append_client_entry(raft_pb2.LogEntry.REMOVE_BATCH, "RemoveTracks", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return self._finish_client_write(*appended, context, self._queue_reply("Removed", context, request.ids))
+
+    def VoteTrack(self, request, context):
+        self.logger.info("VoteTrack called")
+        appended = self._append_client_entry(raft_pb2.LogEntry.VOTE, "VoteTrack", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return self._finish_client_write(*appended, context, self._queue_reply("Vote updated", context, [request.id]))
+
+    def PlayNext(self, request, context):
+        self.logger.info("PlayNext called")
+        appended = self._append_client_entry(raft_pb2.LogEntry.PLAY, "PlayNext", request, context)
+        if isinstance(appended, queue_pb2.QueueResponse):
+            # No leader, or forwarding failed: PlayNext has no message field to carry it
+            context.abort(grpc.StatusCode.UNAVAILABLE, appended.message)
+        if not isinstance(appended, tuple):
+            return appended
+
+        def reply(track, error):
+            if error:
+                context.abort(grpc.StatusCode.UNAVAILABLE, error)
+            return queue_pb2.Track() if track is None else track  # empty when the queue was empty
+
+        # Which track plays is only known once the entry is applied, so always wait
+        return self._finish_client_write(*appended, context, reply, wait=True)
+
+    def _read_mode(self, context):
+        for key, value in context.invocation_metadata():
+            if key == "read-mode":
+                return value
+        return READ_MODE
+
+    def _confirm_read(self, context):
+        self._leader_hint(context)
+        mode = self._read_mode(context)
+        if mode != "stale" and not self._read_barrier(lease=(mode == "lease")):
+            context.abort(grpc.StatusCode.UNAVAILABLE, "Could not confirm the read with a leader, retry")
+
+    def _view(self, name, build):
+        # The reply build() makes from the state as applied up to last_applied.
+        # The first read after a change builds it under state_lock, serialized
+        # when the handlers take bytes; later reads share it without locking
+        # until the next entry applies. A published view never changes.
+        view = self.views.get(name)
+        if view is None or view[0] != self.last_applied:
+            with self.state_lock:
+                view = self.views.get(name)
+                if view is None or view[0] != self.last_applied:
+                    reply = build()
+                    if self.serialized_replies:
+                        reply = reply.SerializeToString()
+                    view = self.views[name] = (self.last_applied, reply)
+        return view[1]
 
-    # Dummy implementations
-    def VoteTrack(self, r, c): return queue_pb2.QueueResponse()
-    def GetMetadata(self, r, c): return queue_pb2.Track()
-    def PlayNext(self, r, c): return queue_pb2.Track()
-    def GetHistory(self, r, c): return queue_pb2.QueueList()
+    def GetQueue(self, request, context):
+        self._confirm_read(context)
+        return self._view("queue", lambda: queue_pb2.QueueList(queue=self.music_queue.tracks()))
+
+    def GetMetadata(self, request, context):
+        self._confirm_read(context)
+        with self.state_lock:
+            reply = queue_pb2.Track()
+            track = self.music_queue.get(request.id)
+            if track is not None:
+                reply.CopyFrom(track)  # a later vote must not change a reply being sent
+            return reply
+
+    def GetHistory(self, request, context):
+        self._confirm_read(context)
+        return self._view("history", lambda: queue_pb2.QueueList(queue=self.history))
+
+    def _page_bounds(self, request):
+        return max(request.offset, 0), request.limit if request.limit > 0 else PAGE_SIZE
+
+    def _page(self, items, total, offset):
+        # items start at offset in a list of total tracks
+        end = offset + len(items)
+        return queue_pb2.QueueList(queue=items, total=total, next_offset=end if end < total else 0)
+
+    def _queue_pages(self, request):
+        # Consecutive pages from request.offset to the end, copied under the
+        # lock so later votes cannot change what is sent
+        offset, limit = self._page_bounds(request)
+        with self.state_lock:
+            tracks = self.music_queue.page(offset, len(self.music_queue))
+            total = len(self.music_queue)
+            return [self._page(tracks[i:i + limit], total, offset + i)
+                    for i in range(0, len(tracks), limit)] or [self._page([], total, offset)]
+
+    def _history_pages(self, request):
+        offset, limit = self._page_bounds(request)
+        with self.state_lock:
+            total = len(self.history)
+            return [self._page(self.history[i:i + limit], total, i)
+                    for i in range(offset, total, limit)] or [self._page([], total, offset)]
+
+    def GetQueuePage(self, request, context):
+        self._confirm_read(context)
+        offset, limit = self._page_bounds(request)
+        with self.state_lock:
+            return self._page(self.music_queue.page(offset, limit), len(self.music_queue), offset)
+
+    def GetHistoryPage(self, request, context):
+        self._confirm_read(context)
+        offset, limit = self._page_bounds(request)
+        with self.state_lock:
+            return self._page(self.history[offset:offset + limit], len(self.history), offset)
+
+    def StreamQueue(self, request, context):
+        self._confirm_read(context)
+        yield from self._queue_pages(request)
+
+    def StreamHistory(self, request, context):
+        self._confirm_read(context)
+        yield from self._history_pages(request)
+
+    def WatchQueue(self, request, context):
+        # Follows this node's applied state. The token is a log index, which
+        # names the same change on every node, so a watcher can resume elsewhere.
+        try:
+            token = int(request.resume_token) if request.resume_token else None
+        except ValueError:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Bad resume token")
+        with self.state_lock:
+            if self.watchers >= MAX_WATCHERS:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many watchers")
+            self.watchers += 1
+        try:
+            while context.is_active() and not self._stop.is_set():
+                with self.watch_cond:
+                    events = None if token is None else self.events.since(token)
+                    if events is None:
+                        # New watcher, or too far behind to replay: start over from the current queue
+                        events = [queue_pb2.QueueEvent(kind=queue_pb2.QueueEvent.SNAPSHOT,
+                                                       token=str(self.last_applied),
+                                                       queue=self.music_queue.tracks())]
+                    elif not events:
+                        self.watch_cond.wait(WATCH_IDLE_CHECK)
+                        continue
+                for event in events:
+                    yield event
+                token = int(events[-1].token)
+        finally:
+            with self.state_lock:
+                self.watchers -= 1
+
+    def stop(self):
+        self._stop.set()
+        with self.lock:
+            self.timers.cancel(self.timer)
+            self.replicate_cond.notify_all()
+            self.commit_cond.notify_all()
+        with self.state_lock:
+            self.watch_cond.notify_all()
 
 # =========================================================
 # gRPC server
 # =========================================================
+def _serialize_reply(reply):
+    return reply if isinstance(reply, bytes) else reply.SerializeToString()
+
+
+def add_queue_service(servicer, server):
+    # queue_pb2_grpc.add_QueueServiceServicer_to_server, except that replies
+    # the servicer serialized itself (cached views) go out as they are
+    handlers = {}
+    for method in queue_pb2.DESCRIPTOR.services_by_name['QueueService'].methods:
+        handler = grpc.unary_stream_rpc_method_handler if method.server_streaming \
+            else grpc.unary_unary_rpc_method_handler
+        handlers[method.name] = handler(getattr(servicer, method.name),
+                                        request_deserializer=getattr(queue_pb2, method.input_type.name).FromString,
+                                        response_serializer=_serialize_reply)
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler('queue.QueueService', handlers),))
+    server.add_registered_method_handlers('queue.QueueService', handlers)
+    servicer.serialized_replies = True
+
+
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    raft_pb2_grpc.add_RaftServiceServicer_to_server(RaftServer(), server)
-    queue_pb2_grpc.add_QueueServiceServicer_to_server(RaftServer(), server)
-    port = 50051
-    server.add_insecure_port(f'[::]:{port}')
-    logger.info(f"Raft Node {NODE_ID} started on port {port}")
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=10 + MAX_WATCHERS),  # watchers must not starve other RPCs
+        options=[('grpc.max_receive_message_length', MAX_MESSAGE_BYTES)]
+    )
+    raft_server = RaftServer()
+    raft_pb2_grpc.add_RaftServiceServicer_to_server(raft_server, server)
+    add_queue_service(raft_server, server)
+    server.add_insecure_port(f'[::]:{PORT}')
+    logger.info(f"Raft Node {NODE_ID} started on port {PORT}")
     server.start()
-    server.wait_for_termination()
+
+    # docker stop sends SIGTERM: a leader hands over first, so a rolling
+    # restart does not leave the cluster waiting out an election timeout
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    stopping.wait()
+    if raft_server.state == "LEADER":
+        success, message = raft_server.transfer_leadership()
+        logger.info(f"Leadership transfer before shutdown: {message}")
+    raft_server.stop()
+    server.stop(grace=1).wait()
 
 if __name__ == "__main__":
     serve()
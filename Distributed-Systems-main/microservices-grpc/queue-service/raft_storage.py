@@ -0,0 +1,278 @@
+import os
+import json
+import mmap
+import struct
+import threading
+import zlib
+
+import raft_pb2
+
+# Each record in a segment: <payload length><crc32 of payload><LogEntry bytes>
+RECORD_HEADER = struct.Struct('<II')
+# Snapshot file: <last included index><last included term><crc32 of data><state machine bytes>
+SNAPSHOT_HEADER = struct.Struct('<qqI')
+SEGMENT_PREFIX = 'log-'
+SEGMENT_SUFFIX = '.seg'
+META_FILE = 'meta.json'
+SNAPSHOT_FILE = 'snapshot.bin'
+
+
+class RaftStorage:
+    """Append-only on-disk Raft log plus a small term/vote file.
+
+    The log is split into segment files named after the index of their first
+    entry. Appends are plain writes; durability comes from sync(), which
+    group-commits: concurrent callers share a single fsync that covers every
+    entry written before it started. With sync_mode="entry" every append is
+    fsynced on its own instead.
+
+    A snapshot of the state machine replaces the log prefix it covers;
+    compact() then deletes segments that lie entirely inside the snapshot.
+    """
+
+    def __init__(self, data_dir, segment_bytes=16 * 1024 * 1024, sync_mode="group"):
+        self.data_dir = data_dir
+        self.segment_bytes = segment_bytes
+        self.sync_mode = sync_mode
+        os.makedirs(data_dir, exist_ok=True)
+
+        self._cond = threading.Condition()
+        self._segments = []       # list of [first_index, path, [record offsets]]
+        self._fd = None           # fd of the last (active) segment
+        self._size = 0            # bytes in the active segment
+        self._written_index = -1  # last index handed to the OS
+        self._synced_index = -1   # last index known to be on disk
+        self._syncing = False
+
+    # -------------------------
+    # Term / vote metadata
+    # -------------------------
+    def load_meta(self):
+        path = os.path.join(self.data_dir, META_FILE)
+        if not os.path.exists(path):
+            return 0, None
+        with open(path) as f:
+            meta = json.load(f)
+        return meta.get("current_term", 0), meta.get("voted_for")
+
+    def save_meta(self, current_term, voted_for):
+        # Write-then-rename so a crash never leaves a half-written file
+        path = os.path.join(self.data_dir, META_FILE)
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({"current_term": current_term, "voted_for": voted_for}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._fsync_dir()
+
+    # -------------------------
+    # Snapshot
+    # -------------------------
+    def load_snapshot(self):
+        # Returns (last_included_index, last_included_term, data) or None
+        path = os.path.join(self.data_dir, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            raw = f.read()
+        index, term, crc = SNAPSHOT_HEADER.unpack_from(raw, 0)
+        data = raw[SNAPSHOT_HEADER.size:]
+        if zlib.crc32(data) != crc:
+            raise IOError(f"Corrupt snapshot in {path}")
+        return index, term, data
+
+    def save_snapshot(self, index, term, data):
+        path = os.path.join(self.data_dir, SNAPSHOT_FILE)
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(SNAPSHOT_HEADER.pack(index, term, zlib.crc32(data)))
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+        self._fsync_dir()
+
+    # -------------------------
+    # Log segments
+    # -------------------------
+    def load_log(self, start_index=0):
+        # Rebuild the in-memory log by mmap-scanning every segment in order.
+        # Entries below start_index are already covered by the snapshot.
+        entries = []
+        next_index = None
+        names = sorted(n for n in os.listdir(self.data_dir)
+                       if n.startswith(SEGMENT_PREFIX) and n.endswith(SEGMENT_SUFFIX))
+        for name in names:
+            first_index = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            path = os.path.join(self.data_dir, name)
+            if next_index is not None and first_index != next_index:
+                # Gap after a torn tail in an earlier segment: nothing later is usable
+                os.remove(path)
+                continue
+            offsets, valid_bytes = self._scan_segment(path, first_index, start_index, entries)
+            if valid_bytes < os.path.getsize(path):
+                # Torn or corrupt tail from a crash mid-write
+                os.truncate(path, valid_bytes)
+            self._segments.append([first_index, path, offsets])
+            next_index = first_index + len(offsets)
+
+        if self._segments and (self._segments[0][0] > start_index or next_index < start_index):
+            # The log does not connect to the snapshot (e.g. a crash while
+            # installing one from the leader), so it cannot be used
+            self.reset(start_index)
+            return []
+
+        self._written_index = self._synced_index = start_index + len(entries) - 1
+        if self._segments:
+            self._open_active(self._segments[-1][1])
+        return entries
+
+    def _scan_segment(self, path, first_index, start_index, entries):
+        offsets = []
+        size = os.path.getsize(path)
+        if size == 0:
+            return offsets, 0
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            pos = 0
+            while pos + RECORD_HEADER.size <= size:
+                length, crc = RECORD_HEADER.unpack_from(buf, pos)
+                start = pos + RECORD_HEADER.size
+                payload = buf[start:start + length]
+                if len(payload) != length or zlib.crc32(payload) != crc:
+                    break
+                if first_index + len(offsets) >= start_index:
+                    entry = raft_pb2.LogEntry()
+                    entry.ParseFromString(payload)
+                    entries.append(entry)
+                offsets.append(pos)
+                pos = start + length
+        return offsets, pos
+
+    def _open_active(self, path):
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        self._size = os.fstat(self._fd).st_size
+
+    def _roll_segment(self, first_index):
+        # Caller holds self._cond; make sure no fsync is using the old fd
+        while self._syncing:
+            self._cond.wait()
+        if self._fd is not None:
+            os.fsync(self._fd)
+            self._synced_index = self._written_index
+        path = os.path.join(self.data_dir, f"{SEGMENT_PREFIX}{first_index:020d}{SEGMENT_SUFFIX}")
+        self._segments.append([first_index, path, []])
+        self._open_active(path)
+        self._fsync_dir()
+
+    def append(self, entries):
+        # Append entries after the current last index; returns the new last index
+        with self._cond:
+            for entry in entries:
+                index = self._written_index + 1
+                if self._fd is None or self._size >= self.segment_bytes:
+                    self._roll_segment(index)
+                payload = entry.SerializeToString()
+                record = RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+                self._segments[-1][2].append(self._size)
+                os.write(self._fd, record)
+                self._size += len(record)
+                self._written_index = index
+                if self.sync_mode == "entry":
+                    os.fsync(self._fd)
+                    self._synced_index = index
+            return self._written_index
+
+    def truncate(self, index):
+        # Drop every entry >= index (conflicting suffix on a follower)
+        with self._cond:
+            if index > self._written_index:
+                return
+            while self._syncing:
+                self._cond.wait()
+            while self._segments and self._segments[-1][0] > index:
+                _, path, _ = self._segments.pop()
+                os.close(self._fd)
+                self._fd = None
+                os.remove(path)
+                if self._segments:
+                    self._open_active(self._segments[-1][1])
+            if self._segments:
+                first_index, path, offsets = self._segments[-1]
+                cut = index - first_index
+                if cut < len(offsets):
+                    self._size = offsets[cut]
+                    os.ftruncate(self._fd, self._size)
+                    del offsets[cut:]
+                os.fsync(self._fd)
+            self._fsync_dir()
+            self._written_index = index - 1
+            self._synced_index = min(self._synced_index, self._written_index)
+
+    def compact(self, index):
+        # Delete segments whose entries are all <= index (covered by a snapshot).
+        # The active segment is always kept so appends can continue.
+        with self._cond:
+            while len(self._segments) > 1 and self._segments[1][0] <= index + 1:
+                _, path, _ = self._segments.pop(0)
+                os.remove(path)
+            self._fsync_dir()
+
+    def reset(self, start_index):
+        # Throw the whole log away; the next append gets index start_index
+        with self._cond:
+            while self._syncing:
+                self._cond.wait()
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            for _, path, _ in self._segments:
+                os.remove(path)
+            self._segments = []
+            self._fsync_dir()
+            self._written_index = self._synced_index = start_index - 1
+
+    def sync(self, index=None):
+        # Group commit: block until every entry <= index is on disk. Only one
+        # caller runs fsync at a time; the others piggyback on its result.
+        with self._cond:
+            if index is None:
+                index = self._written_index
+            while self._synced_index < min(index, self._written_index):
+                if self._syncing:
+                    self._cond.wait()
+                    continue
+                self._syncing = True
+                target, fd = self._written_index, self._fd
+                self._cond.release()
+                try:
+                    os.fsync(fd)
+                finally:
+                    self._cond.acquire()
+                    self._syncing = False
+                    self._synced_index = max(self._synced_index, target)
+                    self._cond.notify_all()
+            return self._synced_index
+
+    @property
+    def synced_index(self):
+        with self._cond:
+            return self._synced_index
+
+    def close(self):
+        with self._cond:
+            while self._syncing:
+                self._cond.wait()
+            if self._fd is not None:
+                os.fsync(self._fd)
+                os.close(self._fd)
+                self._fd = None
+
+    def _fsync_dir(self):
+        fd = os.open(self.data_dir, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
@@ -0,0 +1,60 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+class Timers:
+    """Runs callbacks at wall-clock deadlines (time.time()) on one thread.
+
+    Deadlines wait in a heap; the thread sleeps until the earliest one is due,
+    so an idle node wakes only when something is actually due, and a callback
+    runs when due rather than on the next poll. Cancelling only marks the
+    timer: it is dropped when it reaches the top of the heap.
+
+    Callbacks run one at a time on the timer thread and must not block for
+    long, since later deadlines (of every Raft group sharing the thread) wait
+    for them.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._heap = []  # [deadline, seq, callback]; callback None once cancelled
+        self._seq = itertools.count()  # keeps equal deadlines in scheduling order
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def call_at(self, deadline, callback):
+        # Returns the timer, for cancel()
+        timer = [deadline, next(self._seq), callback]
+        with self._cond:
+            heapq.heappush(self._heap, timer)
+            if self._heap[0] is timer:
+                self._cond.notify()  # earlier than what the thread sleeps towards
+        return timer
+
+    def cancel(self, timer):
+        if timer is not None:
+            timer[2] = None
+
+    def _run(self):
+        with self._cond:
+            while True:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, _, callback = self._heap[0]
+                now = time.time()
+                if callback is not None and deadline > now:
+                    self._cond.wait(deadline - now)
+                    continue
+                heapq.heappop(self._heap)
+                if callback is None:
+                    continue
+                self._cond.release()
+                try:
+                    callback()
+                except Exception:
+                    logging.getLogger().exception("Timer callback failed")
+                finally:
+                    self._cond.acquire()
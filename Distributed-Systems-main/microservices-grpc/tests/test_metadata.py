@@ -1,12 +1,12 @@
-import grpc
 import queue_pb2
-import queue_pb2_grpc
+import queue_client
+import os
 import sys
 
 def main():
-    target = sys.argv[1] if len(sys.argv) > 1 else 'nginx-grpc:50051'
-    channel = grpc.insecure_channel(target)
-    stub = queue_pb2_grpc.QueueServiceStub(channel)
+    # QUEUE_NODES lists the nodes so writes can go straight to the leader
+    target = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('QUEUE_NODES', 'nginx-grpc:50051')
+    stub = queue_client.connect(target)
 
     # Add a track with duration
     track = queue_pb2.Track(id="104", title="MetaSong", artist="Meta", votes=0, duration=321)
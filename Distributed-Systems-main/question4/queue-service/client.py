@@ -1,12 +1,13 @@
 import argparse
-import grpc
+import csv
 import queue_pb2
-import queue_pb2_grpc
+import queue_client
 import sys
 import os
 
 # HOST = 'nginx-grpc:50051'
-HOST = 'localhost:50052'
+# Node id=address as published by docker-compose; writes go to the leader
+NODES = os.environ.get("QUEUE_NODES", ",".join(f"{i}=localhost:{50050 + i}" for i in range(1, 6)))
 CLIENT_NODE_ID = int(os.environ.get("CLIENT_NODE_ID", "0"))
 
 def log_rpc_call(rpc_name, target_node_id):
@@ -18,6 +19,16 @@ def add_track(stub, args):
     ))
     print("AddTrack response:", resp)
 
+def import_tracks(stub, args):
+    # CSV rows of id,title,artist,duration; each batch is a single write
+    with open(args.file, newline="") as f:
+        tracks = [queue_pb2.Track(id=row[0], title=row[1], artist=row[2], duration=int(row[3]))
+                  for row in csv.reader(f) if row]
+    for start in range(0, len(tracks), args.batch_size):
+        resp = stub.AddTracks(queue_pb2.TrackBatch(tracks=tracks[start:start + args.batch_size]),
+                              metadata=[("write-reply", "ack")])
+        print("AddTracks response:", resp.message)
+
 def play_next(stub, args):
     resp = stub.PlayNext(queue_pb2.Empty())
     print("PlayNext response:", resp)
@@ -29,11 +40,25 @@ def get_history(stub, args):
         print(track)
 
 def get_queue(stub, args):
-    resp = stub.GetQueue(queue_pb2.Empty())
+    if args.limit:
+        resp = stub.GetQueuePage(queue_pb2.PageRequest(offset=args.offset, limit=args.limit))
+    else:
+        resp = stub.GetQueue(queue_pb2.Empty())
     print("Current Queue:")
     for track in resp.queue:
         print(track)
 
+def watch_queue(stub, args):
+    # Runs until interrupted; pass the last token printed as --resume to continue
+    for event in stub.WatchQueue(queue_pb2.WatchRequest(resume_token=args.resume)):
+        kind = queue_pb2.QueueEvent.Kind.Name(event.kind)
+        if event.kind == queue_pb2.QueueEvent.SNAPSHOT:
+            print(f"[{event.token}] {kind}: {len(event.queue)} tracks")
+        elif event.queue:
+            print(f"[{event.token}] {kind}: {', '.join(t.id for t in event.queue)}")
+        else:
+            print(f"[{event.token}] {kind}: {event.track.id} {event.track.title} votes={event.track.votes}")
+
 def get_metadata(stub, args):
     resp = stub.GetMetadata(queue_pb2.TrackId(id=args.id))
     print("Track Metadata:")
@@ -61,10 +86,18 @@ def main():
     add.add_argument("--artist", required=True)
     add.add_argument("--duration", type=int, required=True)
 
+    imp = subparsers.add_parser("import", help="Add tracks from a CSV file in batches")
+    imp.add_argument("--file", required=True, help="rows of id,title,artist,duration")
+    imp.add_argument("--batch-size", type=int, default=500)
+
     play = subparsers.add_parser("play", help="Play next track")
     hist = subparsers.add_parser("history", help="Show play history")
 
     queue_cmd = subparsers.add_parser("queue", help="Show current queue")
+    queue_cmd.add_argument("--offset", type=int, default=0)
+    queue_cmd.add_argument("--limit", type=int, default=0, help="show one page of this many tracks")
+    watch = subparsers.add_parser("watch", help="Follow queue changes")
+    watch.add_argument("--resume", default="", help="token of the last event seen")
     metadata = subparsers.add_parser("metadata", help="Get track metadata")
     metadata.add_argument("--id", type=str, required=True)
 
@@ -76,17 +109,20 @@ def main():
     remove.add_argument("--id", type=str, required=True)
 
     args = parser.parse_args()
-    channel = grpc.insecure_channel(HOST)
-    stub = queue_pb2_grpc.QueueServiceStub(channel)
+    stub = queue_client.connect(NODES)
 
     if args.command == "add":
         add_track(stub, args)
+    elif args.command == "import":
+        import_tracks(stub, args)
     elif args.command == "play":
         play_next(stub, args)
     elif args.command == "history":
         get_history(stub, args)
     elif args.command == "queue":
         get_queue(stub, args)
+    elif args.command == "watch":
+        watch_queue(stub, args)
     elif args.command == "metadata":
         get_metadata(stub, args)
     elif args.command == "vote":
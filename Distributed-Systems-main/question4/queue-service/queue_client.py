@@ -0,0 +1,126 @@
+import threading
+import time
+
+import grpc
+
+import queue_pb2_grpc
+
+# Smart client for the Raft queue: writes go straight to the leader it has
+# learned about, reads are spread over the followers. Every node names the
+# current leader in the "leader-id"/"leader-addr" trailing metadata.
+
+WRITE_METHODS = {"AddTrack", "RemoveTrack", "AddTracks", "RemoveTracks", "VoteTrack", "PlayNext"}
+STREAM_METHODS = {"StreamQueue", "StreamHistory", "WatchQueue"}
+NOT_LEADER = "NOT_LEADER"  # details of the FAILED_PRECONDITION a follower answers with
+RETRIES = 5
+RETRY_BACKOFF = 0.1  # seconds, doubled after each failed attempt
+
+
+def parse_nodes(spec):
+    # "1=host:port,2=host:port" like PEERS; a bare "host:port" (e.g. nginx)
+    # is kept under a placeholder id until the leader hints add real ones
+    nodes = {}
+    for i, item in enumerate(spec.split(",")):
+        node_id, _, addr = item.strip().rpartition("=")
+        nodes[node_id or f"addr{i}"] = addr
+    return nodes
+
+
+def connect(spec):
+    return QueueClient(parse_nodes(spec))
+
+
+class QueueClient:
+    # Drop-in for queue_pb2_grpc.QueueServiceStub: client.AddTrack(track, metadata=..., timeout=...)
+
+    def __init__(self, nodes):
+        self.nodes = dict(nodes)
+        self.stubs = {}
+        self.leader = None
+        self.next_read = 0
+        self.lock = threading.Lock()
+
+    def __getattr__(self, name):
+        if name in STREAM_METHODS:
+            return lambda request, **kwargs: getattr(self._stub(self._read_node()), name)(request, **kwargs)
+        if name in WRITE_METHODS:
+            return lambda request, **kwargs: self._write(name, request, **kwargs)
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return lambda request, **kwargs: self._read(name, request, **kwargs)
+
+    def _stub(self, node):
+        with self.lock:
+            stub = self.stubs.get(node)
+            if stub is None:
+                stub = self.stubs[node] = queue_pb2_grpc.QueueServiceStub(grpc.insecure_channel(self.nodes[node]))
+            return stub
+
+    def _learn(self, metadata):
+        # Remember the leader a node named; returns whether it named one
+        hint = dict(metadata or ())
+        leader = hint.get("leader-id")
+        if leader is None:
+            return False
+        with self.lock:
+            if leader not in self.nodes:
+                if "leader-addr" not in hint:
+                    return False
+                self.nodes[leader] = hint["leader-addr"]
+            self.leader = leader
+        return True
+
+    def _read_node(self):
+        # Round robin over the followers, or over every node while the leader is unknown
+        with self.lock:
+            nodes = [n for n in self.nodes if n != self.leader] or list(self.nodes)
+            self.next_read += 1
+            return nodes[self.next_read % len(nodes)]
+
+    def _write_node(self):
+        with self.lock:
+            leader = self.leader
+        return leader if leader is not None else self._read_node()
+
+    def _read(self, name, request, **kwargs):
+        # Reads have no side effects, so any failure is retried on the next node
+        delay = RETRY_BACKOFF
+        for attempt in range(RETRIES):
+            try:
+                reply, call = getattr(self._stub(self._read_node()), name).with_call(request, **kwargs)
+            except grpc.RpcError as e:
+                if e.code() != grpc.StatusCode.UNAVAILABLE or attempt == RETRIES - 1:
+                    raise
+                time.sleep(delay)
+                delay *= 2
+                continue
+            self._learn(call.trailing_metadata())
+            return reply
+
+    def _write(self, name, request, metadata=(), **kwargs):
+        # Followers reject instead of forwarding, so a write is only retried
+        # when it is known not to have been applied anywhere
+        metadata = list(metadata) + [("forward", "0")]
+        delay = RETRY_BACKOFF
+        for attempt in range(RETRIES):
+            node = self._write_node()
+            try:
+                reply, call = getattr(self._stub(node), name).with_call(request, metadata=metadata, **kwargs)
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.FAILED_PRECONDITION and e.details() == NOT_LEADER:
+                    if attempt < RETRIES - 1:
+                        if not self._learn(e.trailing_metadata()):
+                            # no leader yet (election running): back off and ask another node
+                            with self.lock:
+                                self.leader = None
+                            time.sleep(delay)
+                            delay *= 2
+                        continue
+                elif e.code() == grpc.StatusCode.UNAVAILABLE:
+                    with self.lock:
+                        if self.leader == node:
+                            self.leader = None  # try to rediscover on the next call
+                raise
+            with self.lock:
+                self.leader = node
+            return reply
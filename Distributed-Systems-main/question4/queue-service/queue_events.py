@@ -0,0 +1,37 @@
+from collections import deque
+
+
+class QueueEvents:
+    """Recent queue changes for WatchQueue, keyed by the log index that made them.
+
+    Only the newest `backlog` events are kept. Every event after `floor` is
+    still here, so a watcher that has seen up to an index >= floor can resume
+    from memory; one that is further behind has to start from a snapshot.
+    """
+
+    def __init__(self, backlog, floor=-1):
+        self._events = deque()
+        self._backlog = backlog
+        self.floor = floor
+
+    def append(self, index, event):
+        if len(self._events) >= self._backlog:
+            self.floor = self._events.popleft()[0]
+        self._events.append((index, event))
+
+    def reset(self, floor):
+        # The state was replaced wholesale (snapshot install), so nothing up to floor can be replayed
+        self._events.clear()
+        self.floor = floor
+
+    def since(self, index):
+        # Events after index, oldest first, or None if some of them were already dropped
+        if index < self.floor:
+            return None
+        newer = []
+        for event_index, event in reversed(self._events):
+            if event_index <= index:
+                break
+            newer.append(event)
+        newer.reverse()
+        return newer
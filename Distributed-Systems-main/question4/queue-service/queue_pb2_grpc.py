@@ -44,6 +44,16 @@ class QueueServiceStub(object):
                 request_serializer=queue__pb2.TrackId.SerializeToString,
                 response_deserializer=queue__pb2.QueueResponse.FromString,
                 _registered_method=True)
+        self.AddTracks = channel.unary_unary(
+                '/queue.QueueService/AddTracks',
+                request_serializer=queue__pb2.TrackBatch.SerializeToString,
+                response_deserializer=queue__pb2.QueueResponse.FromString,
+                _registered_method=True)
+        self.RemoveTracks = channel.unary_unary(
+                '/queue.QueueService/RemoveTracks',
+                request_serializer=queue__pb2.TrackIdBatch.SerializeToString,
+                response_deserializer=queue__pb2.QueueResponse.FromString,
+                _registered_method=True)
         self.VoteTrack = channel.unary_unary(
                 '/queue.QueueService/VoteTrack',
                 request_serializer=queue__pb2.VoteRequest.SerializeToString,
@@ -69,6 +79,31 @@ class QueueServiceStub(object):
                 request_serializer=queue__pb2.Empty.SerializeToString,
                 response_deserializer=queue__pb2.QueueList.FromString,
                 _registered_method=True)
+        self.GetQueuePage = channel.unary_unary(
+                '/queue.QueueService/GetQueuePage',
+                request_serializer=queue__pb2.PageRequest.SerializeToString,
+                response_deserializer=queue__pb2.QueueList.FromString,
+                _registered_method=True)
+        self.GetHistoryPage = channel.unary_unary(
+                '/queue.QueueService/GetHistoryPage',
+                request_serializer=queue__pb2.PageRequest.SerializeToString,
+                response_deserializer=queue__pb2.QueueList.FromString,
+                _registered_method=True)
+        self.StreamQueue = channel.unary_stream(
+                '/queue.QueueService/StreamQueue',
+                request_serializer=queue__pb2.PageRequest.SerializeToString,
+                response_deserializer=queue__pb2.QueueList.FromString,
+                _registered_method=True)
+        self.StreamHistory = channel.unary_stream(
+                '/queue.QueueService/StreamHistory',
+                request_serializer=queue__pb2.PageRequest.SerializeToString,
+                response_deserializer=queue__pb2.QueueList.FromString,
+                _registered_method=True)
+        self.WatchQueue = channel.unary_stream(
+                '/queue.QueueService/WatchQueue',
+                request_serializer=queue__pb2.WatchRequest.SerializeToString,
+                response_deserializer=queue__pb2.QueueEvent.FromString,
+                _registered_method=True)
 
 
 class QueueServiceServicer(object):
@@ -86,6 +121,19 @@ class QueueServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def AddTracks(self, request, context):
+        """Many tracks in one call, applied atomically (one log entry on the Raft servers)
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RemoveTracks(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def VoteTrack(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
@@ -116,6 +164,38 @@ class QueueServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetQueuePage(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetHistoryPage(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamQueue(self, request, context):
+        """Everything from offset to the end, limit tracks per message
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def StreamHistory(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchQueue(self, request, context):
+        """Queue changes as they are applied, starting with a snapshot unless resuming
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_QueueServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -129,6 +209,16 @@ def add_QueueServiceServicer_to_server(servicer, server):
                     request_deserializer=queue__pb2.TrackId.FromString,
                     response_serializer=queue__pb2.QueueResponse.SerializeToString,
             ),
+            'AddTracks': grpc.unary_unary_rpc_method_handler(
+                    servicer.AddTracks,
+                    request_deserializer=queue__pb2.TrackBatch.FromString,
+                    response_serializer=queue__pb2.QueueResponse.SerializeToString,
+            ),
+            'RemoveTracks': grpc.unary_unary_rpc_method_handler(
+                    servicer.RemoveTracks,
+                    request_deserializer=queue__pb2.TrackIdBatch.FromString,
+                    response_serializer=queue__pb2.QueueResponse.SerializeToString,
+            ),
             'VoteTrack': grpc.unary_unary_rpc_method_handler(
                     servicer.VoteTrack,
                     request_deserializer=queue__pb2.VoteRequest.FromString,
@@ -154,6 +244,31 @@ def add_QueueServiceServicer_to_server(servicer, server):
                     request_deserializer=queue__pb2.Empty.FromString,
                     response_serializer=queue__pb2.QueueList.SerializeToString,
             ),
+            'GetQueuePage': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetQueuePage,
+                    request_deserializer=queue__pb2.PageRequest.FromString,
+                    response_serializer=queue__pb2.QueueList.SerializeToString,
+            ),
+            'GetHistoryPage': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetHistoryPage,
+                    request_deserializer=queue__pb2.PageRequest.FromString,
+                    response_serializer=queue__pb2.QueueList.SerializeToString,
+            ),
+            'StreamQueue': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamQueue,
+                    request_deserializer=queue__pb2.PageRequest.FromString,
+                    response_serializer=queue__pb2.QueueList.SerializeToString,
+            ),
+            'StreamHistory': grpc.unary_stream_rpc_method_handler(
+                    servicer.StreamHistory,
+                    request_deserializer=queue__pb2.PageRequest.FromString,
+                    response_serializer=queue__pb2.QueueList.SerializeToString,
+            ),
+            'WatchQueue': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchQueue,
+                    request_deserializer=queue__pb2.WatchRequest.FromString,
+                    response_serializer=queue__pb2.QueueEvent.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'queue.QueueService', rpc_method_handlers)
@@ -219,6 +334,60 @@ class QueueService(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def AddTracks(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/queue.QueueService/AddTracks',
+            queue__pb2.TrackBatch.SerializeToString,
+            queue__pb2.QueueResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def RemoveTracks(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/queue.QueueService/RemoveTracks',
+            queue__pb2.TrackIdBatch.SerializeToString,
+            queue__pb2.QueueResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def VoteTrack(request,
             target,
@@ -353,3 +522,138 @@ class QueueService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetQueuePage(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/queue.QueueService/GetQueuePage',
+            queue__pb2.PageRequest.SerializeToString,
+            queue__pb2.QueueList.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def GetHistoryPage(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/queue.QueueService/GetHistoryPage',
+            queue__pb2.PageRequest.SerializeToString,
+            queue__pb2.QueueList.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamQueue(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/queue.QueueService/StreamQueue',
+            queue__pb2.PageRequest.SerializeToString,
+            queue__pb2.QueueList.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def StreamHistory(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/queue.QueueService/StreamHistory',
+            queue__pb2.PageRequest.SerializeToString,
+            queue__pb2.QueueList.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WatchQueue(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/queue.QueueService/WatchQueue',
+            queue__pb2.WatchRequest.SerializeToString,
+            queue__pb2.QueueEvent.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
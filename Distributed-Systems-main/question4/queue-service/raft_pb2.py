@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nraft.proto\x12\x04raft\"]\n\x08VoteArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0c\x63\x61ndidate_id\x18\x02 \x01(\x05\x12\x16\n\x0elast_log_index\x18\x03 \x01(\x05\x12\x15\n\rlast_log_term\x18\x04 \x01(\x05\"/\n\tVoteReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0cvote_granted\x18\x02 \x01(\x08\"\x94\x01\n\nAppendArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\x16\n\x0eprev_log_index\x18\x03 \x01(\x05\x12\x15\n\rprev_log_term\x18\x04 \x01(\x05\x12\x1f\n\x07\x65ntries\x18\x05 \x03(\x0b\x32\x0e.raft.LogEntry\x12\x15\n\rleader_commit\x18\x06 \x01(\x05\",\n\x0b\x41ppendReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\"7\n\x08LogEntry\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07\x63ommand\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x32w\n\x0bRaftService\x12\x30\n\x0bRequestVote\x12\x0e.raft.VoteArgs\x1a\x0f.raft.VoteReply\"\x00\x12\x36\n\rAppendEntries\x12\x10.raft.AppendArgs\x1a\x11.raft.AppendReply\"\x00\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\nraft.proto\x12\x04raft\"]\n\x08VoteArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0c\x63\x61ndidate_id\x18\x02 \x01(\x05\x12\x16\n\x0elast_log_index\x18\x03 \x01(\x05\x12\x15\n\rlast_log_term\x18\x04 \x01(\x05\"/\n\tVoteReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x14\n\x0cvote_granted\x18\x02 \x01(\x08\"\x94\x01\n\nAppendArgs\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x11\n\tleader_id\x18\x02 \x01(\x05\x12\x16\n\x0eprev_log_index\x18\x03 \x01(\x05\x12\x15\n\rprev_log_term\x18\x04 \x01(\x05\x12\x1f\n\x07\x65ntries\x18\x05 \x03(\x0b\x32\x0e.raft.LogEntry\x12\x15\n\rleader_commit\x18\x06 \x01(\x05\"s\n\x0b\x41ppendReply\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x15\n\rconflict_term\x18\x03 \x01(\x05\x12\x1b\n\x0e\x63onflict_index\x18\x04 \x01(\x05H\x00\x88\x01\x01\x42\x11\n\x0f_conflict_index\"7\n\x08LogEntry\x12\x0c\n\x04term\x18\x01 \x01(\x05\x12\x0f\n\x07\x63ommand\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x32w\n\x0bRaftService\x12\x30\n\x0bRequestVote\x12\x0e.raft.VoteArgs\x1a\x0f.raft.VoteReply\"\x00\x12\x36\n\rAppendEntries\x12\x10.raft.AppendArgs\x1a\x11.raft.AppendReply\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -38,9 +38,9 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_APPENDARGS']._serialized_start=165
   _globals['_APPENDARGS']._serialized_end=313
   _globals['_APPENDREPLY']._serialized_start=315
-  _globals['_APPENDREPLY']._serialized_end=359
-  _globals['_LOGENTRY']._serialized_start=361
-  _globals['_LOGENTRY']._serialized_end=416
-  _globals['_RAFTSERVICE']._serialized_start=418
-  _globals['_RAFTSERVICE']._serialized_end=537
+  _globals['_APPENDREPLY']._serialized_end=430
+  _globals['_LOGENTRY']._serialized_start=432
+  _globals['_LOGENTRY']._serialized_end=487
+  _globals['_RAFTSERVICE']._serialized_start=489
+  _globals['_RAFTSERVICE']._serialized_end=608
 # @@protoc_insertion_point(module_scope)
@@ -1,5 +1,6 @@
 
 import os
+import bisect
 import time
 import random
 import threading
@@ -13,6 +14,9 @@ import raft_pb2
 import raft_pb2_grpc
 import queue_pb2
 import queue_pb2_grpc
+from raft_storage import RaftStorage
+from queue_state import QueueState
+from queue_events import QueueEvents
 
 # -------------------------
 # Config - tune as needed
@@ -36,6 +40,19 @@ ELECTION_TIMEOUT_MIN = float(os.environ.get("ELECTION_TIMEOUT_MIN", 1.5))
 ELECTION_TIMEOUT_MAX = float(os.environ.get("ELECTION_TIMEOUT_MAX", 3.0))
 RPC_TIMEOUT = float(os.environ.get("RPC_TIMEOUT", 1.0))
 CLIENT_APPLY_TIMEOUT = float(os.environ.get("CLIENT_APPLY_TIMEOUT", 5.0))
+# Queue sent back by AddTrack/RemoveTrack/VoteTrack: "full", "delta" (the
+# touched track) or "ack" (none); overridable with "write-reply" metadata
+WRITE_REPLY = os.environ.get("WRITE_REPLY", "full")
+PAGE_SIZE = int(os.environ.get("PAGE_SIZE", 100))  # Default tracks per page and per streamed message
+
+# WatchQueue
+WATCH_BACKLOG = int(os.environ.get("WATCH_BACKLOG", 10000))  # Recent queue events kept for resumes
+MAX_WATCHERS = int(os.environ.get("MAX_WATCHERS", 200))  # Concurrent WatchQueue streams, one server thread each
+WATCH_IDLE_CHECK = 5.0  # Seconds an idle watcher sleeps before checking its client is still there
+
+# Persistence
+DATA_DIR = os.environ.get("DATA_DIR", f"raft-data/node{NODE_ID}")  # WAL segments + term/vote file
+WAL_SYNC = os.environ.get("WAL_SYNC", "group")  # "group" (batched fsync) or "entry" (fsync per entry)
 
 # Logging
 logging.basicConfig(format=f"[Node {NODE_ID}] %(asctime)s %(levelname)s: %(message)s", level=logging.INFO)
@@ -49,10 +66,11 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
         # concurrency
         self.lock = threading.RLock()
 
-        # persistent state (in-memory; persist to disk for durability)
-        self.current_term = 0
-        self.voted_for = None
-        self.log = []  # list of raft_pb2.LogEntry
+        # persistent state (write-ahead log + term/vote file in DATA_DIR)
+        self.storage = RaftStorage(DATA_DIR, sync_mode=WAL_SYNC)
+        self.current_term, self.voted_for = self.storage.load_meta()
+        self.log = self.storage.load_log()  # list of raft_pb2.LogEntry
+        logger.info(f"Recovered term={self.current_term} voted_for={self.voted_for} log entries={len(self.log)}")
 
         # volatile state
         self.commit_index = -1
@@ -69,7 +87,10 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
         self.match_index = {}  # peer_id -> highest replicated index
 
         # application state
-        self.music_queue = []  # list of queue_pb2.Track
+        self.music_queue = QueueState()  # queue_pb2.Track by id, in play order
+        self.history = []  # played tracks, oldest first
+        self.apply_results = {}  # log index -> result of applying it (leader, for waiting clients)
+        self.events = QueueEvents(WATCH_BACKLOG)  # applied changes, for WatchQueue
 
         # channel reuse
         self.peer_channels = {}  # pid -> grpc.Channel
@@ -78,6 +99,9 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
 
         # commit condition for clients waiting for their entries to be committed
         self.commit_cond = threading.Condition(self.lock)
+        # WatchQueue streams waiting for the next applied change
+        self.watch_cond = threading.Condition(self.lock)
+        self.watchers = 0
 
         # vote tracking for elections
         self.votes_received = 0
@@ -100,6 +124,18 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
         total = self._total_nodes()
         return total // 2 + 1
 
+    # persistence helpers - caller holds lock
+    def _persist_meta(self):
+        self.storage.save_meta(self.current_term, self.voted_for)
+
+    def _log_append(self, entries):
+        self.log.extend(entries)
+        return self.storage.append(entries)
+
+    def _log_truncate(self, index):
+        del self.log[index:]
+        self.storage.truncate(index)
+
     def _get_or_create_peer_channel(self, pid, addr):
         ch = self.peer_channels.get(pid)
         if ch is None:
@@ -135,6 +171,7 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
         self.current_term += 1
         self.voted_for = NODE_ID
         self.votes_received = 1
+        self._persist_meta()
         self._reset_election_deadline()
         self.last_heartbeat = time.time()
         logger.info(f"Became CANDIDATE for term {self.current_term}")
@@ -180,6 +217,9 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
         logger.info(f"Won election and became LEADER for term {self.current_term}")
         # initialize next_index/match_index
         nexti = len(self.log)
+        # no-op entry of our own term so entries recovered from disk can commit
+        self._log_append([raft_pb2.LogEntry(term=self.current_term, command="NOOP")])
+        self.storage.sync()
         for pid in PEERS:
             self.next_index[pid] = nexti
             self.match_index[pid] = -1
@@ -191,8 +231,10 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
 
     def _become_follower(self, term, leader_id=None):
         self.state = "FOLLOWER"
-        self.current_term = term
-        self.voted_for = None
+        if term > self.current_term:
+            self.current_term = term
+            self.voted_for = None
+            self._persist_meta()
         self.leader_id = leader_id
         self._reset_election_deadline()
         self.last_heartbeat = time.time()
@@ -201,19 +243,23 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
     def _send_heartbeats(self):
         # Send AppendEntries tailored to each follower
         for pid, addr in PEERS.items():
-            nxt = self.next_index.get(pid, len(self.log))
-            prev_idx = nxt - 1
-            prev_term = self.log[prev_idx].term if (0 <= prev_idx < len(self.log)) else 0
-            entries = self.log[nxt:]  # empty on heartbeat
-            args = raft_pb2.AppendArgs(
-                term=self.current_term,
-                leader_id=NODE_ID,
-                prev_log_index=prev_idx,
-                prev_log_term=prev_term,
-                entries=entries,
-                leader_commit=self.commit_index
-            )
-            threading.Thread(target=self._send_append_entries, args=(pid, addr, args), daemon=True).start()
+            self._send_append_to(pid, addr)
+
+    def _send_append_to(self, pid, addr):
+        # caller holds lock
+        nxt = self.next_index.get(pid, len(self.log))
+        prev_idx = nxt - 1
+        prev_term = self.log[prev_idx].term if (0 <= prev_idx < len(self.log)) else 0
+        entries = self.log[nxt:]  # empty on heartbeat
+        args = raft_pb2.AppendArgs(
+            term=self.current_term,
+            leader_id=NODE_ID,
+            prev_log_index=prev_idx,
+            prev_log_term=prev_term,
+            entries=entries,
+            leader_commit=self.commit_index
+        )
+        threading.Thread(target=self._send_append_entries, args=(pid, addr, args), daemon=True).start()
 
     def _send_append_entries(self, pid, addr, args):
         try:
@@ -225,6 +271,8 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
                     logger.info(f"Peer {pid} has higher term {resp.term}; stepping down")
                     self._become_follower(resp.term, leader_id=None)
                     return
+                if self.state != "LEADER" or args.term != self.current_term:
+                    return  # reply to an RPC from an earlier leadership
                 if resp.success:
                     replicated_up_to = args.prev_log_index + len(args.entries)
                     self.match_index[pid] = replicated_up_to
@@ -233,10 +281,20 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
                     # Attempt to advance commit index
                     self._advance_commit_index()
                 else:
-                    # simple fallback: decrement next_index and try later
+                    # log mismatch: jump back to where the follower's hint says
+                    # our logs can agree (past its whole conflicting term) and
+                    # resend at once instead of at the next heartbeat. A
+                    # follower without hints leaves conflict_index unset
                     old_next = self.next_index.get(pid, len(self.log))
-                    self.next_index[pid] = max(0, old_next - 1)
+                    nxt = resp.conflict_index if resp.HasField("conflict_index") else args.prev_log_index
+                    if resp.conflict_term:
+                        # right after our last entry of that term, if we have one
+                        i = bisect.bisect_right(self.log, resp.conflict_term, key=lambda e: e.term)
+                        if i > 0 and self.log[i - 1].term == resp.conflict_term:
+                            nxt = i
+                    self.next_index[pid] = max(0, min(old_next, args.prev_log_index, nxt))
                     logger.debug(f"AppendEntries failed for {pid}; next_index {old_next}->{self.next_index[pid]}")
+                    self._send_append_to(pid, addr)
         except grpc.RpcError as e:
             logger.warning(f"AppendEntries RPC to {pid} failed: {e}")
         except Exception as e:
@@ -244,13 +302,14 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
 
     def _advance_commit_index(self):
         # Caller holds lock
+        committed = self.commit_index
         last_index = len(self.log) - 1
         for N in range(self.commit_index + 1, last_index + 1):
             # safe commit rule: only commit entries from current term by leader
             if self.log[N].term != self.current_term:
                 continue
-            # count nodes with match_index >= N (leader included)
-            count = 1
+            # count nodes with match_index >= N (leader only once its log is durable)
+            count = 1 if self.match_index.get(NODE_ID, -1) >= N else 0
             for pid in PEERS:
                 if self.match_index.get(pid, -1) >= N:
                     count += 1
@@ -263,6 +322,11 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
 
         # apply logs after possibly advancing
         self._apply_logs_locked()
+        if self.commit_index != committed and self.state == "LEADER":
+            # tell followers now rather than at the next heartbeat: they serve
+            # reads from local state, and smart clients read from followers
+            self._send_heartbeats()
+            self.last_heartbeat = time.time()
 
     # -------------------------
     # RPC handlers - Raft
@@ -282,6 +346,7 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
                     if (request.last_log_term > last_term) or (request.last_log_term == last_term and request.last_log_index >= last_idx):
                         vote_granted = True
                         self.voted_for = request.candidate_id
+                        self._persist_meta()
                         self._reset_election_deadline()
                         logger.info(f"Voted for {request.candidate_id}")
             return raft_pb2.VoteReply(term=self.current_term, vote_granted=vote_granted)
@@ -303,22 +368,30 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
             # consistency check: prev_log must match
             if request.prev_log_index >= 0:
                 if request.prev_log_index >= len(self.log):
-                    return raft_pb2.AppendReply(term=self.current_term, success=False)
-                if self.log[request.prev_log_index].term != request.prev_log_term:
-                    return raft_pb2.AppendReply(term=self.current_term, success=False)
+                    return raft_pb2.AppendReply(term=self.current_term, success=False,
+                                                conflict_index=len(self.log))
+                term = self.log[request.prev_log_index].term
+                if term != request.prev_log_term:
+                    # point the leader at the start of our conflicting term
+                    first = bisect.bisect_left(self.log, term, key=lambda e: e.term)
+                    return raft_pb2.AppendReply(term=self.current_term, success=False,
+                                                conflict_term=term, conflict_index=first)
 
             # append entries, resolving conflicts by truncation
             insert_idx = request.prev_log_index + 1
-            for entry in request.entries:
+            for i, entry in enumerate(request.entries):
                 if insert_idx < len(self.log):
                     if self.log[insert_idx].term != entry.term:
                         # conflict -> truncate and append the rest
-                        self.log = self.log[:insert_idx]
-                        self.log.append(entry)
+                        self._log_truncate(insert_idx)
+                        self._log_append(request.entries[i:])
+                        break
                     # else already have same entry -> do nothing
                 else:
-                    self.log.append(entry)
+                    self._log_append(request.entries[i:])
+                    break
                 insert_idx += 1
+            last_new = request.prev_log_index + len(request.entries)
 
             # update commit index
             if request.leader_commit > self.commit_index:
@@ -326,40 +399,125 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
                 logger.debug(f"Updated commit_index to {self.commit_index}")
                 self._apply_logs_locked()
 
-            return raft_pb2.AppendReply(term=self.current_term, success=True)
+            reply = raft_pb2.AppendReply(term=self.current_term, success=True)
+
+        # acknowledge only once the entries are on disk (concurrent calls share one fsync)
+        self.storage.sync(last_new)
+        return reply
 
     # -------------------------
     # Apply logs to state machine
     # -------------------------
     def _apply_logs_locked(self):
         # lock must be held by caller
+        applied = self.last_applied
         while self.last_applied < self.commit_index:
             self.last_applied += 1
             entry = self.log[self.last_applied]
             logger.info(f"Applying log[{self.last_applied}] cmd={entry.command}")
             try:
+                result = None
                 if entry.command == "ADD":
                     t = queue_pb2.Track()
                     t.ParseFromString(entry.data)
-                    if not any(x.id == t.id for x in self.music_queue):
-                        self.music_queue.append(t)
+                    result = self.music_queue.add(t)
+                    if result:
+                        self._record_event(queue_pb2.QueueEvent.ADDED, t)
                 elif entry.command == "REMOVE":
                     tid = queue_pb2.TrackId()
                     tid.ParseFromString(entry.data)
-                    self.music_queue = [x for x in self.music_queue if x.id != tid.id]
+                    result = self.music_queue.remove(tid.id)
+                    if result is not None:
+                        self._record_event(queue_pb2.QueueEvent.REMOVED, result)
+                elif entry.command == "ADD_BATCH":
+                    batch = queue_pb2.TrackBatch()
+                    batch.ParseFromString(entry.data)
+                    added = [t for t in batch.tracks if self.music_queue.add(t)]
+                    if added:
+                        self._record_event(queue_pb2.QueueEvent.ADDED, tracks=added)
+                    result = len(added)
+                elif entry.command == "REMOVE_BATCH":
+                    batch = queue_pb2.TrackIdBatch()
+                    batch.ParseFromString(entry.data)
+                    removed = [t for t in map(self.music_queue.remove, batch.ids) if t is not None]
+                    if removed:
+                        self._record_event(queue_pb2.QueueEvent.REMOVED, tracks=removed)
+                    result = len(removed)
+                elif entry.command == "VOTE":
+                    vote = queue_pb2.VoteRequest()
+                    vote.ParseFromString(entry.data)
+                    result = self.music_queue.vote(vote.id, 1 if vote.up else -1)
+                    if result is not None:
+                        self._record_event(queue_pb2.QueueEvent.VOTED, result)
+                elif entry.command == "PLAY":
+                    result = self.music_queue.pop_next()
+                    if result is not None:
+                        self.history.append(result)
+                        self._record_event(queue_pb2.QueueEvent.PLAYED, result)
+                elif entry.command == "NOOP":
+                    pass
                 else:
                     logger.warning(f"Unknown command in log: {entry.command}")
+                if self.last_applied in self.apply_results:
+                    self.apply_results[self.last_applied] = result
             except Exception as e:
                 logger.exception("Failed to apply log entry: %s", e)
+        if self.last_applied != applied:
+            self.watch_cond.notify_all()
+
+    def _record_event(self, kind, track=None, tracks=()):
+        # lock must be held by caller; the event holds copies of the tracks
+        index = self.last_applied
+        self.events.append(index, queue_pb2.QueueEvent(kind=kind, token=str(index), track=track, queue=tracks))
 
     def _apply_logs(self):
         with self.lock:
             self._apply_logs_locked()
 
+    def _wait_committed(self, index, term):
+        # Wait for log[index], appended as leader in term, to commit (and so be
+        # applied). Returns None once it has, else why it has not.
+        # group commit: one fsync covers every entry appended by concurrent writers
+        self.storage.sync(index)
+        deadline = time.time() + CLIENT_APPLY_TIMEOUT
+        with self.commit_cond:
+            # the leader only counts toward the quorum once its own copy is durable
+            if self.state == "LEADER" and self.current_term == term:
+                self.match_index[NODE_ID] = max(self.match_index.get(NODE_ID, -1), index)
+                self._advance_commit_index()
+            while self.commit_index < index:
+                if self.state != "LEADER" or self.current_term != term:
+                    # a new leader may overwrite the entry; the client has to retry
+                    return "leadership lost"
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return "timeout"
+                self.commit_cond.wait(timeout=remaining)
+            if self.log[index].term != term:
+                return "leadership lost"  # a later leader committed its own entry here
+            return None
+
     # -------------------------
     # Client-facing Queue RPCs
     # -------------------------
-    def _forward_to_leader(self, request, method_name):
+    def _leader_hint(self, context):
+        # name the leader in the trailing metadata so smart clients
+        # (queue_client.py) can send their writes there directly
+        target = self.leader_id
+        if target is None:
+            return
+        hint = [("leader-id", str(target))]
+        if target in PEERS:
+            hint.append(("leader-addr", PEERS[target]))
+        context.set_trailing_metadata(hint)
+
+    def _forward_to_leader(self, request, method_name, context=None):
+        if context is not None:
+            self._leader_hint(context)
+            for key, value in context.invocation_metadata():
+                if key == "forward" and value in ("0", "false", "no"):
+                    # the client routes writes itself: tell it where the leader is instead
+                    context.abort(grpc.StatusCode.FAILED_PRECONDITION, "NOT_LEADER")
         target = self.leader_id
         if target is None:
             return queue_pb2.QueueResponse(message="No leader elected")
@@ -371,7 +529,8 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
             self._get_or_create_peer_channel(target, PEERS[target])
             qstub = self.peer_queue_stubs[target]
             method = getattr(qstub, method_name)
-            return method(request, timeout=RPC_TIMEOUT)
+            metadata = [(k, v) for k, v in context.invocation_metadata() if k == "write-reply"] if context else []
+            return method(request, timeout=RPC_TIMEOUT, metadata=metadata)
         except grpc.RpcError as e:
             logger.warning("Forwarding RPC failed: %s", e)
             return queue_pb2.QueueResponse(message=f"Forwarding failed: {e}")
@@ -380,41 +539,46 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
             return queue_pb2.QueueResponse(message="Forwarding error")
 
 
-    def AddTrack(self, request, context):
-        # log RPC call
+    def _append_client_entry(self, command, method_name, request, context, result=False):
+        # append a client write on the leader and hand back (index, term), or
+        # the forwarded reply when another node leads. With result set, the
+        # result of applying the entry is kept in apply_results for the caller
         client_id = "unknown"
         for key, value in context.invocation_metadata():
             if key == "node-id":
                 client_id = value
-        logger.info(f"Node {NODE_ID} runs RPC AddTrack called by Node {client_id}")
+        logger.info(f"Node {NODE_ID} runs RPC {method_name} called by Node {client_id}")
 
         with self.lock:
             if self.state != "LEADER":
-                return self._forward_to_leader(request, "AddTrack")
+                return self._forward_to_leader(request, method_name, context)
 
-            entry = raft_pb2.LogEntry(term=self.current_term, command="ADD", data=request.SerializeToString())
-            index = len(self.log)
-            self.log.append(entry)
-            logger.info(f"Leader appended log[{index}]")
+            entry = raft_pb2.LogEntry(term=self.current_term, command=command, data=request.SerializeToString())
+            index = self._log_append([entry])
+            if result:
+                self.apply_results[index] = None
+            logger.info(f"Leader appended {command} log[{index}]")
 
-            # leader bookkeeping
-            self.match_index[NODE_ID] = index
+            # leader bookkeeping, then request replication
             self.next_index[NODE_ID] = index + 1
-
-            # request replication
             self._send_heartbeats()
+            return index, self.current_term
+
+    def _write_reply(self, method_name, message, error, context, track_ids):
+        # reply to a queue write once _wait_committed has returned error
+        with self.lock:
+            if error:
+                logger.warning(f"{method_name}: {error}")
+                message = f"Not committed ({error})"
+            else:
+                logger.info(f"{method_name} committed")
+            return queue_pb2.QueueResponse(message=message, queue=self._reply_queue(context, track_ids))
 
-            # wait for commit
-            start = time.time()
-            with self.commit_cond:
-                while self.commit_index < index:
-                    remaining = CLIENT_APPLY_TIMEOUT - (time.time() - start)
-                    if remaining <= 0:
-                        logger.warning("AddTrack: commit timeout")
-                        return queue_pb2.QueueResponse(message="Queued but not committed (timeout)", queue=self.music_queue)
-                    self.commit_cond.wait(timeout=remaining)
-            logger.info("AddTrack committed")
-            return queue_pb2.QueueResponse(message="Queued", queue=self.music_queue)
+    def AddTrack(self, request, context):
+        appended = self._append_client_entry("ADD", "AddTrack", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return self._write_reply("AddTrack", "Queued", self._wait_committed(*appended), context, [request.id])
 
     # def AddTrack(self, request, context):
     #     with self.lock:
@@ -447,35 +611,10 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
     #         return queue_pb2.QueueResponse(message="Queued", queue=self.music_queue)
 
     def RemoveTrack(self, request, context):
-        client_id = "unknown"
-        for key, value in context.invocation_metadata():
-            if key == "node-id":
-                client_id = value
-        logger.info(f"Node {NODE_ID} runs RPC RemoveTrack called by Node {client_id}")
-
-        with self.lock:
-            if self.state != "LEADER":
-                return self._forward_to_leader(request, "RemoveTrack")
-
-            entry = raft_pb2.LogEntry(term=self.current_term, command="REMOVE", data=request.SerializeToString())
-            index = len(self.log)
-            self.log.append(entry)
-            logger.info(f"Leader appended REMOVE log[{index}]")
-
-            self.match_index[NODE_ID] = index
-            self.next_index[NODE_ID] = index + 1
-            self._send_heartbeats()
-
-            start = time.time()
-            with self.commit_cond:
-                while self.commit_index < index:
-                    remaining = CLIENT_APPLY_TIMEOUT - (time.time() - start)
-                    if remaining <= 0:
-                        logger.warning("RemoveTrack: commit timeout")
-                        return queue_pb2.QueueResponse(message="Queued but not committed (timeout)", queue=self.music_queue)
-                    self.commit_cond.wait(timeout=remaining)
-            logger.info("RemoveTrack committed")
-            return queue_pb2.QueueResponse(message="Removed", queue=self.music_queue)
+        appended = self._append_client_entry("REMOVE", "RemoveTrack", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return self._write_reply("RemoveTrack", "Removed", self._wait_committed(*appended), context, [request.id])
 
     # def RemoveTrack(self, request, context):
     #     with self.lock:
@@ -503,6 +642,20 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
     #         logger.info("RemoveTrack committed")
     #         return queue_pb2.QueueResponse(message="Removed", queue=self.music_queue)
 
+    def AddTracks(self, request, context):
+        # a whole batch is one log entry, replicated and applied atomically
+        appended = self._append_client_entry("ADD_BATCH", "AddTracks", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return self._write_reply("AddTracks", "Queued", self._wait_committed(*appended), context,
+                                 [t.id for t in request.tracks])
+
+    def RemoveTracks(self, request, context):
+        appended = self._append_client_entry("REMOVE_BATCH", "RemoveTracks", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return self._write_reply("RemoveTracks", "Removed", self._wait_committed(*appended), context, request.ids)
+
     def GetQueue(self, request, context):
         client_id = "unknown"
         for key, value in context.invocation_metadata():
@@ -511,30 +664,145 @@ class RaftServer(queue_pb2_grpc.QueueServiceServicer, raft_pb2_grpc.RaftServiceS
         logger.info(f"Node {NODE_ID} runs RPC GetQueue called by Node {client_id}")
 
         with self.lock:
-            return queue_pb2.QueueList(queue=self.music_queue)
+            return queue_pb2.QueueList(queue=self.music_queue.tracks())
 
     # def GetQueue(self, request, context):
     #     with self.lock:
     #         return queue_pb2.QueueList(queue=self.music_queue)
 
-    # Unused stubs - implement as needed
+    def _reply_queue(self, context, track_ids):
+        # caller holds the lock
+        mode = WRITE_REPLY
+        for key, value in context.invocation_metadata():
+            if key == "write-reply":
+                mode = value
+        if mode == "ack":
+            return []
+        if mode == "delta":
+            return [t for t in map(self.music_queue.get, track_ids) if t is not None]
+        return self.music_queue.tracks()
+
     def VoteTrack(self, request, context):
-        return queue_pb2.QueueResponse()
+        appended = self._append_client_entry("VOTE", "VoteTrack", request, context)
+        if not isinstance(appended, tuple):
+            return appended
+        return self._write_reply("VoteTrack", "Vote updated", self._wait_committed(*appended), context, [request.id])
+
     def GetMetadata(self, request, context):
-        return queue_pb2.Track()
+        client_id = "unknown"
+        for key, value in context.invocation_metadata():
+            if key == "node-id":
+                client_id = value
+        logger.info(f"Node {NODE_ID} runs RPC GetMetadata called by Node {client_id}")
+
+        with self.lock:
+            reply = queue_pb2.Track()
+            track = self.music_queue.get(request.id)
+            if track is not None:
+                reply.CopyFrom(track)
+            return reply
+
     def PlayNext(self, request, context):
-        return queue_pb2.Track()
+        appended = self._append_client_entry("PLAY", "PlayNext", request, context, result=True)
+        if isinstance(appended, queue_pb2.QueueResponse):
+            # forwarding failed; a Track has no field to carry the message
+            context.abort(grpc.StatusCode.UNAVAILABLE, appended.message)
+        if not isinstance(appended, tuple):
+            return appended
+
+        # the played track is only known once the entry is applied
+        index, term = appended
+        error = self._wait_committed(index, term)
+        with self.lock:
+            track = self.apply_results.pop(index, None)
+        if error:
+            logger.warning(f"PlayNext: {error}")
+            context.abort(grpc.StatusCode.UNAVAILABLE, f"PlayNext not committed ({error})")
+        logger.info("PlayNext committed")
+        return track if track is not None else queue_pb2.Track()
+
     def GetHistory(self, request, context):
-        return queue_pb2.QueueList()
+        client_id = "unknown"
+        for key, value in context.invocation_metadata():
+            if key == "node-id":
+                client_id = value
+        logger.info(f"Node {NODE_ID} runs RPC GetHistory called by Node {client_id}")
+
+        with self.lock:
+            return queue_pb2.QueueList(queue=self.history)
+
+    def _page_bounds(self, request):
+        return max(request.offset, 0), request.limit if request.limit > 0 else PAGE_SIZE
+
+    def _page(self, items, total, offset):
+        end = offset + len(items)
+        return queue_pb2.QueueList(queue=items, total=total, next_offset=end if end < total else 0)
+
+    def GetQueuePage(self, request, context):
+        offset, limit = self._page_bounds(request)
+        with self.lock:
+            return self._page(self.music_queue.page(offset, limit), len(self.music_queue), offset)
+
+    def GetHistoryPage(self, request, context):
+        offset, limit = self._page_bounds(request)
+        with self.lock:
+            return self._page(self.history[offset:offset + limit], len(self.history), offset)
+
+    def StreamQueue(self, request, context):
+        offset, limit = self._page_bounds(request)
+        # copy every page under the lock so later votes cannot change what is sent
+        with self.lock:
+            tracks = self.music_queue.page(offset, len(self.music_queue))
+            total = len(self.music_queue)
+            pages = [self._page(tracks[i:i + limit], total, offset + i) for i in range(0, len(tracks), limit)]
+        yield from pages or [self._page([], total, offset)]
+
+    def StreamHistory(self, request, context):
+        offset, limit = self._page_bounds(request)
+        with self.lock:
+            total = len(self.history)
+            pages = [self._page(self.history[i:i + limit], total, i) for i in range(offset, total, limit)]
+        yield from pages or [self._page([], total, offset)]
+
+    def WatchQueue(self, request, context):
+        # tokens are log indexes, so a watcher can resume on any node
+        try:
+            token = int(request.resume_token) if request.resume_token else None
+        except ValueError:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Bad resume token")
+        with self.lock:
+            if self.watchers >= MAX_WATCHERS:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many watchers")
+            self.watchers += 1
+        try:
+            while context.is_active() and not self._stop.is_set():
+                with self.watch_cond:
+                    events = None if token is None else self.events.since(token)
+                    if events is None:
+                        # new watcher, or too far behind to replay
+                        events = [queue_pb2.QueueEvent(kind=queue_pb2.QueueEvent.SNAPSHOT,
+                                                       token=str(self.last_applied),
+                                                       queue=self.music_queue.tracks())]
+                    elif not events:
+                        self.watch_cond.wait(WATCH_IDLE_CHECK)
+                        continue
+                for event in events:
+                    yield event
+                token = int(events[-1].token)
+        finally:
+            with self.lock:
+                self.watchers -= 1
 
     def stop(self):
         self._stop.set()
+        with self.lock:
+            self.watch_cond.notify_all()
 
 # -------------------------
 # Server bootstrap
 # -------------------------
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=20))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=20 + MAX_WATCHERS))  # watchers must not starve other RPCs
     raft_server = RaftServer()
     queue_pb2_grpc.add_QueueServiceServicer_to_server(raft_server, server)
     raft_pb2_grpc.add_RaftServiceServicer_to_server(raft_server, server)
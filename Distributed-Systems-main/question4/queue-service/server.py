@@ -1,97 +1,352 @@
-
 import grpc
 from concurrent import futures
+import math
 import time
 import os
+import threading
 import redis
 import queue_pb2
 import queue_pb2_grpc
 
+# Each queued track is a hash field (id -> Track bytes) plus a sorted-set
+# member whose score packs the votes and the arrival order:
+#     score = -votes * VOTE_WEIGHT + seq
+# so ZRANGE returns most votes first, ties in arrival order, and a vote is a
+# single ZINCRBY. The Track bytes are stored with votes cleared; the score is
+# the only copy. Scores stay exact doubles while |votes| < 2^20 and seq < 2^32.
+VOTE_WEIGHT = 2 ** 32
+
+# What AddTrack/RemoveTrack/VoteTrack send back in the queue field,
+# overridable per call with the "write-reply" metadata key:
+#   full  - the whole queue
+#   delta - just the track the write touched (nothing once it is gone)
+#   ack   - nothing, only the message
+WRITE_REPLY = os.environ.get('WRITE_REPLY', 'full')
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 100))  # Default tracks per page and per streamed message
+
+# Every script also appends its change to a Redis stream, which WatchQueue
+# reads with XREAD BLOCK; the stream entry id is the resume token
+WATCH_BACKLOG = int(os.environ.get('WATCH_BACKLOG', 10000))  # Approximate events kept in the stream
+MAX_WATCHERS = int(os.environ.get('MAX_WATCHERS', 200))  # Concurrent WatchQueue streams, one server thread each
+WATCH_IDLE_CHECK = 5.0  # Seconds an idle watcher blocks before checking its client is still there
+
+# KEYS: tracks, order, seq, events   ARGV: id, body, votes, backlog
+# Returns 1 if added, 0 if the id is already queued
+ADD_SCRIPT = """
+if redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2]) == 0 then
+    return 0
+end
+local seq = redis.call('INCR', KEYS[3])
+local score = -tonumber(ARGV[3]) * %d + seq
+redis.call('ZADD', KEYS[2], score, ARGV[1])
+redis.call('XADD', KEYS[4], 'MAXLEN', '~', ARGV[4], '*', 'kind', 'ADDED', 'score', score, 'body', ARGV[2])
+return 1
+""" % VOTE_WEIGHT
+
+# KEYS: tracks, order, seq, events   ARGV: backlog, then id, body, votes for each track
+# Returns how many were added; ids already queued are skipped
+ADD_BATCH_SCRIPT = """
+local added = 0
+for i = 2, #ARGV, 3 do
+    if redis.call('HSETNX', KEYS[1], ARGV[i], ARGV[i + 1]) == 1 then
+        local seq = redis.call('INCR', KEYS[3])
+        local score = -tonumber(ARGV[i + 2]) * %d + seq
+        redis.call('ZADD', KEYS[2], score, ARGV[i])
+        redis.call('XADD', KEYS[4], 'MAXLEN', '~', ARGV[1], '*', 'kind', 'ADDED', 'score', score, 'body', ARGV[i + 1])
+        added = added + 1
+    end
+end
+return added
+""" % VOTE_WEIGHT
+
+# KEYS: tracks, order, events   ARGV: id, backlog
+REMOVE_SCRIPT = """
+local body = redis.call('HGET', KEYS[1], ARGV[1])
+if not body then
+    return 0
+end
+local score = redis.call('ZSCORE', KEYS[2], ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[1], ARGV[1])
+redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[2], '*', 'kind', 'REMOVED', 'score', score, 'body', body)
+return 1
+"""
+
+# KEYS: tracks, order, events   ARGV: backlog, then the ids   Returns how many were removed
+REMOVE_BATCH_SCRIPT = """
+local removed = 0
+for i = 2, #ARGV do
+    local body = redis.call('HGET', KEYS[1], ARGV[i])
+    if body then
+        local score = redis.call('ZSCORE', KEYS[2], ARGV[i])
+        redis.call('ZREM', KEYS[2], ARGV[i])
+        redis.call('HDEL', KEYS[1], ARGV[i])
+        redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[1], '*', 'kind', 'REMOVED', 'score', score, 'body', body)
+        removed = removed + 1
+    end
+end
+return removed
+"""
+
+# KEYS: tracks, order, events   ARGV: id, delta, backlog
+# Returns the new score, or nil if the id is not queued
+VOTE_SCRIPT = """
+if not redis.call('ZSCORE', KEYS[2], ARGV[1]) then
+    return false
+end
+local score = redis.call('ZINCRBY', KEYS[2], -tonumber(ARGV[2]) * %d, ARGV[1])
+redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[3], '*', 'kind', 'VOTED', 'score', score,
+           'body', redis.call('HGET', KEYS[1], ARGV[1]))
+return score
+""" % VOTE_WEIGHT
+
+# KEYS: tracks, order, history, events   ARGV: backlog
+# Returns {score, body}, or nil if the queue is empty.
+# History entries are "score:body" so the votes at play time are kept.
+PLAY_SCRIPT = """
+local top = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+if #top == 0 then
+    return false
+end
+local body = redis.call('HGET', KEYS[1], top[1])
+redis.call('ZREM', KEYS[2], top[1])
+redis.call('HDEL', KEYS[1], top[1])
+redis.call('RPUSH', KEYS[3], top[2] .. ':' .. body)
+redis.call('XADD', KEYS[4], 'MAXLEN', '~', ARGV[1], '*', 'kind', 'PLAYED', 'score', top[2], 'body', body)
+return {top[2], body}
+"""
+
+
+def _track(score, body):
+    # Rebuild a Track from its Track bytes and its sorted-set score
+    t = queue_pb2.Track()
+    t.ParseFromString(body)
+    t.votes = -math.floor(float(score) / VOTE_WEIGHT)
+    return t
+
+
+def _history_track(data):
+    score, _, body = data.partition(b':')
+    return _track(score, body)
+
+
+def _stream_id(token):
+    # "ms-seq" stream entry id as a comparable tuple; ValueError if malformed
+    ms, _, seq = token.partition('-')
+    return int(ms), int(seq or 0)
+
+
+def _page_bounds(request):
+    return max(request.offset, 0), request.limit if request.limit > 0 else PAGE_SIZE
+
+
+def _page(items, total, offset):
+    # items start at offset in a list of total tracks
+    end = offset + len(items)
+    return queue_pb2.QueueList(queue=items, total=total, next_offset=end if end < total else 0)
+
 
 class QueueServiceServicer(queue_pb2_grpc.QueueServiceServicer):
     def __init__(self):
         redis_host = os.environ.get('REDIS_HOST', 'localhost')
         redis_port = int(os.environ.get('REDIS_PORT', 6379))
         self.redis = redis.Redis(host=redis_host, port=redis_port, decode_responses=False)
-        self.queue_key = 'queue'
-        self.history_key = 'history'
+        self.tracks_key = 'queue:tracks'
+        self.order_key = 'queue:order'
+        self.seq_key = 'queue:seq'
+        self.history_key = 'queue:history'
+        self.events_key = 'queue:events'
+        self.lock = threading.Lock()
+        self.watchers = 0
+        # Every mutation is one script call: a single round trip to Redis,
+        # and atomic across any number of service replicas
+        self.add_script = self.redis.register_script(ADD_SCRIPT)
+        self.remove_script = self.redis.register_script(REMOVE_SCRIPT)
+        self.add_batch_script = self.redis.register_script(ADD_BATCH_SCRIPT)
+        self.remove_batch_script = self.redis.register_script(REMOVE_BATCH_SCRIPT)
+        self.vote_script = self.redis.register_script(VOTE_SCRIPT)
+        self.play_script = self.redis.register_script(PLAY_SCRIPT)
 
     def AddTrack(self, request, context):
-        # Serialize Track to bytes (now includes duration)
-        self.redis.rpush(self.queue_key, request.SerializeToString())
-        queue = self._get_queue()
-        return queue_pb2.QueueResponse(message="Track added", queue=queue)
+        body = queue_pb2.Track()
+        body.CopyFrom(request)
+        body.votes = 0  # votes live in the score
+        self.add_script(keys=[self.tracks_key, self.order_key, self.seq_key, self.events_key],
+                        args=[request.id, body.SerializeToString(), request.votes, WATCH_BACKLOG])
+        return queue_pb2.QueueResponse(message="Track added", queue=self._reply_queue(context, [request.id]))
 
     def RemoveTrack(self, request, context):
-        # Remove all tracks with matching id
-        queue = self._get_queue()
-        new_queue = [t for t in queue if t.id != request.id]
-        # Clear and re-add
-        self.redis.delete(self.queue_key)
-        for t in new_queue:
-            self.redis.rpush(self.queue_key, t.SerializeToString())
-        return queue_pb2.QueueResponse(message="Track removed", queue=new_queue)
+        self.remove_script(keys=[self.tracks_key, self.order_key, self.events_key], args=[request.id, WATCH_BACKLOG])
+        return queue_pb2.QueueResponse(message="Track removed", queue=self._reply_queue(context, [request.id]))
+
+    def AddTracks(self, request, context):
+        args = [WATCH_BACKLOG]
+        for track in request.tracks:
+            body = queue_pb2.Track()
+            body.CopyFrom(track)
+            body.votes = 0  # votes live in the score
+            args += [track.id, body.SerializeToString(), track.votes]
+        added = self.add_batch_script(keys=[self.tracks_key, self.order_key, self.seq_key, self.events_key], args=args)
+        return queue_pb2.QueueResponse(message=f"{added} tracks added",
+                                       queue=self._reply_queue(context, [t.id for t in request.tracks]))
+
+    def RemoveTracks(self, request, context):
+        removed = self.remove_batch_script(keys=[self.tracks_key, self.order_key, self.events_key],
+                                           args=[WATCH_BACKLOG] + list(request.ids))
+        return queue_pb2.QueueResponse(message=f"{removed} tracks removed",
+                                       queue=self._reply_queue(context, request.ids))
 
     def VoteTrack(self, request, context):
-        queue = self._get_queue()
-        for t in queue:
-            if t.id == request.id:
-                t.votes += 1 if request.up else -1
-        # Sort by votes descending
-        queue.sort(key=lambda x: -x.votes)
-        # Save back to Redis
-        self.redis.delete(self.queue_key)
-        for t in queue:
-            self.redis.rpush(self.queue_key, t.SerializeToString())
-        return queue_pb2.QueueResponse(message="Vote updated", queue=queue)
+        self.vote_script(keys=[self.tracks_key, self.order_key, self.events_key],
+                         args=[request.id, 1 if request.up else -1, WATCH_BACKLOG])
+        return queue_pb2.QueueResponse(message="Vote updated", queue=self._reply_queue(context, [request.id]))
 
     def GetQueue(self, request, context):
-        queue = self._get_queue()
-        return queue_pb2.QueueList(queue=queue)
+        return queue_pb2.QueueList(queue=self._get_queue())
 
     def GetMetadata(self, request, context):
-        queue = self._get_queue()
-        for t in queue:
-            if t.id == request.id:
-                return t
-        return queue_pb2.Track()  # empty
+        track = self._get_track(request.id)
+        return track if track is not None else queue_pb2.Track()  # empty
 
     def PlayNext(self, request, context):
-        # Pop from queue
-        data = self.redis.lpop(self.queue_key)
-        if not data:
+        # Pop the most-voted track and add it to history in one script call
+        played = self.play_script(keys=[self.tracks_key, self.order_key, self.history_key, self.events_key],
+                                  args=[WATCH_BACKLOG])
+        if not played:
             return queue_pb2.Track()  # empty
-        track = queue_pb2.Track()
-        track.ParseFromString(data)
-        # Add to history
-        self.redis.rpush(self.history_key, track.SerializeToString())
-        return track
+        return _track(*played)
 
     def GetHistory(self, request, context):
         history = self._get_history()
         return queue_pb2.QueueList(queue=history)
 
-    def _get_queue(self):
-        # Get all tracks from Redis queue (now includes duration)
-        data_list = self.redis.lrange(self.queue_key, 0, -1)
-        queue = []
-        for data in data_list:
-            t = queue_pb2.Track()
-            t.ParseFromString(data)
-            queue.append(t)
-        return queue
+    def GetQueuePage(self, request, context):
+        offset, limit = _page_bounds(request)
+        return self._queue_page(offset, limit)
+
+    def GetHistoryPage(self, request, context):
+        offset, limit = _page_bounds(request)
+        return self._history_page(offset, limit)
+
+    def StreamQueue(self, request, context):
+        # One page per message; each page is read separately, so a write
+        # between two pages can shift tracks across the boundary
+        offset, limit = _page_bounds(request)
+        while True:
+            page = self._queue_page(offset, limit)
+            yield page
+            if not page.next_offset:
+                return
+            offset = page.next_offset
+
+    def StreamHistory(self, request, context):
+        offset, limit = _page_bounds(request)
+        while True:
+            page = self._history_page(offset, limit)
+            yield page
+            if not page.next_offset:
+                return
+            offset = page.next_offset
+
+    def WatchQueue(self, request, context):
+        token = request.resume_token
+        try:
+            if token and not self._can_resume(_stream_id(token)):
+                token = ''  # too far behind: start over from a snapshot
+        except ValueError:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Bad resume token")
+        with self.lock:
+            if self.watchers >= MAX_WATCHERS:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many watchers")
+            self.watchers += 1
+        try:
+            if not token:
+                snapshot = self._snapshot_event()
+                token = snapshot.token
+                yield snapshot
+            while context.is_active():
+                reply = self.redis.xread({self.events_key: token}, count=PAGE_SIZE,
+                                         block=int(WATCH_IDLE_CHECK * 1000))
+                for _, entries in reply:
+                    for event_id, fields in entries:
+                        token = event_id.decode()
+                        yield queue_pb2.QueueEvent(kind=queue_pb2.QueueEvent.Kind.Value(fields[b'kind'].decode()),
+                                                   token=token, track=_track(fields[b'score'], fields[b'body']))
+        finally:
+            with self.lock:
+                self.watchers -= 1
+
+    def _can_resume(self, token_id):
+        # Entries before the oldest one kept may have been trimmed
+        oldest = self.redis.xrange(self.events_key, count=1)
+        return not oldest or token_id >= _stream_id(oldest[0][0].decode())
+
+    def _snapshot_event(self):
+        # The queue and the id of the last event, read in one transaction
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.zrange(self.order_key, 0, -1, withscores=True)
+        pipe.hgetall(self.tracks_key)
+        pipe.xrevrange(self.events_key, count=1)
+        order, bodies, last = pipe.execute()
+        return queue_pb2.QueueEvent(kind=queue_pb2.QueueEvent.SNAPSHOT,
+                                    token=last[0][0].decode() if last else '0-0',
+                                    queue=[_track(score, bodies[track_id]) for track_id, score in order])
+
+    def _reply_queue(self, context, track_ids):
+        mode = WRITE_REPLY
+        for key, value in context.invocation_metadata():
+            if key == "write-reply":
+                mode = value
+        if mode == "ack":
+            return []
+        if mode == "delta":
+            return self._get_tracks(track_ids)
+        return self._get_queue()
+
+    def _get_track(self, track_id):
+        tracks = self._get_tracks([track_id])
+        return tracks[0] if tracks else None
+
+    def _get_tracks(self, track_ids):
+        # Bodies and scores in one MULTI round trip; ids not queued are skipped
+        if not track_ids:
+            return []
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hmget(self.tracks_key, track_ids)
+        for track_id in track_ids:
+            pipe.zscore(self.order_key, track_id)
+        bodies, *scores = pipe.execute()
+        return [_track(score, body) for body, score in zip(bodies, scores) if body is not None]
+
+    def _get_queue(self, start=0, stop=-1):
+        # Play order from the sorted set, then the bodies in one HMGET
+        order = self.redis.zrange(self.order_key, start, stop, withscores=True)
+        if not order:
+            return []
+        bodies = self.redis.hmget(self.tracks_key, [track_id for track_id, _ in order])
+        # A body is None if the track was removed between the two calls
+        return [_track(score, body) for (_, score), body in zip(order, bodies) if body is not None]
+
+    def _queue_page(self, offset, limit):
+        total = self.redis.zcard(self.order_key)
+        return _page(self._get_queue(offset, offset + limit - 1), total, offset)
+
+    def _history_page(self, offset, limit):
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.lrange(self.history_key, offset, offset + limit - 1)
+        pipe.llen(self.history_key)
+        data_list, total = pipe.execute()
+        return _page([_history_track(data) for data in data_list], total, offset)
 
     def _get_history(self):
         data_list = self.redis.lrange(self.history_key, 0, -1)
         history = []
         for data in data_list:
-            t = queue_pb2.Track()
-            t.ParseFromString(data)
-            history.append(t)
+            history.append(_history_track(data))
         return history
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10 + MAX_WATCHERS))  # watchers must not starve other RPCs
     queue_pb2_grpc.add_QueueServiceServicer_to_server(QueueServiceServicer(), server)
     server.add_insecure_port('[::]:50051')
     server.start()
@@ -2,14 +2,13 @@
 import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-import grpc
 import queue_pb2
-import queue_pb2_grpc
+import queue_client
 
 def main():
-    target = sys.argv[1] if len(sys.argv) > 1 else 'nginx-grpc:50051'
-    channel = grpc.insecure_channel(target)
-    stub = queue_pb2_grpc.QueueServiceStub(channel)
+    # QUEUE_NODES lists the nodes so writes can go straight to the leader
+    target = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('QUEUE_NODES', 'nginx-grpc:50051')
+    stub = queue_client.connect(target)
 
     # Add a track
     track = queue_pb2.Track(id="101", title="TestAdd", artist="Tester", votes=0)
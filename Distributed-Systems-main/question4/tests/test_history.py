@@ -1,17 +1,16 @@
-import grpc
 import queue_pb2
-import queue_pb2_grpc
+import queue_client
+import os
 import sys
 
 def main():
     # Clear Redis state for test isolation
     import redis
     r = redis.Redis(host='redis', port=6379, decode_responses=False)
-    r.delete('queue')
-    r.delete('history')
-    target = sys.argv[1] if len(sys.argv) > 1 else 'nginx-grpc:50051'
-    channel = grpc.insecure_channel(target)
-    stub = queue_pb2_grpc.QueueServiceStub(channel)
+    r.delete('queue:tracks', 'queue:order', 'queue:seq', 'queue:history')
+    # QUEUE_NODES lists the nodes so writes can go straight to the leader
+    target = sys.argv[1] if len(sys.argv) > 1 else os.environ.get('QUEUE_NODES', 'nginx-grpc:50051')
+    stub = queue_client.connect(target)
 
     # Add a track and play it
     track = queue_pb2.Track(id="105", title="HistSong", artist="Hist", votes=0)